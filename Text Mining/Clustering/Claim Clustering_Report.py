@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import hdbscan
 import umap.umap_ as umap
 import plotly.graph_objects as go
@@ -7,21 +9,45 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.io as pio
 from sklearn.preprocessing import StandardScaler
+from sklearn.neighbors import NearestNeighbors, radius_neighbors_graph
 from scipy.stats import gaussian_kde
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from sklearn.decomposition import TruncatedSVD
-import colorsys
-from collections import Counter
+from matplotlib.colors import hsv_to_rgb
 import re
 import warnings
 import time
 from datetime import datetime
+import io
+import os
+import functools
+import hashlib
+import itertools
+import sys
 import json
 import copy
 from html import escape
+from joblib import Parallel, delayed, Memory
 
 # Configure renderer for browser-based viewing
 pio.renderers.default = "browser"
 
+# Punctuation stripper for keyword extraction (keeps word chars, whitespace and CJK)
+_TOKEN_RE = re.compile(r'[^\w\s\u4e00-\u9fa5]')
+
+# Hover layout for the scatter; fields come from EmbeddingVisualizer.prepare_webgl_customdata
+HOVER_TEMPLATE = (
+    "<b>Cluster %{customdata[0]}</b><br>"
+    "<b>Confidence:</b> %{customdata[1]:.3f}<br>"
+    "<b>Outlier Score:</b> %{customdata[2]:.3f}<br>"
+    "<b>Source:</b> %{customdata[3]}<br>"
+    "<b>Index:</b> %{customdata[4]}<br>"
+    "<hr>"
+    "<b>Text:</b><br><i>%{customdata[5]}</i>"
+    "<extra></extra>"
+)
+
 # Note: If you see sklearn warnings about 'force_all_finite', 
 # they're deprecation warnings that don't affect functionality.
 # You can update scikit-learn to remove them: pip install -U scikit-learn
@@ -34,12 +60,22 @@ class EmbeddingVisualizer:
     multi-layered interactive visualizations with automatic cluster characterization.
     Now with WebGL rendering and interactive HTML hierarchy reports.
     """
+
+    # Fixed attribute layout; lazily computed results stay unset until first use, so hasattr checks still work
+    __slots__ = (
+        'random_state', 'df', 'X', 'n_samples',
+        'WEBGL_RECOMMENDED_THRESHOLD', 'WEBGL_MAX_COMFORTABLE', 'SAMPLING_THRESHOLD',
+        'NOISE_SAMPLE_SIZE', 'SPARSE_GRAPH_THRESHOLD', 'GPU_UMAP_MIN_SAMPLES',
+        'reducer', 'XY', 'XY_normalized', '_knn_cache',
+        'clusterer', 'n_clusters', 'n_noise',
+        'cluster_descriptions', 'color_map',
+        '_tree_cache', '_plot_df', '_cluster_groups', '_cluster_stats',
+    )
     
     def __init__(self, parquet_path=None, random_state=42):
         self.random_state = random_state
         if parquet_path:
-            self.df = pd.read_parquet(parquet_path)
-            self.X = np.vstack(self.df["claim_embedding"].values)
+            self.df, self.X = self._load_parquet(parquet_path)
             self.n_samples = len(self.df)
             print(f"Loaded {self.n_samples:,} embeddings from {parquet_path}")
         else:
@@ -52,6 +88,9 @@ class EmbeddingVisualizer:
         self.WEBGL_RECOMMENDED_THRESHOLD = 1000
         self.WEBGL_MAX_COMFORTABLE = 100000
         self.SAMPLING_THRESHOLD = 500000
+        self.NOISE_SAMPLE_SIZE = 50000
+        self.SPARSE_GRAPH_THRESHOLD = 500000
+        self.GPU_UMAP_MIN_SAMPLES = 10000
         
         if self.n_samples > 0:
             if self.n_samples > self.WEBGL_RECOMMENDED_THRESHOLD:
@@ -63,24 +102,112 @@ class EmbeddingVisualizer:
                     UserWarning
                 )
     
-    def reduce_dimensions(self, n_neighbors=15, min_dist=0.1, metric="cosine"):
-        """Apply UMAP dimensionality reduction with optimized parameters."""
+    def _load_parquet(self, parquet_path, embedding_col="claim_embedding",
+                      data_columns=("claim_text", "source_file"), wide_schema_columns=1000):
+        """
+        Read the Parquet file with pyarrow through a memory map. Only the embedding and the columns
+        the reports use are read; very wide files are streamed in record batches. The embedding column is turned
+        straight into a float32 matrix from the Arrow buffer and never boxed into pandas; the
+        remaining columns become the dataframe.
+        """
+        parquet_file = pq.ParquetFile(parquet_path, memory_map=True)
+        schema_names = parquet_file.schema_arrow.names
+        columns = [embedding_col] + [c for c in data_columns if c in schema_names and c != embedding_col]
+
+        if len(schema_names) > wide_schema_columns:
+            table = pa.Table.from_batches(list(parquet_file.iter_batches(columns=columns, batch_size=2**16)))
+        else:
+            table = pq.read_table(parquet_path, columns=columns, use_threads=True, memory_map=True)
+        embeddings = table.column(embedding_col).combine_chunks()
+        n_rows = len(embeddings)
+
+        X = None
+        if pa.types.is_fixed_size_list(embeddings.type) and embeddings.null_count == 0:
+            # Fixed-width vectors: the child buffer already is the (N, D) matrix
+            flat = embeddings.values.to_numpy(zero_copy_only=False)
+            X = flat[embeddings.offset * embeddings.type.list_size:][:n_rows * embeddings.type.list_size]
+            X = X.reshape(n_rows, embeddings.type.list_size)
+        elif pa.types.is_list(embeddings.type) or pa.types.is_large_list(embeddings.type) or pa.types.is_fixed_size_list(embeddings.type):
+            flat = embeddings.flatten().to_numpy(zero_copy_only=False)
+            if n_rows and flat.size % n_rows == 0 and len(embeddings[0]) == flat.size // n_rows:
+                X = flat.reshape(n_rows, -1).astype(np.float32, copy=False)
+
+        if X is None:
+            # Ragged or non-list storage: fill a pre-allocated float32 matrix row by row
+            values = embeddings.to_pylist()
+            X = np.empty((n_rows, len(values[0])), dtype=np.float32)
+            for i, vec in enumerate(values):
+                X[i] = vec
+
+        # One contiguous, writeable float32 block: Arrow buffers are read-only and numba's
+        # pynndescent kernels reject read-only arrays, so those are copied exactly once here
+        X = np.require(X, dtype=np.float32, requirements=["C", "W"])
+
+        # self_destruct frees each Arrow column as soon as it is converted, avoiding a second full copy
+        df = table.drop_columns([embedding_col]).to_pandas(self_destruct=True, split_blocks=True)
+        del table
+        return df, X
+
+    def reduce_dimensions(self, n_neighbors=15, min_dist=0.1, metric="cosine", backend="auto", svd_components=50):
+        """
+        Apply UMAP dimensionality reduction with optimized parameters.
+        backend: "auto" uses cuML on GPU when available and the dataset is at least GPU_UMAP_MIN_SAMPLES,
+        "gpu"/"cuml" requires it, "cpu"/"umap-learn" forces umap-learn.
+        svd_components: embeddings wider than this are first projected with TruncatedSVD (None disables).
+        """
         print(f"Reducing {self.X.shape[0]:,} embeddings from {self.X.shape[1]}D to 2D...")
-        
+
         start_time = time.time()
-        
-        self.reducer = umap.UMAP(
-            n_neighbors=n_neighbors,
-            min_dist=min_dist,
-            metric=metric,
-            n_components=2,
-            init="spectral",
-            random_state=self.random_state,
-            n_jobs=-1,
-            low_memory=self.n_samples > 100000
-        )
-        
-        self.XY = self.reducer.fit_transform(self.X)
+
+        # UMAP's nearest-neighbour search is much faster below ~50 dimensions; self.X is kept intact
+        X_input = self.X
+        if svd_components and self.X.shape[1] > svd_components:
+            svd = TruncatedSVD(n_components=svd_components, random_state=self.random_state)
+            X_input = svd.fit_transform(self.X).astype(np.float32, copy=False)
+            print(f"✓ TruncatedSVD to {svd_components}D (explained variance: {svd.explained_variance_ratio_.sum():.1%})")
+
+        backend = {"cuml": "gpu", "umap-learn": "cpu"}.get(backend, backend)
+        use_gpu = backend == "gpu" or (backend == "auto" and self.X.shape[0] >= self.GPU_UMAP_MIN_SAMPLES)
+
+        self.XY = None
+        if use_gpu:
+            try:
+                import cupy
+                from cuml.manifold import UMAP as cuUMAP
+                self.reducer = cuUMAP(
+                    n_neighbors=n_neighbors,
+                    min_dist=min_dist,
+                    metric=metric,
+                    n_components=2,
+                    init="spectral",
+                    random_state=self.random_state
+                )
+                X_gpu = cupy.asarray(X_input, dtype=cupy.float32)
+                self.XY = cupy.asnumpy(self.reducer.fit_transform(X_gpu))
+                print("✓ Using cuML GPU UMAP")
+            except Exception as e:
+                if backend == "gpu":
+                    raise
+                print(f"GPU UMAP unavailable ({type(e).__name__}), falling back to CPU umap-learn")
+
+        if self.XY is None:
+            precomputed_knn = (None, None, None)
+            if X_input.shape[0] >= 4096:
+                # Below 4096 points umap-learn computes exact distances itself
+                precomputed_knn = self._get_knn(X_input, n_neighbors, metric, (svd_components, metric))
+            self.reducer = umap.UMAP(
+                n_neighbors=n_neighbors,
+                min_dist=min_dist,
+                metric=metric,
+                n_components=2,
+                init="spectral",
+                random_state=self.random_state,
+                n_jobs=-1,
+                low_memory=self.n_samples > 100000,
+                precomputed_knn=precomputed_knn
+            )
+            self.XY = self.reducer.fit_transform(X_input)
+
         self.df["x"], self.df["y"] = self.XY[:, 0], self.XY[:, 1]
         
         scaler = StandardScaler()
@@ -92,28 +219,130 @@ class EmbeddingVisualizer:
         
         return self
     
-    def cluster_embeddings(self, min_cluster_size=10, min_samples=5):
-        """Apply HDBSCAN clustering with soft clustering capabilities."""
+    def _get_knn(self, X_input, n_neighbors, metric, cache_key):
+        """
+        pynndescent kNN graph of the UMAP input, cached on the instance so that later
+        reduce_dimensions calls with the same input and metric (only min_dist or a smaller
+        n_neighbors changed) skip the neighbour search.
+        """
+        cache = getattr(self, "_knn_cache", None)
+        if cache is not None and cache["key"] == cache_key and cache["k"] >= n_neighbors:
+            print(f"✓ Reusing cached {cache['k']}-NN graph")
+        else:
+            from umap.umap_ import nearest_neighbors
+            from sklearn.utils import check_random_state
+            start_time = time.time()
+            indices, distances, search_index = nearest_neighbors(
+                X_input, n_neighbors, metric, {}, False, check_random_state(self.random_state),
+                low_memory=self.n_samples > 100000,
+                n_jobs=1 if self.random_state is not None else -1
+            )
+            cache = self._knn_cache = {
+                "key": cache_key, "k": n_neighbors,
+                "indices": indices, "distances": distances, "search_index": search_index
+            }
+            print(f"✓ Built {n_neighbors}-NN graph in {time.time() - start_time:.1f} seconds")
+        # UMAP masks disconnected edges in place, so it gets copies
+        return (cache["indices"][:, :n_neighbors].copy(),
+                cache["distances"][:, :n_neighbors].copy(),
+                cache["search_index"])
+
+    def cluster_embeddings(self, min_cluster_size=10, min_samples=5, backend="auto"):
+        """
+        Apply HDBSCAN clustering with soft clustering capabilities.
+        backend: "auto" tries cuML HDBSCAN on GPU, then fast_hdbscan, then hdbscan (on a sparse
+        radius graph for very large inputs); "gpu" and "fast" require the respective library, "cpu"
+        forces the reference hdbscan on the full Euclidean data. Pass the 'backend' returned by
+        optimize_clustering_parameters to reproduce the sweep's clustering.
+        """
         print("Clustering embeddings...")
-        
+
         start_time = time.time()
-        
-        self.clusterer = hdbscan.HDBSCAN(
-            min_cluster_size=min_cluster_size,
-            min_samples=min_samples,
-            metric="euclidean",
-            cluster_selection_method="eom",
-            prediction_data=True,
-            core_dist_n_jobs=-1
-        )
-        
-        self.clusterer.fit(self.XY_normalized)
-        
-        self.df["cluster"] = self.clusterer.labels_
-        self.df["probability"] = self.clusterer.probabilities_
-        self.df["outlier_score"] = self.clusterer.outlier_scores_
-        
-        self.n_clusters = len(set(self.clusterer.labels_)) - (1 if -1 in self.clusterer.labels_ else 0)
+
+        labels = None
+        if backend in ("auto", "gpu"):
+            try:
+                import cupy
+                from cuml.cluster import HDBSCAN as cuHDBSCAN
+                self.clusterer = cuHDBSCAN(
+                    min_cluster_size=min_cluster_size,
+                    min_samples=min_samples,
+                    metric="euclidean",
+                    cluster_selection_method="eom",
+                    prediction_data=True
+                )
+                self.clusterer.fit(cupy.asarray(self.XY_normalized, dtype=cupy.float32))
+                labels = cupy.asnumpy(self.clusterer.labels_)
+                probabilities = cupy.asnumpy(self.clusterer.probabilities_)
+                outlier_scores = cupy.asnumpy(self.clusterer.outlier_scores_)
+                print("✓ Using cuML GPU HDBSCAN")
+            except Exception as e:
+                if backend == "gpu":
+                    raise
+                print(f"GPU HDBSCAN unavailable ({type(e).__name__}), falling back to CPU")
+
+        if labels is None and backend in ("auto", "fast"):
+            try:
+                import fast_hdbscan
+                # numba-parallel Boruvka MST, well suited to the low-dimensional Euclidean UMAP output
+                self.clusterer = fast_hdbscan.HDBSCAN(
+                    min_cluster_size=min_cluster_size,
+                    min_samples=min_samples,
+                    cluster_selection_method="eom"
+                )
+                self.clusterer.fit(self.XY_normalized)
+                labels = self.clusterer.labels_
+                probabilities = self.clusterer.probabilities_
+                outlier_scores = _glosh_scores(self.clusterer.condensed_tree_, len(labels))
+                print("✓ Using fast_hdbscan")
+            except ImportError:
+                if backend == "fast":
+                    raise
+                print("fast_hdbscan not installed, using hdbscan")
+
+        if labels is None and backend == "auto" and self.n_samples > self.SPARSE_GRAPH_THRESHOLD:
+            # Very large inputs: cluster a sparse radius-neighbors distance graph so the MST
+            # only sees O(N*k) edges. Prediction data is not available for precomputed metrics.
+            radius = self._estimate_graph_radius(min_cluster_size)
+            graph = self._connect_components(
+                radius_neighbors_graph(self.XY_normalized, radius=radius, mode="distance", n_jobs=-1))
+            print(f"✓ Built sparse radius graph (r={radius:.3f}, {graph.nnz:,} edges)")
+            self.clusterer = hdbscan.HDBSCAN(
+                min_cluster_size=min_cluster_size,
+                min_samples=min_samples,
+                metric="precomputed",
+                cluster_selection_method="eom",
+                # Core distance for points with fewer than min_samples neighbours inside the radius
+                max_dist=float(graph.max())
+            )
+            self.clusterer.fit(graph)
+            labels = self.clusterer.labels_
+            probabilities = self.clusterer.probabilities_
+            outlier_scores = self.clusterer.outlier_scores_
+
+        if labels is None:
+            self.clusterer = hdbscan.HDBSCAN(
+                min_cluster_size=min_cluster_size,
+                min_samples=min_samples,
+                metric="euclidean",
+                cluster_selection_method="eom",
+                prediction_data=True,
+                core_dist_n_jobs=-1
+            )
+            self.clusterer.fit(self.XY_normalized)
+            labels = self.clusterer.labels_
+            probabilities = self.clusterer.probabilities_
+            outlier_scores = self.clusterer.outlier_scores_
+
+        self.df["cluster"] = labels
+        self.df["probability"] = probabilities
+        self.df["outlier_score"] = outlier_scores
+
+        self.n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
+        self._tree_cache = None
+        self._plot_df = None
+        self._cluster_groups = None
+        self._cluster_stats = None
         self.n_noise = sum(self.df["cluster"] == -1)
         
         elapsed = time.time() - start_time
@@ -121,33 +350,117 @@ class EmbeddingVisualizer:
         
         return self
     
+    def _get_cluster_groups(self):
+        """One groupby over the cluster column, shared by every per-cluster consumer."""
+        if getattr(self, '_cluster_groups', None) is None:
+            self._cluster_groups = self.df.groupby("cluster", sort=True)
+        return self._cluster_groups
+
+    def get_cluster_stats(self):
+        """
+        Per-cluster size, mean confidence, mean outlier score and 2D centroid, computed with
+        bincount in one pass over the label array instead of one scan per cluster.
+        """
+        if getattr(self, '_cluster_stats', None) is None:
+            ids = self.df["cluster"].to_numpy() + 1
+            sizes = np.bincount(ids)
+            present = np.flatnonzero(sizes)
+
+            def mean(col):
+                if col not in self.df:
+                    return np.full(len(present), np.nan)
+                sums = np.bincount(ids, weights=self.df[col].to_numpy(dtype=np.float64), minlength=len(sizes))
+                return sums[present] / sizes[present]
+
+            self._cluster_stats = pd.DataFrame({
+                "size": sizes[present],
+                "avg_probability": mean("probability"),
+                "avg_outlier_score": mean("outlier_score"),
+                "centroid_x": mean("x_norm"),
+                "centroid_y": mean("y_norm"),
+            }, index=pd.Index(present - 1, name="cluster"))
+        return self._cluster_stats
+
+    def _split_by_cluster(self, column):
+        """Values of column split per cluster with one stable argsort, keyed by cluster id."""
+        labels = self.df["cluster"].to_numpy()
+        order = np.argsort(labels, kind="stable")
+        ids, starts = np.unique(labels[order], return_index=True)
+        chunks = np.split(self.df[column].to_numpy()[order], starts[1:])
+        return dict(zip(ids.tolist(), chunks))
+
+    def _estimate_graph_radius(self, k, sample_size=20000, quantile=0.9):
+        """Radius for the sparse HDBSCAN graph: a high quantile of k-NN distances on a sample."""
+        rng = np.random.default_rng(self.random_state)
+        n = len(self.XY_normalized)
+        sample = self.XY_normalized[rng.choice(n, size=min(sample_size, n), replace=False)]
+        distances, _ = NearestNeighbors(n_neighbors=min(k + 1, len(sample))).fit(sample).kneighbors(sample)
+        # Distances on a subsample overestimate the full-data k-NN radius, which keeps the graph connected
+        return float(np.quantile(distances[:, -1], quantile))
+
+    def _connect_components(self, graph):
+        """
+        HDBSCAN rejects disconnected sparse graphs. Link one point of every component to one point
+        of the first component with their true distance, which is never shorter than the real gap.
+        """
+        n_components, component = connected_components(graph, directed=False)
+        if n_components == 1:
+            return graph
+        _, reps = np.unique(component, return_index=True)
+        anchor, others = reps[0], reps[1:]
+        dists = np.linalg.norm(self.XY_normalized[others] - self.XY_normalized[anchor], axis=1)
+        rows = np.concatenate([np.full(len(others), anchor), others])
+        cols = np.concatenate([others, np.full(len(others), anchor)])
+        bridges = coo_matrix((np.concatenate([dists, dists]), (rows, cols)), shape=graph.shape)
+        print(f"✓ Linked {n_components} disconnected graph components")
+        return (graph + bridges).tocsr()
+
     def extract_cluster_keywords(self, n_terms=5, min_word_length=2):
         """
         Extract representative keywords and sample rows for each cluster.
         """
         self.cluster_descriptions = {}
-        
-        for cluster_id in sorted(self.df["cluster"].unique()):
+
+        # Tokenize the whole column at once, then count (cluster, token) pairs in a single groupby.
+        # Stable sorting on first-appearance order keeps ties ranked exactly like Counter.most_common.
+        # Noise rows are dropped before tokenizing, so their tokens are never materialized.
+        clustered = self.df.loc[self.df["cluster"] != -1, ["cluster", "claim_text"]]
+        tokens = clustered["claim_text"].str.lower().str.replace(_TOKEN_RE, ' ', regex=True).str.split()
+        token_df = clustered[["cluster"]].assign(token=tokens).explode("token", ignore_index=True)
+        token_df = token_df[token_df["token"].str.len().to_numpy(na_value=0) > min_word_length]
+        token_counts = (token_df.groupby(["cluster", "token"], sort=False).size()
+                        .sort_values(ascending=False, kind="stable"))
+        top_counts = token_counts.groupby(level="cluster", sort=False).head(max(n_terms, 20))
+        words_by_cluster = {}
+        for (cid, word), count in top_counts.items():
+            words_by_cluster.setdefault(cid, []).append((word, int(count)))
+
+        groups = self._get_cluster_groups()
+        for cluster_id in groups.size().index:
             if cluster_id == -1:
                 continue
             
-            cluster_df = self.df[self.df["cluster"] == cluster_id]
-            
-            words = []
-            for text in cluster_df["claim_text"].values:
-                cleaned = re.sub(r'[^\w\s\u4e00-\u9fa5]', ' ', text.lower())
-                words.extend([w for w in cleaned.split() if len(w) > min_word_length])
-            
-            word_counts = Counter(words)
-            top_words = [word for word, _ in word_counts.most_common(n_terms)]
+            cluster_df = groups.get_group(cluster_id)
+
+            top_words_with_freq = words_by_cluster.get(cluster_id, [])
+            top_words = [word for word, _ in top_words_with_freq[:n_terms]]
             
-            sample_rows = cluster_df.sort_values(by='probability', ascending=False).head(5)
+            # O(n) selection of the 5 most confident rows instead of sorting the whole cluster
+            probs = cluster_df['probability'].to_numpy()
+            n_top = min(5, len(probs))
+            top_idx = np.argpartition(-probs, n_top - 1)[:n_top] if len(probs) > n_top else np.arange(len(probs))
+            top_idx = top_idx[np.argsort(-probs[top_idx], kind='stable')]
+            sample_rows = cluster_df.iloc[top_idx]
+            # HTML-escape the displayed text fields once here rather than per field in the report builder
+            escaped = {'_ct': 'claim_text', '_sf': 'source_file'}
+            sample_rows = sample_rows.assign(**{key: sample_rows[col].astype(str).map(escape)
+                                                for key, col in escaped.items() if col in sample_rows})
             sample_dicts = sample_rows.reset_index().to_dict('records')
 
             self.cluster_descriptions[cluster_id] = {
                 'keywords': top_words,
                 'size': len(cluster_df),
-                'top_words_with_freq': word_counts.most_common(20),
+                'top_words_with_freq': top_words_with_freq[:20],
                 'sample_rows': sample_dicts
             }
         
@@ -156,14 +469,11 @@ class EmbeddingVisualizer:
     def generate_cluster_colors(self):
         """Generate visually distinct colors for clusters using HSV color space."""
         n_colors_needed = self.n_clusters
-        colors = []
-        for i in range(n_colors_needed):
-            hue = i / n_colors_needed
-            saturation = 0.7 + (i % 3) * 0.1
-            value = 0.8 + (i % 2) * 0.1
-            rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-            hex_color = '#%02x%02x%02x' % tuple(int(c * 255) for c in rgb)
-            colors.append(hex_color)
+        i = np.arange(n_colors_needed)
+        hsv = np.stack([i / max(n_colors_needed, 1), 0.7 + (i % 3) * 0.1, 0.8 + (i % 2) * 0.1], axis=1)
+        rgb = (hsv_to_rgb(hsv) * 255).astype(np.uint32)
+        packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+        colors = np.char.mod('#%06x', packed).tolist()
         
         unique_clusters = sorted([c for c in self.df["cluster"].unique() if c != -1])
         self.color_map = {cluster: colors[i] for i, cluster in enumerate(unique_clusters)}
@@ -171,40 +481,199 @@ class EmbeddingVisualizer:
         
         return self
     
-    def format_hover_text(self, text, max_length=150):
-        """Format text for better readability in hover tooltips."""
-        text = ' '.join(text.split())
-        if len(text) <= max_length:
-            return text
-        truncated = text[:max_length].rsplit(' ', 1)[0]
-        return truncated + "..."
-    
-    def prepare_webgl_data(self, df_subset=None):
-        """Prepare data optimized for WebGL rendering with improved hover text."""
-        if df_subset is None:
-            df_subset = self.df
-        
-        hover_texts = []
-        for _, row in df_subset.iterrows():
-            formatted_text = self.format_hover_text(row["claim_text"], max_length=200)
-            hover_text = (
-                f"<b>Cluster {row['cluster']}</b><br>"
-                f"<b>Confidence:</b> {row['probability']:.3f}<br>"
-                f"<b>Outlier Score:</b> {row['outlier_score']:.3f}<br>"
-                f"<b>Source:</b> {row['source_file']}<br>"
-                f"<b>Index:</b> {row.name}<br>"
-                f"<hr>"
-                f"<b>Text:</b><br><i>{formatted_text}</i>"
-            )
-            hover_texts.append(hover_text)
-        
-        return hover_texts
+    def _hover_text_column(self, frame, max_length=200):
+        """Claim text for hover tooltips: whitespace collapsed, cut at a word boundary past max_length."""
+        text = frame["claim_text"].str.split().str.join(' ')
+        truncated = text.str.slice(0, max_length).str.rsplit(' ', n=1).str[0] + "..."
+        return text.where(text.str.len() <= max_length, truncated)
+
+    def prepare_webgl_customdata(self, frame=None):
+        """
+        Raw hover fields for HOVER_TEMPLATE. Plotly formats them in the browser, so no per-point
+        HTML strings are built in Python and numbers are not duplicated as text in the output.
+        """
+        if frame is None:
+            frame = self.get_plot_frame()
+        return np.column_stack([
+            frame["cluster"].to_numpy(),
+            frame["probability"].to_numpy(),
+            frame["outlier_score"].to_numpy(),
+            frame["source_file"].astype(str).to_numpy(),
+            frame.index.to_numpy(),
+            self._hover_text_column(frame).to_numpy()
+        ])
+
+    def quantize_coordinates(self, xy):
+        """
+        Map 2D coordinates onto int16 with one shared scale, keeping the aspect ratio.
+        Plotly embeds them as base64 int16 typed arrays: half the bytes of float32 and
+        still finer than screen resolution.
+        """
+        xy = np.asarray(xy, dtype=np.float64)
+        if len(xy) == 0:
+            return np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int16)
+        center = (xy.min(axis=0) + xy.max(axis=0)) / 2
+        half_range = np.abs(xy - center).max() or 1.0
+        q = np.rint((xy - center) * (32767 / half_range)).astype(np.int16)
+        return q[:, 0], q[:, 1]
+
+    def get_plot_frame(self):
+        """
+        Rows that are actually drawn. Above SAMPLING_THRESHOLD all clustered points are kept
+        and noise is downsampled to NOISE_SAMPLE_SIZE.
+        """
+        if getattr(self, '_plot_df', None) is None:
+            if self.n_samples > self.SAMPLING_THRESHOLD:
+                is_noise = self.df["cluster"] == -1
+                noise = self.df[is_noise]
+                if len(noise) > self.NOISE_SAMPLE_SIZE:
+                    noise = noise.sample(n=self.NOISE_SAMPLE_SIZE, random_state=self.random_state)
+                    print(f"✓ Sampled {len(noise):,} of {int(is_noise.sum()):,} noise points for plotting")
+                self._plot_df = pd.concat([self.df[~is_noise], noise]).sort_index()
+            else:
+                self._plot_df = self.df
+        return self._plot_df
+
+    def _build_tree_cache(self):
+        """
+        Convert the condensed tree to adjacency/size/lambda lookups once per clustering run;
+        both hierarchy exporters share the result.
+        """
+        if getattr(self, '_tree_cache', None) is not None:
+            return self._tree_cache
+
+        tree_df = self.clusterer.condensed_tree_.to_pandas()
+        children = tree_df['child'].values
+        cluster_map = getattr(getattr(self.clusterer, 'prediction_data_', None), 'cluster_map', None)
+        if cluster_map is not None:
+            # cluster_map also lists descendant nodes; only the last node recorded per label gets the link
+            cluster_id_to_node = {label: node for node, label in cluster_map.items()}
+        else:
+            # Backends without prediction data (cuML, fast_hdbscan, sparse graph): a label's selected
+            # node is the shallowest (lowest id) node that directly holds one of its points
+            labels = self.df["cluster"].to_numpy()
+            points = tree_df[tree_df['child'] < len(labels)]
+            point_labels = labels[points['child'].to_numpy()]
+            keep = point_labels != -1
+            cluster_id_to_node = (pd.Series(points['parent'].to_numpy()[keep])
+                                  .groupby(point_labels[keep]).min().to_dict())
+
+        self._tree_cache = {
+            'tree_df': tree_df,
+            'parent_children': tree_df.groupby('parent', sort=False)['child'].agg(list).to_dict(),
+            'node_sizes': dict(zip(children, tree_df['child_size'].values)),
+            'node_lambdas': dict(zip(children, tree_df['lambda_val'].values)),
+            'node_to_cluster': {node: label for label, node in cluster_id_to_node.items()},
+            'root_nodes': np.setdiff1d(tree_df['parent'].values, children)[::-1].tolist()
+        }
+        return self._tree_cache
+
+    def _traverse_hierarchy(self, text_buf=None, html_buf=None):
+        """
+        One iterative DFS over the condensed tree (nodes of size 1 hidden) that writes the text
+        outline to text_buf and the collapsible <ul> tree to html_buf; either sink may be None.
+        """
+        tree = self._build_tree_cache()
+        parent_children = tree['parent_children']
+        node_lambdas = tree['node_lambdas']
+        node_to_cluster = tree['node_to_cluster']
+        node_sizes_direct = tree['node_sizes']
+        memoized_sizes = {}
+        def get_node_size(node):
+            size = memoized_sizes.get(node)
+            if size is not None: return size
+            size = node_sizes_direct.get(node)
+            if size is not None: return size
+            if parent_children.get(node) is None: return 1
+            # Post-order walk with an explicit stack so deep trees cannot hit the recursion limit
+            stack = [node]
+            while stack:
+                current = stack[-1]
+                children = parent_children[current]
+                pending = [c for c in children
+                           if c not in memoized_sizes and c not in node_sizes_direct and c in parent_children]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                memoized_sizes[current] = sum(memoized_sizes.get(c, node_sizes_direct.get(c, 1))
+                                              for c in children)
+            return memoized_sizes[node]
+
+        def write_node_html(buf, node, size):
+            """Writes the <li> opening and node label; returns True if the node has visible children."""
+            lambda_val = node_lambdas.get(node, 0)
+            final_cluster_label = node_to_cluster.get(node)
+            children = parent_children.get(node)
+            has_visible_children = children is not None and any(get_node_size(child) > 1 for child in children)
+
+            buf.write(f'<li><div class="node-content" data-node-id="{int(node)}">')
+            buf.write(f'<span class="toggle">{ "[+]" if has_visible_children else " " }</span>')
+            buf.write('<span class="node-details">')
+            buf.write(f'<span class="node-id">Node {int(node)}</span>')
+            buf.write(f' | <span class="node-size">Size: {int(size)}</span>')
+            buf.write(f' | <span class="node-lambda">λ: {lambda_val:.4f}</span>')
+
+            if final_cluster_label is not None:
+                color = self.color_map.get(final_cluster_label, '#6c757d')
+                buf.write(f' &rarr; <a href="#cluster-{final_cluster_label}" class="final-cluster-node" style="border-color:{color}; color:{color};">Cluster {final_cluster_label}</a>')
+                keywords = self.cluster_descriptions.get(final_cluster_label, {}).get('keywords', [])
+                if keywords:
+                    keywords_preview = ", ".join(keywords[:3])
+                    buf.write(f'<span class="node-keywords"><i>- {escape(keywords_preview)}...</i></span>')
+
+            buf.write('</span></div>')
+            return has_visible_children
+
+        # Nodes are expanded in document order; HTML closing tags are pushed as plain strings
+        if html_buf is not None: html_buf.write("<ul>")
+        stack = [(root, 0) for root in reversed(tree['root_nodes'])]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                html_buf.write(item)
+                continue
+            node, level = item
+            size = get_node_size(node)
+            if size <= 1: continue
+            if text_buf is not None:
+                text_buf.write(f"{'  ' * level}└─ Node {int(node)} (size: {int(size)})\n")
+            if html_buf is not None:
+                if write_node_html(html_buf, node, size):
+                    html_buf.write('<ul class="collapsed">')
+                    stack.append("</ul></li>")
+                else:
+                    html_buf.write("</li>")
+            stack.extend((child, level + 1) for child in reversed(parent_children.get(node, ())))
+        if html_buf is not None: html_buf.write("</ul>")
+
+    def _render_hierarchy(self, text=True, html=True):
+        """Text outline and HTML tree of the hierarchy from a single traversal; empty without a condensed tree."""
+        if not hasattr(self.clusterer, 'condensed_tree_'):
+            return "", ""
+        text_buf = io.StringIO() if text else None
+        html_buf = io.StringIO() if html else None
+        try:
+            self._traverse_hierarchy(text_buf, html_buf)
+        except Exception as e:
+            if not text: raise
+            return f"Could not process cluster hierarchy. Reason: {e}\n", ""
+        return (text_buf.getvalue() if text else "", html_buf.getvalue() if html else "")
 
-    def export_hierarchical_clustering_results(self, output_path="hierarchical_clustering_results.txt"):
+    def export_hierarchy_reports(self, text_path="hierarchical_clustering_results.txt", html_path="hierarchical_report.html"):
+        """Write the text and HTML hierarchy reports from one shared walk of the condensed tree."""
+        if not hasattr(self, 'cluster_descriptions'): self.extract_cluster_keywords()
+        if not hasattr(self, 'color_map'): self.generate_cluster_colors()
+        hierarchy_text, hierarchy_html = self._render_hierarchy()
+        self.export_hierarchical_clustering_results(text_path, hierarchy_text=hierarchy_text)
+        self.export_hierarchical_report_html(html_path, hierarchy_html=hierarchy_html)
+
+    def export_hierarchical_clustering_results(self, output_path="hierarchical_clustering_results.txt", hierarchy_text=None):
         """Export detailed hierarchical clustering results to a text file."""
         print(f"Exporting hierarchical clustering results to {output_path}...")
         
         if not hasattr(self, 'cluster_descriptions'): self.extract_cluster_keywords()
+        if hierarchy_text is None: hierarchy_text = self._render_hierarchy(html=False)[0]
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write("="*80 + "\nHIERARCHICAL CLUSTERING ANALYSIS REPORT\n" + f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n" + "="*80 + "\n\n")
@@ -214,37 +683,22 @@ class EmbeddingVisualizer:
             f.write(f"Noise points: {self.n_noise:,} ({self.n_noise/self.n_samples*100:.2f}%)\n\n")
             f.write("CLUSTER HIERARCHY (from Condensed Tree)\n" + "-"*40 + "\n")
 
-            if hasattr(self.clusterer, 'condensed_tree_'):
-                try:
-                    tree_df = self.clusterer.condensed_tree_.to_pandas()
-                    parent_children = tree_df.groupby('parent')['child'].apply(list).to_dict()
-                    node_sizes = dict(zip(tree_df['child'], tree_df['child_size']))
-                    root_nodes = sorted(list(set(parent_children.keys()) - set(tree_df['child'])), reverse=True)
-
-                    def print_hierarchy_to_file(node, level=0):
-                        size = node_sizes.get(node, sum(node_sizes.get(c, 1) for c in parent_children.get(node, [])))
-                        if size > 1:
-                            f.write(f"{'  ' * level}└─ Node {int(node)} (size: {int(size)})\n")
-                            if node in parent_children:
-                                for child in parent_children[node]:
-                                    print_hierarchy_to_file(child, level + 1)
-                    for root in root_nodes: print_hierarchy_to_file(root)
-                except Exception as e:
-                    f.write(f"Could not process cluster hierarchy. Reason: {e}\n")
+            f.write(hierarchy_text)
             
             f.write("\n\nDETAILED CLUSTER INFORMATION\n" + "="*80 + "\n\n")
-            for cid in sorted(self.df[self.df["cluster"] != -1]["cluster"].unique()):
+            stats = self.get_cluster_stats()
+            for cid, size, avg_probability in zip(stats.index, stats["size"], stats["avg_probability"]):
+                if cid == -1: continue
                 f.write(f"CLUSTER {cid}\n" + "-"*40 + "\n")
-                data = self.df[self.df["cluster"] == cid]
                 desc = self.cluster_descriptions.get(cid, {})
-                f.write(f"Size: {len(data)} embeddings\n")
-                f.write(f"Avg. Confidence: {data['probability'].mean():.3f}\n")
+                f.write(f"Size: {size} embeddings\n")
+                f.write(f"Avg. Confidence: {avg_probability:.3f}\n")
                 if 'keywords' in desc: f.write(f"Top Keywords: {', '.join(desc['keywords'])}\n")
                 f.write("\n")
         
         print(f"✓ Hierarchical clustering text report saved to: {output_path}")
 
-    def export_hierarchical_report_html(self, output_path="hierarchical_report.html"):
+    def export_hierarchical_report_html(self, output_path="hierarchical_report.html", hierarchy_html=None):
         """
         Exports a beautiful, interactive, and English HTML report of the cluster hierarchy.
         Sample texts are now displayed as full semantic triples (Subject-Predicate-Object).
@@ -340,118 +794,75 @@ class EmbeddingVisualizer:
         </html>
         """
 
-        hierarchy_html = ""
-        if hasattr(self.clusterer, 'condensed_tree_'):
-            tree_df = self.clusterer.condensed_tree_.to_pandas()
-            parent_children = tree_df.groupby('parent')['child'].apply(list).to_dict()
-            node_data = tree_df.set_index('child').to_dict('index')
-            cluster_id_to_node = {label: node for node, label in self.clusterer.prediction_data_.cluster_map.items()}
-
-            node_sizes_direct = dict(zip(tree_df['child'], tree_df['child_size']))
-            memoized_sizes = {}
-            def get_node_size(node):
-                if node in memoized_sizes: return memoized_sizes[node]
-                if node in node_sizes_direct:
-                    size = node_sizes_direct[node]
-                    memoized_sizes[node] = size
-                    return size
-                if node in parent_children:
-                    size = sum(get_node_size(child) for child in parent_children[node])
-                    memoized_sizes[node] = size
-                    return size
-                return 1
-
-            def build_hierarchy_html(node, level=0):
-                size = get_node_size(node)
-                if size <= 1: return ""
-                
-                html = "<li>"
-                is_parent = node in parent_children
-                lambda_val = node_data.get(node, {}).get('lambda_val', 0)
-                final_cluster_label = next((cid for cid, nid in cluster_id_to_node.items() if nid == node), None)
-
-                node_content_html = f'<div class="node-content" data-node-id="{int(node)}">'
-                has_visible_children = is_parent and any(get_node_size(child) > 1 for child in parent_children[node])
-                node_content_html += f'<span class="toggle">{ "[+]" if has_visible_children else " " }</span>'
-                node_content_html += '<span class="node-details">'
-                node_content_html += f'<span class="node-id">Node {int(node)}</span>'
-                node_content_html += f' | <span class="node-size">Size: {int(size)}</span>'
-                node_content_html += f' | <span class="node-lambda">λ: {lambda_val:.4f}</span>'
-                
-                if final_cluster_label is not None:
-                    color = self.color_map.get(final_cluster_label, '#6c757d')
-                    node_content_html += f' &rarr; <a href="#cluster-{final_cluster_label}" class="final-cluster-node" style="border-color:{color}; color:{color};">Cluster {final_cluster_label}</a>'
-                    keywords = self.cluster_descriptions.get(final_cluster_label, {}).get('keywords', [])
-                    if keywords:
-                        keywords_preview = ", ".join(keywords[:3])
-                        node_content_html += f'<span class="node-keywords"><i>- {escape(keywords_preview)}...</i></span>'
-                
-                node_content_html += '</span></div>'
-                html += node_content_html
-                
-                if has_visible_children:
-                    child_html = "".join(build_hierarchy_html(child, level + 1) for child in parent_children[node])
-                    if child_html: html += f'<ul class="collapsed">{child_html}</ul>'
-                html += "</li>"
-                return html
-
-            root_nodes = sorted(list(set(parent_children.keys()) - set(tree_df['child'])), reverse=True)
-            hierarchy_html = "<ul>" + "".join(build_hierarchy_html(root) for root in root_nodes) + "</ul>"
+        if hierarchy_html is None: hierarchy_html = self._render_hierarchy(text=False)[1]
 
         # *** MODIFIED: Generate rich HTML for each sample row as a semantic triple ***
-        clusters_html = ""
-        sorted_clusters = sorted(self.df[self.df["cluster"] != -1]["cluster"].unique())
+        # Cards and samples are written into one buffer instead of repeated string +=
+        buf = io.StringIO()
+        avg_probability = self.get_cluster_stats()["avg_probability"]
+        sorted_clusters = [c for c in avg_probability.index if c != -1]
         for cid in sorted_clusters:
             desc = self.cluster_descriptions.get(cid, {})
-            data = self.df[self.df["cluster"] == cid]
             color = self.color_map.get(cid, '#6c757d')
 
             keywords_html = "".join(f'<span>{escape(kw)}</span>' for kw in desc.get('keywords', []))
-            
-            samples_html = '<div class="samples-container">'
+
+            buf.write(f"""
+            <div class="cluster-card" id="cluster-{cid}">
+                <h3 style="border-color: {color};">Cluster {cid}</h3>
+                <p><b>Size:</b> {desc.get('size', 0):,} | <b>Avg. Confidence:</b> {avg_probability[cid]:.3f}</p>
+                <div class="keywords"><b>Keywords:</b> {keywords_html}</div>
+                <div><b>Sample Triples (Top 5 by Confidence):</b>""")
+
+            buf.write('<div class="samples-container">')
             for row in desc.get('sample_rows', []):
-                claim = escape(str(row.get('claim_text', 'N/A')))
+                claim = row.get('_ct', 'N/A')
+                source = row.get('_sf', 'N/A')
 
-                samples_html += f"""
+                buf.write(f"""
                 <div class="sample-item">
                     <div class="sample-triple">
                         <span class="part claim">"{claim}"</span>
                     </div>
                     <div class="sample-meta">
-                        <span><span class="meta-label">Source:</span> {escape(str(row.get('source_file', 'N/A')))}</span>
+                        <span><span class="meta-label">Source:</span> {source}</span>
                         <span><span class="meta-label">Index:</span> {row.get('index', 'N/A')}</span>
                         <span><span class="meta-label">Confidence:</span> {row.get('probability', 0.0):.3f}</span>
                         <span><span class="meta-label">Outlier Score:</span> {row.get('outlier_score', 0.0):.3f}</span>
                     </div>
                 </div>
-                """
-            samples_html += '</div>'
+                """)
+            buf.write('</div>')
 
-            clusters_html += f"""
-            <div class="cluster-card" id="cluster-{cid}">
-                <h3 style="border-color: {color};">Cluster {cid}</h3>
-                <p><b>Size:</b> {desc.get('size', 0):,} | <b>Avg. Confidence:</b> {data['probability'].mean():.3f}</p>
-                <div class="keywords"><b>Keywords:</b> {keywords_html}</div>
-                <div><b>Sample Triples (Top 5 by Confidence):</b>{samples_html}</div>
+            buf.write("""</div>
             </div>
-            """
-        
-        final_html = html_template.format(
-            datetime_now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            n_samples=self.n_samples,
-            n_clusters=self.n_clusters,
-            n_noise=self.n_noise,
-            noise_ratio=self.n_noise / self.n_samples if self.n_samples > 0 else 0,
-            hierarchy_html=hierarchy_html,
-            clusters_html=clusters_html
-        )
+            """)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(final_html)
+        # Only the small scaffold is formatted; the tree and cluster cards are written between its pieces
+        scaffold = html_template.format_map({
+            'datetime_now': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'n_samples': self.n_samples,
+            'n_clusters': self.n_clusters,
+            'n_noise': self.n_noise,
+            'noise_ratio': self.n_noise / self.n_samples if self.n_samples > 0 else 0,
+            'hierarchy_html': "\0",
+            'clusters_html': "\0"
+        })
+        prefix, middle, suffix = scaffold.split("\0")
+
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(prefix)
+            f.write(hierarchy_html)
+            f.write(middle)
+            f.write(buf.getvalue())
+            f.write(suffix)
         print(f"✓ Interactive English HTML report saved to: {output_path}")
 
-    def create_interactive_cluster_report(self, output_path="cluster_analysis_report.html"):
-        """Creates an interactive HTML report with cluster analysis."""
+    def create_interactive_cluster_report(self, output_path="cluster_analysis_report.html", auto_open=False, include_plotlyjs="cdn"):
+        """
+        Creates an interactive HTML report with cluster analysis.
+        plotly.js is loaded from the CDN by default; pass include_plotlyjs=True for an offline file.
+        """
         print(f"Creating interactive cluster report...")
         if not hasattr(self, 'color_map'): self.generate_cluster_colors()
         if not hasattr(self, 'cluster_descriptions'): self.extract_cluster_keywords()
@@ -462,19 +873,20 @@ class EmbeddingVisualizer:
             specs=[[{"type": "bar"}, {"type": "box"}],
                    [{"type": "violin"}, {"type": "bar"}]])
         
-        cluster_sizes = self.df["cluster"].value_counts().sort_index()
+        cluster_sizes = self.get_cluster_stats()["size"]
         fig.add_trace(go.Bar(
             x=[f"C{i}" if i != -1 else "Noise" for i in cluster_sizes.index],
             y=cluster_sizes.values, text=cluster_sizes.values, textposition='auto',
             marker_color=[self.color_map.get(i, '#cccccc') for i in cluster_sizes.index]
         ), row=1, col=1)
         
-        for cid in sorted(self.df["cluster"].unique()):
+        probabilities = self._split_by_cluster("probability")
+        outlier_scores = self._split_by_cluster("outlier_score")
+        for cid in cluster_sizes.index:
             if cid == -1: continue
-            cluster_data = self.df[self.df["cluster"] == cid]
-            fig.add_trace(go.Box(y=cluster_data["probability"], name=f"C{cid}",
+            fig.add_trace(go.Box(y=probabilities[cid], name=f"C{cid}",
                                  marker_color=self.color_map[cid], showlegend=False), row=1, col=2)
-            fig.add_trace(go.Violin(y=cluster_data["outlier_score"], name=f"C{cid}",
+            fig.add_trace(go.Violin(y=outlier_scores[cid], name=f"C{cid}",
                                     marker_color=self.color_map[cid], showlegend=False), row=2, col=1)
         
         top_sources = self.df["source_file"].value_counts().head(10)
@@ -482,12 +894,15 @@ class EmbeddingVisualizer:
                              marker_color='lightblue'), row=2, col=2)
 
         fig.update_layout(title_text="Cluster Analysis Report", height=1000, showlegend=False)
-        fig.write_html(output_path, auto_open=True)
+        fig.write_html(output_path, auto_open=auto_open, include_plotlyjs=include_plotlyjs, validate=False)
         print(f"✓ Interactive report saved to: {output_path}")
         return fig
 
-    def create_beautiful_visualization(self, output_path="enhanced_clustering.html"):
-        """Creates a multi-layered, interactive visualization using WebGL."""
+    def create_beautiful_visualization(self, output_path="enhanced_clustering.html", auto_open=False, include_plotlyjs="cdn"):
+        """
+        Creates a multi-layered, interactive visualization using WebGL.
+        plotly.js is loaded from the CDN by default; pass include_plotlyjs=True for an offline file.
+        """
         print("Creating WebGL-accelerated visualization...")
         start_time = time.time()
         
@@ -497,27 +912,36 @@ class EmbeddingVisualizer:
         fig = make_subplots(rows=1, cols=2, column_widths=[0.7, 0.3],
             specs=[[{"type": "scattergl"}, {"type": "bar"}]])
         
-        for cluster_id in sorted(self.df["cluster"].unique()):
-            cluster_df = self.df[self.df["cluster"] == cluster_id]
-            hover_texts = self.prepare_webgl_data(cluster_df)
-            
-            if cluster_id == -1:
-                name = "Noise"
-                marker_dict = dict(size=3, color='#cccccc', symbol='x', opacity=0.3)
-            else:
-                desc = self.cluster_descriptions.get(cluster_id, {})
-                kw = desc.get('keywords', [])
-                name = f"C{cluster_id}: {', '.join(kw)[:30]}..."
-                marker_dict = dict(size=6, color=self.color_map[cluster_id], opacity=0.8, line=dict(width=0))
+        # One Scattergl trace for all points (a single WebGL draw call); per-point styling via arrays
+        plot_df = self.get_plot_frame()
+        labels = plot_df["cluster"].to_numpy()
+        is_noise = labels == -1
+        x_q, y_q = self.quantize_coordinates(plot_df[["x_norm", "y_norm"]].to_numpy())
+        fig.add_trace(go.Scattergl(
+            x=x_q, y=y_q, mode="markers",
+            marker=dict(
+                size=np.where(is_noise, 3, 6).astype(np.uint8),
+                color=plot_df["cluster"].map(self.color_map).to_numpy(),
+                symbol=np.where(is_noise, 'x', 'circle'),
+                opacity=np.where(is_noise, 0.3, 0.8).astype(np.float32),
+                line=dict(width=0)
+            ),
+            customdata=self.prepare_webgl_customdata(plot_df), hovertemplate=HOVER_TEMPLATE,
+            showlegend=False
+        ), row=1, col=1)
 
+        # Empty traces only provide the legend entries
+        for cluster_id in sorted(c for c in plot_df["cluster"].unique() if c != -1):
+            desc = self.cluster_descriptions.get(cluster_id, {})
+            kw = desc.get('keywords', [])
             fig.add_trace(go.Scattergl(
-                x=cluster_df["x_norm"], y=cluster_df["y_norm"], mode="markers",
-                name=name, marker=marker_dict, text=hover_texts,
-                hovertemplate="%{text}<extra></extra>",
-                showlegend=bool(cluster_id != -1)
+                x=[None], y=[None], mode="markers",
+                name=f"C{cluster_id}: {', '.join(kw)[:30]}...",
+                marker=dict(size=6, color=self.color_map[cluster_id], opacity=0.8, line=dict(width=0)),
+                hoverinfo="skip", showlegend=True
             ), row=1, col=1)
-            
-        cluster_counts = self.df["cluster"].value_counts().sort_index()
+
+        cluster_counts = self.get_cluster_stats()["size"]
         fig.add_trace(go.Bar(
             x=[f"C{i}" if i != -1 else "Noise" for i in cluster_counts.index],
             y=cluster_counts.values, marker_color=[self.color_map[i] for i in cluster_counts.index],
@@ -529,68 +953,204 @@ class EmbeddingVisualizer:
                           height=800, width=1600, hovermode='closest',
                           legend=dict(yanchor="top", y=0.99, xanchor="left", x=1.01))
         fig.update_yaxes(scaleanchor="x", scaleratio=1, row=1, col=1)
+        # Quantized UMAP coordinates have no meaningful units
+        fig.update_xaxes(showticklabels=False, row=1, col=1)
+        fig.update_yaxes(showticklabels=False, row=1, col=1)
 
         config = {'scrollZoom': True, 'displaylogo': False}
-        fig.write_html(output_path, auto_open=True, config=config)
+        fig.write_html(output_path, auto_open=auto_open, config=config, include_plotlyjs=include_plotlyjs, validate=False)
         
         elapsed = time.time() - start_time
         print(f"✓ Visualization created in {elapsed:.1f} seconds. Output: {output_path}")
         return fig
 
-def optimize_clustering_parameters(parquet_path, target_clusters_range=(50, 100)):
+def _glosh_scores(condensed_tree, n_points):
+    """GLOSH outlier scores from a condensed tree, for backends that do not provide outlier_scores_."""
+    try:
+        from hdbscan._hdbscan_tree import outlier_scores
+        return outlier_scores(condensed_tree._raw_tree)
+    except Exception as e:
+        print(f"Could not compute outlier scores ({e}); leaving them empty")
+        return np.full(n_points, np.nan)
+
+try:
+    from numba import njit
+
+    @njit
+    def _label_counts(labels):
+        n_noise = 0
+        max_label = -1
+        for label in labels:
+            if label > max_label:
+                max_label = label
+        seen = np.zeros(max_label + 1, dtype=np.bool_)
+        n_clusters = 0
+        for label in labels:
+            if label < 0:
+                n_noise += 1
+            elif not seen[label]:
+                seen[label] = True
+                n_clusters += 1
+        return n_clusters, n_noise
+except ImportError:
+    def _label_counts(labels):
+        n_noise = int(np.count_nonzero(labels < 0))
+        return int(np.count_nonzero(np.bincount(labels[labels >= 0]))), n_noise
+
+def _score_labels(labels):
+    """Number of clusters and noise ratio of an HDBSCAN label array, in one pass over the labels."""
+    labels = np.ascontiguousarray(labels, dtype=np.int64)
+    n_clusters, n_noise = _label_counts(labels)
+    return int(n_clusters), n_noise / len(labels)
+
+def _eval_params(XY_normalized, min_cluster_size, min_samples):
+    """
+    Worker for the parallel parameter sweep: fits HDBSCAN once and returns the result row,
+    including the cluster_embeddings backend ("fast" or "cpu") that gives the same labels.
+    """
+    try:
+        import fast_hdbscan
+        clusterer = fast_hdbscan.HDBSCAN(min_cluster_size=min_cluster_size, min_samples=min_samples,
+                                         cluster_selection_method="eom")
+        backend = "fast"
+    except ImportError:
+        clusterer = hdbscan.HDBSCAN(min_cluster_size=min_cluster_size, min_samples=min_samples,
+                                    metric="euclidean", cluster_selection_method="eom", core_dist_n_jobs=1)
+        backend = "cpu"
+    n_clusters, noise_ratio = _score_labels(clusterer.fit(XY_normalized).labels_)
+    return {
+        'min_cluster_size': min_cluster_size, 'min_samples': min_samples,
+        'n_clusters': n_clusters, 'noise_ratio': noise_ratio, 'backend': backend
+    }
+
+@functools.lru_cache(maxsize=4)
+def _cached_reduction(parquet_key, n_neighbors, min_dist):
+    viz = EmbeddingVisualizer(parquet_key[0])
+    viz.reduce_dimensions(n_neighbors=n_neighbors, min_dist=min_dist)
+    return viz
+
+def get_reduced_visualizer(parquet_path, n_neighbors=30, min_dist=0.1):
+    """
+    Load the parquet file and run UMAP once per (file, n_neighbors, min_dist).
+    The file's path, mtime and size stand in for a data hash, so an edited file is reduced again.
+    """
+    stat = os.stat(parquet_path)
+    parquet_key = (os.path.abspath(parquet_path), stat.st_mtime_ns, stat.st_size)
+    return _cached_reduction(parquet_key, n_neighbors, min_dist)
+
+def _run_sweep(data_hash, XY_normalized, grid, reuse_mst, shared_min_samples, n_jobs):
+    """
+    Evaluate every (min_cluster_size, min_samples) pair in grid and return the result rows.
+    Each row names the cluster_embeddings backend that reproduces its labels: the shared MST
+    comes from the reference hdbscan ("cpu"); refitted rows say which library _eval_params used.
+    data_hash identifies XY_normalized for the disk cache, which ignores the array itself.
+    """
+    single_linkage_tree = None
+    if reuse_mst:
+        try:
+            from hdbscan.hdbscan_ import _tree_to_labels
+            start_time = time.time()
+            base_clusterer = hdbscan.HDBSCAN(min_samples=shared_min_samples, core_dist_n_jobs=-1)
+            base_clusterer.fit(XY_normalized)
+            single_linkage_tree = base_clusterer.single_linkage_tree_.to_numpy()
+            print(f"✓ Built shared MST (min_samples={shared_min_samples}) in {time.time() - start_time:.1f} seconds")
+        except Exception as e:
+            print(f"Could not reuse the MST ({e}), refitting HDBSCAN for every candidate")
+            single_linkage_tree = None
+
+    if single_linkage_tree is not None:
+        param_results = []
+        for min_cluster_size, _ in grid:
+            labels = _tree_to_labels(None, single_linkage_tree, min_cluster_size=min_cluster_size,
+                                     cluster_selection_method="eom")[0]
+            n_clusters, noise_ratio = _score_labels(labels)
+            param_results.append({
+                'min_cluster_size': min_cluster_size, 'min_samples': shared_min_samples,
+                'n_clusters': n_clusters, 'noise_ratio': noise_ratio, 'backend': "cpu"
+            })
+    else:
+        # Independent grid points run in parallel worker processes, one core each
+        print(f"Evaluating {len(grid)} parameter combinations in parallel (n_jobs={n_jobs})...")
+        param_results = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(_eval_params)(XY_normalized, mcs, ms) for mcs, ms in grid
+        )
+    return param_results
+
+# Sweep results survive between runs; keyed by the embedding hash and grid, not the (large) array
+_SWEEP_MEMORY = Memory(location=os.path.join(".cache", "medorah"), verbose=0)
+_cached_sweep = _SWEEP_MEMORY.cache(_run_sweep, ignore=["XY_normalized", "n_jobs"])
+
+def optimize_clustering_parameters(parquet_path, target_clusters_range=(50, 100), reuse_mst=True, shared_min_samples=5,
+                                   n_jobs=-1, min_cluster_size_values=(20, 30, 40, 50, 75, 100, 150, 200),
+                                   min_samples_values=None, viz=None, use_cache=True):
     """
     Helper function to find optimal clustering parameters efficiently.
+    With reuse_mst (the default, when min_samples_values is None) the mutual-reachability MST is
+    built once and each min_cluster_size only re-condenses that tree, so every candidate - and the
+    returned result - has min_samples=shared_min_samples (5) rather than max(5, size // 2).
+    Otherwise every grid point is refitted with joblib across n_jobs processes; the grid is
+    min_cluster_size_values x min_samples_values, or each size paired with max(5, size // 2)
+    when min_samples_values is None.
+    The result also carries 'backend'; pass it to cluster_embeddings (or visualize_embeddings)
+    so the final fit runs on the same HDBSCAN implementation as the sweep.
+    use_cache: reuse sweep results stored under .cache/medorah for the same 2D embedding and grid.
     """
     print("Finding optimal clustering parameters...")
     
-    base_viz = EmbeddingVisualizer(parquet_path)
-    base_viz.reduce_dimensions(n_neighbors=30, min_dist=0.1)
-    
-    param_results = []
-    
-    for min_cluster_size in [20, 30, 40, 50, 75, 100, 150, 200]:
-        min_samples = max(5, min_cluster_size // 2)
-        
-        viz_test = EmbeddingVisualizer()
-        viz_test.random_state = base_viz.random_state
-        viz_test.df = base_viz.df.copy()
-        viz_test.n_samples = base_viz.n_samples
-        viz_test.XY_normalized = base_viz.XY_normalized
-        
-        viz_test.cluster_embeddings(min_cluster_size=min_cluster_size, min_samples=min_samples)
-        
-        result = {
-            'min_cluster_size': min_cluster_size, 'min_samples': min_samples,
-            'n_clusters': viz_test.n_clusters, 'noise_ratio': viz_test.n_noise / len(viz_test.df)
-        }
-        param_results.append(result)
-        
-        print(f"Params: size={min_cluster_size}, samples={min_samples} -> "
+    # UMAP settings are fixed across the sweep, so the 2D embedding is computed once and shared
+    base_viz = viz if viz is not None else get_reduced_visualizer(parquet_path, n_neighbors=30, min_dist=0.1)
+
+    if min_samples_values is not None:
+        grid = list(itertools.product(min_cluster_size_values, min_samples_values))
+    else:
+        grid = [(mcs, max(5, mcs // 2)) for mcs in min_cluster_size_values]
+
+    data_hash = hashlib.sha1(np.ascontiguousarray(base_viz.XY_normalized).tobytes()).hexdigest()
+    paired = min_samples_values is None
+    sweep_args = (data_hash, base_viz.XY_normalized, grid, reuse_mst and paired, shared_min_samples, n_jobs)
+    if use_cache and _cached_sweep.check_call_in_cache(*sweep_args):
+        print(f"✓ Loaded sweep results from cache ({data_hash[:12]})")
+    param_results = _cached_sweep(*sweep_args) if use_cache else _run_sweep(*sweep_args)
+
+    n_clusters_arr = np.fromiter((r['n_clusters'] for r in param_results), dtype=np.int64, count=len(param_results))
+    in_range = (n_clusters_arr >= target_clusters_range[0]) & (n_clusters_arr <= target_clusters_range[1])
+    # Report the grid up to the first candidate inside the target range, as the sequential sweep did
+    n_report = int(np.argmax(in_range)) + 1 if in_range.any() else len(param_results)
+    for result in param_results[:n_report]:
+        print(f"Params: size={result['min_cluster_size']}, samples={result['min_samples']} -> "
               f"Clusters: {result['n_clusters']}, Noise: {result['noise_ratio']:.1%}")
-        
-        if target_clusters_range[0] <= result['n_clusters'] <= target_clusters_range[1]:
-            print(f"\n✓ Found good parameters within target range: {result}")
-            return result
+
+    if in_range.any():
+        result = param_results[n_report - 1]
+        print(f"\n✓ Found good parameters within target range: {result}")
+        return result
     
-    best_params = min(param_results, key=lambda x: abs(x['n_clusters'] - sum(target_clusters_range)/2))
+    best_params = param_results[int(np.argmin(np.abs(n_clusters_arr - sum(target_clusters_range) / 2)))]
     print(f"\n✓ Best parameters found outside range: {best_params}")
     return best_params
 
 def visualize_embeddings(parquet_path, min_cluster_size, min_samples,
                          export_hierarchy_text=True, 
                          export_hierarchy_html=True, 
-                         create_report=True):
-    """Complete pipeline for beautiful embedding visualization with WebGL."""
-    viz = EmbeddingVisualizer(parquet_path)
-    viz.reduce_dimensions(n_neighbors=30, min_dist=0.1)
-    viz.cluster_embeddings(min_cluster_size=min_cluster_size, min_samples=min_samples)
+                         create_report=True,
+                         pre_reduced_viz=None,
+                         backend="auto"):
+    """Complete pipeline for beautiful embedding visualization with WebGL.
+    Pass pre_reduced_viz (e.g. from get_reduced_visualizer) to skip loading and UMAP, and the
+    'backend' from optimize_clustering_parameters to cluster exactly as the sweep did."""
+    if pre_reduced_viz is not None:
+        viz = pre_reduced_viz
+    else:
+        viz = get_reduced_visualizer(parquet_path, n_neighbors=30, min_dist=0.1)
+    viz.cluster_embeddings(min_cluster_size=min_cluster_size, min_samples=min_samples, backend=backend)
     
     viz.create_beautiful_visualization("enhanced_clustering.html")
     
-    if export_hierarchy_text:
+    if export_hierarchy_text and export_hierarchy_html:
+        viz.export_hierarchy_reports("hierarchical_clustering_results.txt", "hierarchical_report.html")
+    elif export_hierarchy_text:
         viz.export_hierarchical_clustering_results("hierarchical_clustering_results.txt")
-    
-    if export_hierarchy_html:
+    elif export_hierarchy_html:
         viz.export_hierarchical_report_html("hierarchical_report.html")
 
     if create_report:
@@ -604,7 +1164,9 @@ if __name__ == "__main__":
     
     try:
         print("=== Step 1: Parameter Optimization ===")
-        optimal_params = optimize_clustering_parameters(PARQUET, target_clusters_range=(40, 60))
+        reduced_viz = get_reduced_visualizer(PARQUET, n_neighbors=30, min_dist=0.1)
+        optimal_params = optimize_clustering_parameters(PARQUET, target_clusters_range=(40, 60), viz=reduced_viz,
+                                                        use_cache="--no-cache" not in sys.argv)
         
         print("\n=== Step 2: Creating Final Visualizations with Optimal Parameters ===")
         viz = visualize_embeddings(
@@ -613,7 +1175,9 @@ if __name__ == "__main__":
             min_samples=optimal_params['min_samples'],
             export_hierarchy_text=True,
             export_hierarchy_html=True,
-            create_report=True
+            create_report=True,
+            pre_reduced_viz=reduced_viz,
+            backend=optimal_params.get('backend', 'auto')
         )
         # *** 在这里添加诊断代码 ***
         print("\n=== DIAGNOSTIC CHECK: DataFrame Columns ===")
@@ -11,19 +11,25 @@
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import hdbscan
 import umap.umap_ as umap
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.io as pio
-from sklearn.preprocessing import StandardScaler
 from collections import Counter
 import re
+import os
+import json
+import hashlib
 import warnings
 import time
 from datetime import datetime
 from html import escape
 from tqdm.auto import tqdm
+from joblib import Parallel, delayed
 from typing import List, Dict
 
 # --- Configuration ---
@@ -36,11 +42,13 @@ class EmbeddingVisualizer:
     """
     Core class for embedding processing, clustering, and visualization.
     """
+    GPU_UMAP_MIN_SAMPLES = 10000
+    UMAP_CACHE_DIR = ".umap_cache"
+
     def __init__(self, parquet_path: str = None, random_state: int = 42):
         self.random_state = random_state
         if parquet_path:
-            self.df = pd.read_parquet(parquet_path)
-            self.X = np.vstack(self.df["predicate_embedding"].values)
+            self.df, self.X = self._load_parquet(parquet_path)
             self.n_samples = len(self.df)
             print(f"Loaded {self.n_samples:,} embeddings from {parquet_path}")
         else:
@@ -48,23 +56,132 @@ class EmbeddingVisualizer:
             self.X = np.array([])
             self.n_samples = 0
 
-    def reduce_dimensions(self, n_neighbors: int = 15, n_components: int =30, min_dist: float = 0.1, metric: str = "cosine") -> 'EmbeddingVisualizer':
-        """Apply UMAP dimensionality reduction."""
+    def _load_parquet(self, parquet_path: str, embedding_col: str = "predicate_embedding",
+                      data_columns: tuple = ("predicate_text", "subject_text", "object_text", "source_file")) -> tuple:
+        """
+        Read the Parquet file with pyarrow (memory-mapped), pruned to the embedding and the text
+        columns. The embedding column is turned straight into a float32 matrix from the Arrow
+        buffer and never boxed into pandas; the remaining columns become the dataframe.
+        """
+        schema_names = pq.read_schema(parquet_path).names
+        columns = [embedding_col] + [c for c in data_columns if c in schema_names]
+        table = pq.read_table(parquet_path, columns=columns, memory_map=True, use_pandas_metadata=True)
+        embeddings = table.column(embedding_col).combine_chunks()
+        n_rows = len(embeddings)
+        if pa.types.is_fixed_size_list(embeddings.type) and embeddings.null_count == 0:
+            # Fixed-width vectors: the child buffer already is the (N, D) matrix
+            dim = embeddings.type.list_size
+            flat = embeddings.values.to_numpy(zero_copy_only=False)
+            X = flat[embeddings.offset * dim:][:n_rows * dim].reshape(n_rows, dim)
+        else:
+            lengths = pc.list_value_length(embeddings).to_numpy(zero_copy_only=False)
+            if n_rows == 0 or not (lengths == lengths[0]).all():
+                raise ValueError(f"'{embedding_col}' must hold one equal-length vector per row.")
+            X = embeddings.flatten().to_numpy(zero_copy_only=False).reshape(n_rows, -1)
+        # One contiguous, writeable float32 block: Arrow buffers are read-only and numba's
+        # pynndescent kernels reject read-only arrays, so those are copied exactly once here
+        X = np.require(X, dtype=np.float32, requirements=["C", "W"])
+
+        # self_destruct frees each Arrow column as soon as it is converted
+        df = table.drop_columns([embedding_col]).to_pandas(self_destruct=True, split_blocks=True)
+        del table
+        return df, X
+
+    def reduce_dimensions(self, n_neighbors: int = 15, n_components: int =30, min_dist: float = 0.1, metric: str = "cosine",
+                          backend: str = "auto", use_cache: bool = True) -> 'EmbeddingVisualizer':
+        """
+        Apply UMAP dimensionality reduction.
+        backend: "auto" uses RAPIDS cuML on GPU for GPU_UMAP_MIN_SAMPLES+ points when installed,
+        "gpu" requires it, "cpu" forces umap-learn.
+        use_cache: reuse the 2D embedding stored under UMAP_CACHE_DIR for the same input and parameters.
+        """
         print(f"\nReducing {self.X.shape[0]:,} embeddings from {self.X.shape[1]}D to 2D...")
         start_time = time.time()
-        self.reducer = umap.UMAP(
-            n_neighbors=n_neighbors, min_dist=min_dist, metric=metric,
-            n_components=n_components, init="spectral", random_state=self.random_state,
-            n_jobs=-1, low_memory=self.n_samples > 100000
-        )
-        self.XY = self.reducer.fit_transform(self.X)
+        # UMAP's numba kernels run on float32 directly; only copies if self.X was assigned another dtype
+        X = np.ascontiguousarray(self.X, dtype=np.float32)
+        cache_path = None
+        if use_cache:
+            cache_path = self._umap_cache_path(X, {"n_neighbors": n_neighbors, "n_components": n_components,
+                                                   "min_dist": min_dist, "metric": metric,
+                                                   "random_state": self.random_state, "backend": backend})
+        self.XY = None
+        if cache_path is not None and os.path.exists(cache_path):
+            self.XY = np.load(cache_path)["XY"]
+            print(f"✓ Loaded cached UMAP embedding from {cache_path}")
+        elif backend == "gpu" or (backend == "auto" and len(X) >= self.GPU_UMAP_MIN_SAMPLES):
+            self.XY = self._reduce_on_gpu(X, n_neighbors, n_components, min_dist, metric, required=backend == "gpu")
+        if self.XY is None:
+            self.reducer = umap.UMAP(
+                n_neighbors=n_neighbors, min_dist=min_dist, metric=metric,
+                n_components=n_components, init="spectral", random_state=self.random_state,
+                n_jobs=-1, low_memory=self.n_samples > 100000,
+                precomputed_knn=self._get_knn(X, n_neighbors, metric) if len(X) >= 4096 else (None, None, None)
+            )
+            self.XY = self.reducer.fit_transform(X)
+        if cache_path is not None and not os.path.exists(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            np.savez(cache_path, XY=self.XY)
         self.df["x"], self.df["y"] = self.XY[:, 0], self.XY[:, 1]
-        scaler = StandardScaler()
-        self.XY_normalized = scaler.fit_transform(self.XY)
+        # Same result as StandardScaler (float64 statistics), but one output buffer scaled in place
+        mean = self.XY.mean(axis=0, dtype=np.float64)
+        std = self.XY.std(axis=0, dtype=np.float64)
+        std[std == 0] = 1.0
+        self.XY_normalized = np.subtract(self.XY, mean.astype(self.XY.dtype))
+        self.XY_normalized /= std.astype(self.XY.dtype)
         self.df["x_norm"], self.df["y_norm"] = self.XY_normalized[:, 0], self.XY_normalized[:, 1]
         print(f"✓ UMAP completed in {time.time() - start_time:.1f} seconds.")
         return self
 
+    def _umap_cache_path(self, X: np.ndarray, params: Dict) -> str:
+        """Cache file for a UMAP result, named by a blake2b hash of the input matrix and parameters."""
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(np.ascontiguousarray(X))
+        digest.update(json.dumps({"shape": list(X.shape), "dtype": str(X.dtype), **params}, sort_keys=True).encode())
+        return os.path.join(self.UMAP_CACHE_DIR, f"{digest.hexdigest()}.npz")
+
+    def _reduce_on_gpu(self, X: np.ndarray, n_neighbors: int, n_components: int, min_dist: float, metric: str,
+                       required: bool = False):
+        """cuML UMAP with on-device NN-descent; returns None (CPU fallback) when RAPIDS is unavailable."""
+        try:
+            from cuml.manifold import UMAP as cuUMAP
+            self.reducer = cuUMAP(
+                n_neighbors=n_neighbors, n_components=n_components, min_dist=min_dist, metric=metric,
+                init="spectral", build_algo="nn_descent", random_state=self.random_state
+            )
+            XY = np.asarray(self.reducer.fit_transform(X))
+            print("✓ Using cuML GPU UMAP")
+            return XY
+        except Exception as e:
+            if required:
+                raise
+            print(f"GPU UMAP unavailable ({type(e).__name__}), falling back to CPU umap-learn")
+            return None
+
+    def _get_knn(self, X: np.ndarray, n_neighbors: int, metric: str) -> tuple:
+        """
+        NN-descent kNN graph of the UMAP input, cached on the instance so that re-running
+        reduce_dimensions with other min_dist/n_components (same or fewer neighbours) skips the search.
+        """
+        cache = getattr(self, "_knn_cache", None)
+        if cache is None or cache["metric"] != metric or cache["k"] < n_neighbors or cache["n"] != len(X):
+            from umap.umap_ import nearest_neighbors
+            from sklearn.utils import check_random_state
+            start_time = time.time()
+            indices, distances, search_index = nearest_neighbors(
+                X, n_neighbors, metric, {}, False, check_random_state(self.random_state),
+                low_memory=self.n_samples > 100000,
+                n_jobs=1 if self.random_state is not None else -1
+            )
+            cache = self._knn_cache = {"metric": metric, "k": n_neighbors, "n": len(X),
+                                       "indices": indices, "distances": distances, "search_index": search_index}
+            print(f"✓ Built {n_neighbors}-NN graph in {time.time() - start_time:.1f} seconds")
+        else:
+            print(f"✓ Reusing cached {cache['k']}-NN graph")
+        # UMAP masks disconnected edges in place, so it gets copies
+        return (cache["indices"][:, :n_neighbors].copy(),
+                cache["distances"][:, :n_neighbors].copy(),
+                cache["search_index"])
+
     def cluster_embeddings(self, min_cluster_size: int, min_samples: int) -> 'EmbeddingVisualizer':
         """Apply HDBSCAN clustering with final chosen parameters."""
         print(f"\nClustering with final parameters: min_cluster_size={min_cluster_size}, min_samples={min_samples}...")
@@ -77,8 +194,10 @@ class EmbeddingVisualizer:
         self.clusterer.fit(self.XY_normalized)
         self.df["cluster"] = self.clusterer.labels_
         self.df["probability"] = self.clusterer.probabilities_
-        self.n_clusters = len(set(self.clusterer.labels_)) - (1 if -1 in self.clusterer.labels_ else 0)
-        self.n_noise = sum(self.df["cluster"] == -1)
+        labels = self.clusterer.labels_
+        # HDBSCAN labels are 0..K-1 with -1 for noise, so max() + 1 is the cluster count
+        self.n_clusters = int(labels.max()) + 1 if labels.size and labels.max() >= 0 else 0
+        self.n_noise = int(np.count_nonzero(labels == -1))
         print(f"✓ Found {self.n_clusters} clusters with {self.n_noise:,} noise points in {time.time() - start_time:.1f} seconds.")
         return self
 
@@ -91,13 +210,106 @@ class EmbeddingVisualizer:
         pass
 
 
+def relative_validity(min_spanning_tree: np.ndarray, labels: np.ndarray) -> float:
+    """
+    DBCV-style relative validity of a labelling on a mutual-reachability MST.
+    Same computation as hdbscan's HDBSCAN.relative_validity_, usable for any labels cut from that tree.
+    """
+    sizes = np.bincount(labels + 1)
+    noise_size = sizes[0]
+    cluster_size = sizes[1:]
+    total = noise_size + np.sum(cluster_size)
+    num_clusters = len(cluster_size)
+    DSC = np.zeros(num_clusters)
+    min_outlier_sep = np.inf
+    correction_const = 2
+    DSPC_wrt = np.ones(num_clusters) * np.inf
+
+    edge_from = min_spanning_tree.T[0].astype(np.intp)
+    edge_to = min_spanning_tree.T[1].astype(np.intp)
+    edge_dist = min_spanning_tree.T[2]
+    label1 = labels[edge_from]
+    label2 = labels[edge_to]
+    max_distance = edge_dist.max() if edge_dist.shape[0] > 0 else 0.0
+
+    both_noise = (label1 == -1) & (label2 == -1)
+    one_noise = (label1 == -1) ^ (label2 == -1)
+    neither_noise = ~both_noise & ~one_noise
+    if one_noise.any():
+        min_outlier_sep = edge_dist[one_noise].min()
+
+    same_cluster = neither_noise & (label1 == label2)
+    diff_cluster = neither_noise & (label1 != label2)
+    if same_cluster.any():
+        np.maximum.at(DSC, label1[same_cluster], edge_dist[same_cluster])
+    if diff_cluster.any():
+        np.minimum.at(DSPC_wrt, label1[diff_cluster], edge_dist[diff_cluster])
+        np.minimum.at(DSPC_wrt, label2[diff_cluster], edge_dist[diff_cluster])
+
+    min_outlier_sep = max_distance if min_outlier_sep == np.inf else min_outlier_sep
+    correction = correction_const * (max_distance if num_clusters > 1 else min_outlier_sep)
+    DSPC_wrt[np.where(DSPC_wrt == np.inf)] = correction
+
+    V_index = (DSPC_wrt - DSC) / np.maximum(DSPC_wrt, DSC)
+    return float(np.sum(cluster_size * V_index / total))
+
+
+def assess_min_samples_group(
+    X: np.ndarray,
+    ms: int,
+    mcs_group: List[int],
+    n_total: int,
+    core_dist_n_jobs: int = 1,
+    score_dbcv: bool = True
+) -> Dict[tuple, tuple]:
+    """
+    Fits HDBSCAN once for min_samples=ms and scores every min_cluster_size in mcs_group on it.
+    Returns {(mcs, ms): (n_clusters, noise_ratio, dbcv_score)}. Runs inside joblib workers.
+    With score_dbcv=False the MST is not kept and dbcv_score is NaN.
+    """
+    from hdbscan.hdbscan_ import _tree_to_labels
+
+    clusterer = hdbscan.HDBSCAN(
+        min_cluster_size=min(mcs_group), min_samples=ms, gen_min_span_tree=score_dbcv,
+        metric="euclidean", core_dist_n_jobs=core_dist_n_jobs
+    ).fit(X)
+    single_linkage_tree = clusterer.single_linkage_tree_.to_numpy()
+    min_spanning_tree = clusterer.minimum_spanning_tree_.to_numpy() if score_dbcv else None
+
+    scores = {}
+    for mcs in mcs_group:
+        if mcs == clusterer.min_cluster_size:
+            # The group's own fit already condensed the tree for its smallest size
+            labels = clusterer.labels_
+        else:
+            labels = _tree_to_labels(None, single_linkage_tree, min_cluster_size=mcs,
+                                     cluster_selection_method="eom")[0]
+        # HDBSCAN labels are 0..K-1 with -1 for noise, so max() + 1 is the cluster count
+        n_clusters = int(labels.max()) + 1 if labels.size and labels.max() >= 0 else 0
+        noise_ratio = np.count_nonzero(labels == -1) / n_total
+        dbcv_score = np.nan
+        if score_dbcv:
+            try:
+                dbcv_score = relative_validity(min_spanning_tree, labels)
+            except Exception:
+                dbcv_score = np.nan
+        scores[(mcs, ms)] = (n_clusters, noise_ratio, dbcv_score)
+    return scores
+
+
 def assess_2d_parameters(
     base_visualizer: EmbeddingVisualizer,
     mcs_values: List[int],
-    ms_values: List[int]
+    ms_values: List[int],
+    n_jobs: int = -1,
+    score_dbcv: bool = True
 ) -> pd.DataFrame:
     """
     Assesses HDBSCAN parameters across a 2D grid of min_cluster_size and min_samples.
+    min_samples alone fixes the core distances, MST and single-linkage tree, so HDBSCAN is fitted
+    once per min_samples; each min_cluster_size only re-condenses that tree and is scored on its MST.
+    The min_samples groups are independent and run in parallel joblib worker processes.
+    score_dbcv=False skips the MST and DBCV scoring when only cluster counts and noise are needed.
     """
     print("\n🚀 Starting 2D parameter assessment (Grid Search)...")
     results = []
@@ -107,18 +319,22 @@ def assess_2d_parameters(
             if ms <= mcs:
                 param_grid.append((mcs, ms))
 
-    for mcs, ms in tqdm(param_grid, desc="Assessing (mcs, ms) pairs"):
-        clusterer = hdbscan.HDBSCAN(
-            min_cluster_size=mcs, min_samples=ms, gen_min_span_tree=True,
-            metric="euclidean", core_dist_n_jobs=-1
-        ).fit(base_visualizer.XY_normalized)
+    mcs_by_ms: Dict[int, List[int]] = {}
+    for mcs, ms in param_grid:
+        mcs_by_ms.setdefault(ms, []).append(mcs)
 
-        n_clusters = len(set(clusterer.labels_)) - (1 if -1 in clusterer.labels_ else 0)
-        noise_ratio = np.sum(clusterer.labels_ == -1) / len(base_visualizer.df)
-        try:
-            dbcv_score = clusterer.relative_validity_
-        except Exception:
-            dbcv_score = np.nan
+    # Each worker fits on one core; loky memory-maps XY_normalized to the workers instead of copying it
+    X = np.ascontiguousarray(base_visualizer.XY_normalized)
+    n_total = len(base_visualizer.df)
+    scores = {}
+    jobs = Parallel(n_jobs=n_jobs, backend="loky", max_nbytes="1M", return_as="generator_unordered")(
+        delayed(assess_min_samples_group)(X, ms, group, n_total, score_dbcv=score_dbcv) for ms, group in mcs_by_ms.items()
+    )
+    for group_scores in tqdm(jobs, total=len(mcs_by_ms), desc="Assessing min_samples groups"):
+        scores.update(group_scores)
+
+    for mcs, ms in param_grid:
+        n_clusters, noise_ratio, dbcv_score = scores[(mcs, ms)]
         results.append({
             'min_cluster_size': mcs, 'min_samples': ms,
             'n_clusters': n_clusters, 'noise_ratio': noise_ratio,
@@ -128,19 +344,16 @@ def assess_2d_parameters(
     return pd.DataFrame(results)
 
 
-def export_single_heatmap(
+def build_heatmap_figure(
     pivot_df: pd.DataFrame,
     main_title: str,
     colorbar_title: str,
     colorscale: str,
-    chosen_params: Dict[str, int],
-    filename: str,
-    scale: int = 3
-):
+    chosen_params: Dict[str, int]
+) -> go.Figure:
     """
-    Generates and saves a single, high-quality, publication-ready heatmap PNG.
+    Builds a publication-ready heatmap of one assessment metric with the chosen parameters outlined.
     """
-    print(f"🖼️  Generating single high-quality PNG: {filename}")
     fig = go.Figure(data=go.Heatmap(
         z=pivot_df.values, x=pivot_df.columns, y=pivot_df.index,
         colorscale=colorscale, colorbar_title=colorbar_title,
@@ -162,6 +375,23 @@ def export_single_heatmap(
         font=dict(family="Arial, sans-serif", size=18, color="black"),
         title_font_size=24, yaxis_autorange="reversed"
     )
+    return fig
+
+
+def export_single_heatmap(
+    pivot_df: pd.DataFrame,
+    main_title: str,
+    colorbar_title: str,
+    colorscale: str,
+    chosen_params: Dict[str, int],
+    filename: str,
+    scale: int = 3
+):
+    """
+    Generates and saves a single, high-quality, publication-ready heatmap PNG.
+    """
+    print(f"🖼️  Generating single high-quality PNG: {filename}")
+    fig = build_heatmap_figure(pivot_df, main_title, colorbar_title, colorscale, chosen_params)
     try:
         fig.write_image(filename, scale=scale)
         print(f"✓ Successfully saved image to {filename}")
@@ -169,6 +399,33 @@ def export_single_heatmap(
         print(f"❌ Error saving image: {e}. Please ensure 'kaleido' is installed: pip install kaleido")
 
 
+def export_heatmaps(heatmap_specs: List[Dict], chosen_params: Dict[str, int], scale: int = 3):
+    """
+    Generates several heatmap PNGs in one Kaleido session, so the headless browser starts once.
+    Each spec holds export_single_heatmap's pivot_df, main_title, colorbar_title, colorscale and filename.
+    Falls back to one write_image call per figure when batch export is unavailable (Kaleido < 1.0).
+    """
+    filenames = [spec['filename'] for spec in heatmap_specs]
+    print(f"🖼️  Generating {len(filenames)} high-quality PNGs: {', '.join(filenames)}")
+    figures = [
+        build_heatmap_figure(spec['pivot_df'], spec['main_title'], spec['colorbar_title'],
+                             spec['colorscale'], chosen_params)
+        for spec in heatmap_specs
+    ]
+    try:
+        pio.write_images(figures, filenames, scale=scale)
+        print(f"✓ Successfully saved images to {', '.join(filenames)}")
+        return
+    except Exception as e:
+        print(f"Batch image export unavailable ({type(e).__name__}), saving images one at a time")
+    for fig, filename in zip(figures, filenames):
+        try:
+            fig.write_image(filename, scale=scale)
+            print(f"✓ Successfully saved image to {filename}")
+        except Exception as e:
+            print(f"❌ Error saving image: {e}. Please ensure 'kaleido' is installed: pip install kaleido")
+
+
 if __name__ == "__main__":
     # ==========================================================================
     #  1. CONFIGURATION: Please edit this section
@@ -195,7 +452,7 @@ if __name__ == "__main__":
         # ======================================================================
         print("\n--- Top 5 parameter combinations by Cluster Quality (DBCV) ---")
         # Drop NaN values for fair comparison and get the top 5
-        top_5_params = assessment_2d_df.dropna(subset=['dbcv_score']).sort_values('dbcv_score', ascending=False).head(5)
+        top_5_params = assessment_2d_df.dropna(subset=['dbcv_score']).nlargest(5, 'dbcv_score')
         print(top_5_params.to_string())
 
         # ======================================================================
@@ -214,19 +471,15 @@ if __name__ == "__main__":
             df_noise = assessment_2d_df.pivot(index='min_samples', columns='min_cluster_size', values='noise_ratio')
             df_dbcv = assessment_2d_df.pivot(index='min_samples', columns='min_cluster_size', values='dbcv_score')
 
-            # Call the export function three times to generate separate PNGs
-            export_single_heatmap(
-                pivot_df=df_clusters, main_title='Assessment: Number of Clusters', colorbar_title='Count',
-                colorscale='Viridis', chosen_params=chosen_parameters, filename='assessment_1_clusters.png'
-            )
-            export_single_heatmap(
-                pivot_df=df_noise, main_title='Assessment: Noise Ratio', colorbar_title='Ratio (%)',
-                colorscale='Cividis_r', chosen_params=chosen_parameters, filename='assessment_2_noise.png'
-            )
-            export_single_heatmap(
-                pivot_df=df_dbcv, main_title='Assessment: Cluster Quality (DBCV)', colorbar_title='DBCV Score',
-                colorscale='Plasma', chosen_params=chosen_parameters, filename='assessment_3_quality.png'
-            )
+            # Export the three separate PNGs in a single Kaleido session
+            export_heatmaps([
+                dict(pivot_df=df_clusters, main_title='Assessment: Number of Clusters', colorbar_title='Count',
+                     colorscale='Viridis', filename='assessment_1_clusters.png'),
+                dict(pivot_df=df_noise, main_title='Assessment: Noise Ratio', colorbar_title='Ratio (%)',
+                     colorscale='Cividis_r', filename='assessment_2_noise.png'),
+                dict(pivot_df=df_dbcv, main_title='Assessment: Cluster Quality (DBCV)', colorbar_title='DBCV Score',
+                     colorscale='Plasma', filename='assessment_3_quality.png'),
+            ], chosen_params=chosen_parameters)
 
             # ==================================================================
             #  5. FINAL STEP (Optional): Run final clustering and create reports
@@ -1,21 +1,27 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import hdbscan
 import umap.umap_ as umap
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.io as pio
-from sklearn.preprocessing import StandardScaler
 from scipy.stats import gaussian_kde
 from sklearn.decomposition import TruncatedSVD
-import colorsys
-from collections import Counter
+from sklearn.feature_extraction.text import CountVectorizer
+from matplotlib.colors import hsv_to_rgb
+from collections import Counter, namedtuple
 import re
 import warnings
 import time
 from datetime import datetime
+from functools import lru_cache
 import json
+import hashlib
+import os
 import copy
 from html import escape
 import nltk
@@ -24,6 +30,31 @@ from nltk.corpus import wordnet
 # Configure renderer for browser-based viewing
 pio.renderers.default = "browser"
 
+# Hover layout for the scatter; fields come from EmbeddingVisualizer.prepare_webgl_data
+HOVER_TEMPLATE = (
+    "<b>Cluster %{customdata[0]}</b><br>"
+    "<b>Confidence:</b> %{customdata[1]:.3f}<br>"
+    "<b>Outlier Score:</b> %{customdata[2]:.3f}<br>"
+    "<b>Source:</b> %{customdata[3]}<br>"
+    "<b>Index:</b> %{customdata[4]}<br>"
+    "<hr>"
+    "<b>Text:</b><br><i>%{customdata[5]}</i>"
+    "<extra></extra>"
+)
+
+# One rendered sample triple; the text fields are already HTML-escaped
+SampleRow = namedtuple('SampleRow', ['row_index', 'subject_text', 'predicate_text', 'object_text',
+                                     'source_file', 'probability', 'outlier_score'])
+
+# Plain word tokenizer for hypernym lookup; avoids loading NLTK's Punkt model
+_WORD_RE = re.compile(r"[A-Za-z']+")
+
+
+@lru_cache(maxsize=100_000)
+def _verb_synsets(word):
+    """WordNet verb synsets for a word, memoized across phrases and clusters."""
+    return tuple(wordnet.synsets(word, pos=wordnet.VERB))
+
 # Note: If you see sklearn warnings about 'force_all_finite',
 # they're deprecation warnings that don't affect functionality.
 # You can update scikit-learn to remove them: pip install -U scikit-learn
@@ -37,16 +68,18 @@ class EmbeddingVisualizer:
     WordNet-based hypernym analysis to identify core semantic concepts.
     Generates interactive HTML hierarchy reports for deep cluster analysis.
     """
+    # Stopword list for filtering semantically poor verbs
+    verb_stopwords = frozenset({
+        'be', 'am', 'is', 'are', 'was', 'were', 'been', 'being',
+        'have', 'has', 'had', 'having',
+        'do', 'does', 'did', 'doing',
+        'can', 'could', 'will', 'would', 'shall', 'should', 'may', 'might', 'must'
+    })
+
     def __init__(self, parquet_path=None, random_state=42):
         self.random_state = random_state
         if parquet_path:
-            self.df = pd.read_parquet(parquet_path)
-            # --- Defensive Check: Ensure required columns exist ---
-            required_cols = ['predicate_embedding', 'predicate_text', 'subject_text', 'object_text', 'source_file']
-            if not all(col in self.df.columns for col in required_cols):
-                raise ValueError(f"Parquet file must contain the following columns: {required_cols}. "
-                                 f"Found columns: {self.df.columns.tolist()}")
-            self.X = np.vstack(self.df["predicate_embedding"].values)
+            self.df, self.X = self._load_parquet(parquet_path)
             self.n_samples = len(self.df)
             print(f"Loaded {self.n_samples:,} embeddings from {parquet_path}")
         else:
@@ -54,20 +87,17 @@ class EmbeddingVisualizer:
             self.df = pd.DataFrame()
             self.X = np.array([])
             self.n_samples = 0
-            
-        # --- NEW: Stopword list for filtering semantically poor verbs ---
-        self.verb_stopwords = {
-            'be', 'am', 'is', 'are', 'was', 'were', 'been', 'being',
-            'have', 'has', 'had', 'having',
-            'do', 'does', 'did', 'doing',
-            'can', 'could', 'will', 'would', 'shall', 'should', 'may', 'might', 'must'
-        }
 
 
         # Performance thresholds
         self.WEBGL_RECOMMENDED_THRESHOLD = 1000
         self.WEBGL_MAX_COMFORTABLE = 100000
         self.SAMPLING_THRESHOLD = 500000
+        self.GPU_UMAP_MIN_SAMPLES = 10000
+        self.UMAP_CACHE_DIR = ".umap_cache"
+        self.MAX_POINTS_PER_CLUSTER = 5000
+        self.MAX_NOISE_POINTS = 2000
+        self.DENSITY_BINS = 150
         if self.n_samples > 0:
             if self.n_samples > self.WEBGL_RECOMMENDED_THRESHOLD:
                 print(f"✓ WebGL rendering enabled for optimal performance")
@@ -77,29 +107,142 @@ class EmbeddingVisualizer:
                     UserWarning
                 )
 
-    def reduce_dimensions(self, n_neighbors: int = 15, n_components: int =30, min_dist=0.1, metric="cosine"):
-        """Apply UMAP dimensionality reduction with optimized parameters."""
+    def _load_parquet(self, parquet_path, embedding_col="predicate_embedding",
+                      data_columns=("predicate_text", "subject_text", "object_text", "source_file")):
+        """
+        Read the Parquet file with pyarrow (memory-mapped), pruned to the embedding and the text
+        columns. The embedding column is turned straight into a float32 matrix from the Arrow
+        buffer and never boxed into pandas; the remaining columns become the dataframe.
+        """
+        schema_names = pq.read_schema(parquet_path).names
+        # --- Defensive Check: Ensure required columns exist ---
+        required_cols = [embedding_col] + list(data_columns)
+        if not all(col in schema_names for col in required_cols):
+            raise ValueError(f"Parquet file must contain the following columns: {required_cols}. "
+                             f"Found columns: {schema_names}")
+        columns = required_cols
+        table = pq.read_table(parquet_path, columns=columns, memory_map=True, use_pandas_metadata=True)
+        embeddings = table.column(embedding_col).combine_chunks()
+        n_rows = len(embeddings)
+        if pa.types.is_fixed_size_list(embeddings.type) and embeddings.null_count == 0:
+            # Fixed-width vectors: the child buffer already is the (N, D) matrix
+            dim = embeddings.type.list_size
+            flat = embeddings.values.to_numpy(zero_copy_only=False)
+            X = flat[embeddings.offset * dim:][:n_rows * dim].reshape(n_rows, dim)
+        else:
+            lengths = pc.list_value_length(embeddings).to_numpy(zero_copy_only=False)
+            if n_rows == 0 or not (lengths == lengths[0]).all():
+                raise ValueError(f"'{embedding_col}' must hold one equal-length vector per row.")
+            X = embeddings.flatten().to_numpy(zero_copy_only=False).reshape(n_rows, -1)
+        # One contiguous, writeable float32 block: Arrow buffers are read-only and numba's
+        # pynndescent kernels reject read-only arrays, so those are copied exactly once here
+        X = np.require(X, dtype=np.float32, requirements=["C", "W"])
+
+        # self_destruct frees each Arrow column as soon as it is converted
+        df = table.drop_columns([embedding_col]).to_pandas(self_destruct=True, split_blocks=True)
+        del table
+        return df, X
+
+    def reduce_dimensions(self, n_neighbors: int = 15, n_components: int =30, min_dist=0.1, metric="cosine", backend="auto",
+                         use_cache=True):
+        """
+        Apply UMAP dimensionality reduction with optimized parameters.
+        backend: "auto" uses RAPIDS cuML on GPU for GPU_UMAP_MIN_SAMPLES+ points when installed,
+        "gpu" requires it, "cpu" forces umap-learn.
+        use_cache: reuse the 2D embedding stored under UMAP_CACHE_DIR for the same input and parameters.
+        """
         print(f"Reducing {self.X.shape[0]:,} embeddings from {self.X.shape[1]}D to 2D...")
         start_time = time.time()
-        self.reducer = umap.UMAP(
-            n_neighbors=n_neighbors,
-            min_dist=min_dist,
-            metric=metric,
-            n_components=n_components,
-            init="spectral",
-            random_state=self.random_state,
-            n_jobs=-1,
-            low_memory=self.n_samples > 100000
-        )
-        self.XY = self.reducer.fit_transform(self.X)
+        # UMAP's numba kernels run on float32 directly; only copies if self.X was assigned another dtype
+        X = np.ascontiguousarray(self.X, dtype=np.float32)
+        cache_path = None
+        if use_cache:
+            cache_path = self._umap_cache_path(X, {"n_neighbors": n_neighbors, "n_components": n_components,
+                                                   "min_dist": min_dist, "metric": metric,
+                                                   "random_state": self.random_state, "backend": backend})
+        self.XY = None
+        if cache_path is not None and os.path.exists(cache_path):
+            self.XY = np.load(cache_path)["XY"]
+            print(f"✓ Loaded cached UMAP embedding from {cache_path}")
+        elif backend == "gpu" or (backend == "auto" and len(X) >= self.GPU_UMAP_MIN_SAMPLES):
+            self.XY = self._reduce_on_gpu(X, n_neighbors, n_components, min_dist, metric, required=backend == "gpu")
+        if self.XY is None:
+            self.reducer = umap.UMAP(
+                n_neighbors=n_neighbors,
+                min_dist=min_dist,
+                metric=metric,
+                n_components=n_components,
+                init="spectral",
+                random_state=self.random_state,
+                n_jobs=-1,
+                low_memory=self.n_samples > 100000,
+                precomputed_knn=self._get_knn(X, n_neighbors, metric) if len(X) >= 4096 else (None, None, None)
+            )
+            self.XY = self.reducer.fit_transform(X)
+        if cache_path is not None and not os.path.exists(cache_path):
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            np.savez(cache_path, XY=self.XY)
         self.df["x"], self.df["y"] = self.XY[:, 0], self.XY[:, 1]
-        scaler = StandardScaler()
-        self.XY_normalized = scaler.fit_transform(self.XY)
+        # Same result as StandardScaler (float64 statistics), but one output buffer scaled in place
+        mean = self.XY.mean(axis=0, dtype=np.float64)
+        std = self.XY.std(axis=0, dtype=np.float64)
+        std[std == 0] = 1.0
+        self.XY_normalized = np.subtract(self.XY, mean.astype(self.XY.dtype))
+        self.XY_normalized /= std.astype(self.XY.dtype)
         self.df["x_norm"], self.df["y_norm"] = self.XY_normalized[:, 0], self.XY_normalized[:, 1]
         elapsed = time.time() - start_time
         print(f"✓ UMAP completed in {elapsed:.1f} seconds")
         return self
 
+    def _umap_cache_path(self, X, params):
+        """Cache file for a UMAP result, named by a blake2b hash of the input matrix and parameters."""
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(np.ascontiguousarray(X))
+        digest.update(json.dumps({"shape": list(X.shape), "dtype": str(X.dtype), **params}, sort_keys=True).encode())
+        return os.path.join(self.UMAP_CACHE_DIR, f"{digest.hexdigest()}.npz")
+
+    def _reduce_on_gpu(self, X, n_neighbors, n_components, min_dist, metric, required=False):
+        """cuML UMAP with on-device NN-descent; returns None (CPU fallback) when RAPIDS is unavailable."""
+        try:
+            from cuml.manifold import UMAP as cuUMAP
+            self.reducer = cuUMAP(
+                n_neighbors=n_neighbors, n_components=n_components, min_dist=min_dist, metric=metric,
+                init="spectral", build_algo="nn_descent", random_state=self.random_state
+            )
+            XY = np.asarray(self.reducer.fit_transform(X))
+            print("✓ Using cuML GPU UMAP")
+            return XY
+        except Exception as e:
+            if required:
+                raise
+            print(f"GPU UMAP unavailable ({type(e).__name__}), falling back to CPU umap-learn")
+            return None
+
+    def _get_knn(self, X, n_neighbors, metric):
+        """
+        NN-descent kNN graph of the UMAP input, cached on the instance so that re-running
+        reduce_dimensions with other min_dist/n_components (same or fewer neighbours) skips the search.
+        """
+        cache = getattr(self, "_knn_cache", None)
+        if cache is None or cache["metric"] != metric or cache["k"] < n_neighbors or cache["n"] != len(X):
+            from umap.umap_ import nearest_neighbors
+            from sklearn.utils import check_random_state
+            start_time = time.time()
+            indices, distances, search_index = nearest_neighbors(
+                X, n_neighbors, metric, {}, False, check_random_state(self.random_state),
+                low_memory=self.n_samples > 100000,
+                n_jobs=1 if self.random_state is not None else -1
+            )
+            cache = self._knn_cache = {"metric": metric, "k": n_neighbors, "n": len(X),
+                                       "indices": indices, "distances": distances, "search_index": search_index}
+            print(f"✓ Built {n_neighbors}-NN graph in {time.time() - start_time:.1f} seconds")
+        else:
+            print(f"✓ Reusing cached {cache['k']}-NN graph")
+        # UMAP masks disconnected edges in place, so it gets copies
+        return (cache["indices"][:, :n_neighbors].copy(),
+                cache["distances"][:, :n_neighbors].copy(),
+                cache["search_index"])
+
     def cluster_embeddings(self, min_cluster_size=10, min_samples=5):
         """Apply HDBSCAN clustering with soft clustering capabilities."""
         print("Clustering embeddings...")
@@ -116,12 +259,38 @@ class EmbeddingVisualizer:
         self.df["cluster"] = self.clusterer.labels_
         self.df["probability"] = self.clusterer.probabilities_
         self.df["outlier_score"] = self.clusterer.outlier_scores_
-        self.n_clusters = len(set(self.clusterer.labels_)) - (1 if -1 in self.clusterer.labels_ else 0)
-        self.n_noise = sum(self.df["cluster"] == -1)
+        self._cluster_rows = None
+        self._cluster_sizes = None
+        labels = self.clusterer.labels_
+        # HDBSCAN labels are 0..K-1 with -1 for noise, so max() + 1 is the cluster count
+        self.n_clusters = int(labels.max()) + 1 if labels.size and labels.max() >= 0 else 0
+        self.n_noise = int(np.count_nonzero(labels == -1))
         elapsed = time.time() - start_time
         print(f"✓ Found {self.n_clusters} clusters with {self.n_noise:,} noise points in {elapsed:.1f} seconds")
         return self
 
+    def _cluster_row_indices(self):
+        """
+        Row positions of every cluster (noise included) from one stable argsort of the labels,
+        keyed by cluster id in ascending order. Cached until the next cluster_embeddings call.
+        """
+        if getattr(self, '_cluster_rows', None) is None:
+            labels = self.df['cluster'].to_numpy()
+            order = np.argsort(labels, kind='stable')
+            ids, starts = np.unique(labels[order], return_index=True)
+            self._cluster_rows = dict(zip(ids.tolist(), np.split(order, starts[1:])))
+        return self._cluster_rows
+
+    def get_cluster_sizes(self):
+        """
+        Point count per cluster id (noise included) in ascending id order, taken from the cached
+        row indices so the label column is not hashed again. Cached until the next cluster_embeddings call.
+        """
+        if getattr(self, '_cluster_sizes', None) is None:
+            rows = self._cluster_row_indices()
+            self._cluster_sizes = pd.Series([len(r) for r in rows.values()], index=list(rows), name="cluster")
+        return self._cluster_sizes
+
     def _get_verb_hypernyms(self, phrases):
         """
         Helper to extract meaningful verbs from phrases and find their WordNet hypernyms
@@ -129,18 +298,17 @@ class EmbeddingVisualizer:
         """
         verbs = set()
         for phrase in phrases:
-            words = nltk.word_tokenize(phrase)
-            for word in words:
-                # 1. Filter out stopwords
-                if word.lower() in self.verb_stopwords:
+            for word in _WORD_RE.findall(phrase):
+                # 1. Filter out stopwords and fragments too short to be content verbs
+                if len(word) < 3 or word.lower() in self.verb_stopwords:
                     continue
                 # 2. Check if the word exists in WordNet as a verb
-                if wordnet.synsets(word, pos=wordnet.VERB):
+                if _verb_synsets(word):
                     verbs.add(word)
 
         hypernyms = set()
         for verb in verbs:
-            synsets = wordnet.synsets(verb, pos=wordnet.VERB)
+            synsets = _verb_synsets(verb)
             # 3. Use only the first, most common synset if it exists
             if synsets:
                 most_common_synset = synsets[0]
@@ -156,26 +324,57 @@ class EmbeddingVisualizer:
         print(f"Extracting phrases, hypernyms, and samples for each cluster...")
         start_time = time.time()
 
-        for cluster_id in sorted(self.df['cluster'].unique()):
+        # Count every n-gram once over the whole corpus; per-cluster counts are then
+        # sparse row sums instead of Python-level tuple counting.
+        vectorizer = CountVectorizer(ngram_range=ngram_range, lowercase=True,
+                                     token_pattern=r"\S+", dtype=np.int32)
+        try:
+            ngram_matrix = vectorizer.fit_transform(self.df['predicate_text'].str.strip()).tocsr()
+            ngram_names = vectorizer.get_feature_names_out()
+            ngram_weights = (np.char.count(ngram_names.astype(str), ' ') + 1) ** 2
+            analyze = vectorizer.build_analyzer()
+        except ValueError:
+            # No text produced any n-gram in the requested range
+            ngram_matrix = None
+        # Column arrays (SoA) so per-cluster work never copies rows or touches the embeddings
+        texts = self.df['predicate_text'].to_numpy()
+        probabilities = self.df['probability'].to_numpy()
+        row_index = self.df.index.to_numpy()
+        triple_cols = ['subject_text', 'predicate_text', 'object_text']
+        # Only the fields the HTML report renders are kept for each sample; missing columns
+        # fall back to the report's placeholders
+        n_rows = len(self.df)
+        def column_or(col, fill):
+            return self.df[col].to_numpy() if col in self.df.columns else np.full(n_rows, fill, dtype=object)
+        html_arrays = [column_or(c, 'N/A') for c in triple_cols + ['source_file']]
+        score_arrays = [column_or(c, 0.0) for c in ['probability', 'outlier_score']]
+        triples = html_arrays[:3]
+
+        for cluster_id, rows in self._cluster_row_indices().items():
             if cluster_id == -1:
                 continue
 
-            cluster_df = self.df[self.df['cluster'] == cluster_id]
-            
+
             # --- Phrase Extraction Logic ---
-            phrase_counts = Counter()
-            for text in cluster_df['predicate_text'].values:
-                clean_text = text.lower().strip()
-                words = clean_text.split()
-                for n in range(ngram_range[0], min(ngram_range[1] + 1, len(words) + 1)):
-                    for i in range(len(words) - n + 1):
-                        phrase = tuple(words[i:i+n])
-                        phrase_counts[phrase] += 1
-            scored_phrases = [
-                (" ".join(phrase), count * (len(phrase)**2))
-                for phrase, count in phrase_counts.items() if count > 1
-            ]
-            scored_phrases.sort(key=lambda x: x[1], reverse=True)
+            scored_phrases = []
+            if ngram_matrix is not None:
+                counts = np.asarray(ngram_matrix[rows].sum(axis=0)).ravel()
+                repeated = np.flatnonzero(counts > 1)
+                scores = counts[repeated] * ngram_weights[repeated]
+                # Ties keep first-appearance order within the cluster: the first row holding
+                # each n-gram, then its place in the analyzer's (length, position) output
+                occurrences = ngram_matrix[rows][:, repeated].tocsc()
+                occurrences.sort_indices()
+                first_row = occurrences.indices[occurrences.indptr[:-1]]
+                first_position = np.empty(len(repeated), dtype=np.int64)
+                for r in np.unique(first_row):
+                    position = {}
+                    for k, gram in enumerate(analyze(texts[rows[r]])):
+                        position.setdefault(gram, k)
+                    in_row = np.flatnonzero(first_row == r)
+                    first_position[in_row] = [position[g] for g in ngram_names[repeated[in_row]].tolist()]
+                order = np.lexsort((first_position, first_row, -scores))
+                scored_phrases = list(zip(ngram_names[repeated[order]].tolist(), scores[order].tolist()))
             top_keywords = []
             for phrase, score in scored_phrases:
                 if not any(phrase in selected_phrase for selected_phrase in top_keywords):
@@ -183,26 +382,34 @@ class EmbeddingVisualizer:
                 if len(top_keywords) >= n_keywords:
                     break
             if not top_keywords:
-                word_counts = Counter(w for t in cluster_df['predicate_text'].values for w in t.lower().strip().split())
+                word_counts = Counter(w for t in texts[rows] for w in t.lower().strip().split())
                 top_keywords = [word for word, count in word_counts.most_common(n_keywords)]
             
             # --- WordNet Hypernym Extraction (using the improved method) ---
             hypernyms = self._get_verb_hypernyms(top_keywords)
 
             # --- Unique Sample Triple Extraction ---
-            top_samples_pool = cluster_df.sort_values(by='probability', ascending=False).head(200)
-            unique_triples = {}
-            for row in top_samples_pool.itertuples():
-                triple_key = (row.subject_text, row.predicate_text, row.object_text)
-                if triple_key not in unique_triples:
-                    unique_triples[triple_key] = row._asdict()
-
-            final_sample_list = list(unique_triples.values())[:n_samples_to_show]
+            top_samples_pool = rows[np.argsort(-probabilities[rows], kind='stable')[:200]]
+            seen_triples = set()
+            final_sample_list = []
+            for i in top_samples_pool:
+                triple_key = tuple(col[i] for col in triples)
+                if triple_key in seen_triples:
+                    continue
+                seen_triples.add(triple_key)
+                # HTML-escaped once here so report rendering is plain string formatting
+                final_sample_list.append(SampleRow(
+                    row_index[i],
+                    *(escape(str(col[i])) for col in html_arrays),
+                    *(col[i] for col in score_arrays)
+                ))
+                if len(final_sample_list) >= n_samples_to_show:
+                    break
 
             self.cluster_descriptions[cluster_id] = {
                 'keywords': top_keywords,
                 'hypernyms': hypernyms,
-                'size': len(cluster_df),
+                'size': len(rows),
                 'top_phrases_with_score': scored_phrases[:20],
                 'sample_rows': final_sample_list
             }
@@ -214,14 +421,11 @@ class EmbeddingVisualizer:
     def generate_cluster_colors(self):
         """Generate visually distinct colors for clusters using HSV color space."""
         n_colors_needed = self.n_clusters
-        colors = []
-        for i in range(n_colors_needed):
-            hue = i / n_colors_needed
-            saturation = 0.7 + (i % 3) * 0.1
-            value = 0.8 + (i % 2) * 0.1
-            rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-            hex_color = '#%02x%02x%02x' % tuple(int(c * 255) for c in rgb)
-            colors.append(hex_color)
+        i = np.arange(n_colors_needed)
+        hsv = np.stack([i / max(n_colors_needed, 1), 0.7 + (i % 3) * 0.1, 0.8 + (i % 2) * 0.1], axis=1)
+        rgb = (hsv_to_rgb(hsv) * 255).astype(np.uint32)
+        packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+        colors = np.char.mod('#%06x', packed).tolist()
         unique_clusters = sorted([c for c in self.df["cluster"].unique() if c != -1])
         self.color_map = {cluster: colors[i] for i, cluster in enumerate(unique_clusters)}
         self.color_map[-1] = '#cccccc'
@@ -235,24 +439,28 @@ class EmbeddingVisualizer:
         truncated = text[:max_length].rsplit(' ', 1)[0]
         return truncated + "..."
 
+    def _hover_text_column(self, frame, max_length=200):
+        """format_hover_text over the predicate_text column, as an object array."""
+        # A plain comprehension on the str methods beats the Arrow split/join list kernels ~3x here
+        format_hover_text = self.format_hover_text
+        return np.array([format_hover_text(text, max_length) for text in frame["predicate_text"].tolist()],
+                        dtype=object)
+
     def prepare_webgl_data(self, df_subset=None):
-        """Prepare data optimized for WebGL rendering with improved hover text."""
+        """
+        Raw hover fields for HOVER_TEMPLATE. Plotly formats them in the browser, so no
+        per-point HTML strings are assembled in Python.
+        """
         if df_subset is None:
             df_subset = self.df
-        hover_texts = []
-        for _, row in df_subset.iterrows():
-            formatted_text = self.format_hover_text(row["predicate_text"], max_length=200)
-            hover_text = (
-                f"<b>Cluster {row['cluster']}</b><br>"
-                f"<b>Confidence:</b> {row['probability']:.3f}<br>"
-                f"<b>Outlier Score:</b> {row['outlier_score']:.3f}<br>"
-                f"<b>Source:</b> {row['source_file']}<br>"
-                f"<b>Index:</b> {row.name}<br>"
-                f"<hr>"
-                f"<b>Text:</b><br><i>{formatted_text}</i>"
-            )
-            hover_texts.append(hover_text)
-        return hover_texts
+        return np.column_stack([
+            df_subset["cluster"].to_numpy(),
+            df_subset["probability"].to_numpy(),
+            df_subset["outlier_score"].to_numpy(),
+            df_subset["source_file"].astype(str).to_numpy(),
+            df_subset.index.to_numpy(),
+            self._hover_text_column(df_subset)
+        ])
 
     def export_hierarchical_clustering_results(self, output_path="hierarchical_clustering_results.txt"):
         """Export detailed hierarchical clustering results to a text file."""
@@ -269,27 +477,40 @@ class EmbeddingVisualizer:
             if hasattr(self.clusterer, 'condensed_tree_'):
                 try:
                     tree_df = self.clusterer.condensed_tree_.to_pandas()
-                    parent_children = tree_df.groupby('parent')['child'].apply(list).to_dict()
-                    node_sizes = dict(zip(tree_df['child'], tree_df['child_size']))
-                    root_nodes = sorted(list(set(parent_children.keys()) - set(tree_df['child'])), reverse=True)
-
-                    def print_hierarchy_to_file(node, level=0):
-                        size = node_sizes.get(node, sum(node_sizes.get(c, 1) for c in parent_children.get(node, [])))
+                    parents = tree_df['parent'].to_numpy()
+                    children = tree_df['child'].to_numpy()
+                    # Children grouped by parent with one stable sort, keeping tree order within each parent
+                    order = np.argsort(parents, kind='stable')
+                    unique_parents, starts = np.unique(parents[order], return_index=True)
+                    parent_children = dict(zip(unique_parents.tolist(),
+                                               (c.tolist() for c in np.split(children[order], starts[1:]))))
+                    node_sizes = dict(zip(children.tolist(), tree_df['child_size'].tolist()))
+                    root_nodes = sorted(set(parent_children) - set(node_sizes), reverse=True)
+                    # Roots are the only nodes without their own row; size them once from their children
+                    for root in root_nodes:
+                        node_sizes[root] = sum(node_sizes[c] for c in parent_children[root])
+
+                    # Iterative pre-order walk, so deep trees cannot hit the recursion limit
+                    lines = []
+                    stack = [(root, 0) for root in reversed(root_nodes)]
+                    while stack:
+                        node, level = stack.pop()
+                        size = node_sizes.get(node, 1)
                         if size > 1:
-                            f.write(f"{' ' * level}└─ Node {int(node)} (size: {int(size)})\n")
-                            if node in parent_children:
-                                for child in parent_children[node]:
-                                    print_hierarchy_to_file(child, level + 1)
-                    for root in root_nodes: print_hierarchy_to_file(root)
+                            lines.append(f"{' ' * level}└─ Node {int(node)} (size: {int(size)})\n")
+                            stack.extend((child, level + 1) for child in reversed(parent_children.get(node, [])))
+                    f.writelines(lines)
                 except Exception as e:
                     f.write(f"Could not process cluster hierarchy. Reason: {e}\n")
             f.write("\n\nDETAILED CLUSTER INFORMATION\n" + "="*80 + "\n\n")
-            for cid in sorted(self.df[self.df["cluster"] != -1]["cluster"].unique()):
+            probabilities = self.df['probability'].to_numpy()
+            for cid, rows in self._cluster_row_indices().items():
+                if cid == -1:
+                    continue
                 f.write(f"CLUSTER {cid}\n" + "-"*40 + "\n")
-                data = self.df[self.df["cluster"] == cid]
                 desc = self.cluster_descriptions.get(cid, {})
-                f.write(f"Size: {len(data)} embeddings\n")
-                f.write(f"Avg. Confidence: {data['probability'].mean():.3f}\n")
+                f.write(f"Size: {len(rows)} embeddings\n")
+                f.write(f"Avg. Confidence: {probabilities[rows].mean():.3f}\n")
                 if 'keywords' in desc: f.write(f"Top Phrases: {'; '.join(desc['keywords'])}\n")
                 if 'hypernyms' in desc and desc['hypernyms']: f.write(f"WordNet Hypernyms: {'; '.join(desc['hypernyms'])}\n")
                 f.write("\n")
@@ -347,7 +568,6 @@ h3 {{ font-size: 1.4em; }}
 .hypernyms span {{ background-color: #d4edda; color: #155724; }}
 .samples-container {{ margin-top: 15px; }}
 .sample-item {{ background: #f8f9fa; border: 1px solid #e9ecef; padding: 15px; border-radius: 6px; margin-bottom: 10px; }}
-.sample-item.sample-item-hidden {{ display: none; }}
 .sample-triple {{ display: flex; align-items: center; gap: 10px; margin-bottom: 10px; font-size: 1.05em; flex-wrap: wrap; }}
 .sample-triple .part {{ padding: 5px 10px; border-radius: 5px; }}
 .sample-triple .subject, .sample-triple .object {{ background-color: #d1ecf1; color: #0c5460; font-weight: bold; }}
@@ -396,17 +616,13 @@ document.getElementById('hierarchy-tree').addEventListener('click', function (e)
 // Handles sample list expansion/collapse
 document.addEventListener('click', function(e) {{
     if (e.target.classList.contains('toggle-samples-btn')) {{
-        const container = e.target.closest('.cluster-card').querySelector('.samples-container');
-        const allSampleItems = container.querySelectorAll('.sample-item');
-        
-        for (let i = 10; i < allSampleItems.length; i++) {{
-            allSampleItems[i].classList.toggle('sample-item-hidden');
-        }}
+        // Samples past the first 10 live in one hidden block, so a click flips a single attribute
+        const extra = e.target.closest('.cluster-card').querySelector('.samples-extra');
+        if (!extra) return;
+        extra.hidden = !extra.hidden;
 
-        const isCurrentlyExpanded = e.target.dataset.state === 'expanded';
-        if (isCurrentlyExpanded) {{
-            const moreCount = allSampleItems.length - 10;
-            e.target.textContent = 'Show more (' + moreCount + ')';
+        if (extra.hidden) {{
+            e.target.textContent = 'Show more (' + extra.childElementCount + ')';
             e.target.dataset.state = 'collapsed';
         }} else {{
             e.target.textContent = 'Collapse';
@@ -419,66 +635,89 @@ document.addEventListener('click', function(e) {{
 </html>
 """
 
-        hierarchy_html = ""
+        # Bound once so the tree walk and card loop skip repeated attribute lookups
+        default_color = '#6c757d'
+        color_map_get = self.color_map.get
+        cluster_desc_get = self.cluster_descriptions.get
+        keywords_preview_by_cluster = {
+            cid: escape(", ".join(desc.get('keywords', [])[:2]))
+            for cid, desc in self.cluster_descriptions.items() if desc.get('keywords')
+        }
+
+        hierarchy_parts = []
         if hasattr(self.clusterer, 'condensed_tree_'):
             tree_df = self.clusterer.condensed_tree_.to_pandas()
             parent_children = tree_df.groupby('parent')['child'].apply(list).to_dict()
-            node_data = tree_df.set_index('child').to_dict('index')
+            # Flat child -> lambda map; only lambda_val is read per node
+            lambda_by_node = dict(zip(tree_df['child'].tolist(), tree_df['lambda_val'].tolist()))
             cluster_id_to_node = {label: node for node, label in self.clusterer.prediction_data_.cluster_map.items()}
+            # Inverted once so each tree node resolves its final cluster label in O(1)
+            node_to_cluster_label = {nid: cid for cid, nid in cluster_id_to_node.items()}
+
+            # Every node but the roots has its size in child_size; a root's size is the sum of its
+            # children's, taken in the same pass as a vectorized groupby
+            node_sizes = tree_df.groupby('parent')['child_size'].sum().to_dict()
+            node_sizes.update(zip(tree_df['child'], tree_df['child_size']))
+            # Whether a node has any child of size > 1, decided once per parent rather than per visit
+            has_visible_children_by_node = {
+                parent: any(node_sizes.get(child, 1) > 1 for child in kids)
+                for parent, kids in parent_children.items()
+            }
 
-            node_sizes_direct = dict(zip(tree_df['child'], tree_df['child_size']))
-            memoized_sizes = {}
-            def get_node_size(node):
-                if node in memoized_sizes: return memoized_sizes[node]
-                if node in node_sizes_direct:
-                    size = node_sizes_direct[node]
-                    memoized_sizes[node] = size
-                    return size
-                if node in parent_children:
-                    size = sum(get_node_size(child) for child in parent_children[node])
-                    memoized_sizes[node] = size
-                    return size
-                return 1
-
-            def build_hierarchy_html(node, level=0):
-                size = get_node_size(node)
-                if size <= 1: return ""
-                html = "<li>"
-                is_parent = node in parent_children
-                lambda_val = node_data.get(node, {}).get('lambda_val', 0)
-                final_cluster_label = next((cid for cid, nid in cluster_id_to_node.items() if nid == node), None)
-
-                node_content_html = f'<div class="node-content" data-node-id="{int(node)}">'
-                has_visible_children = is_parent and any(get_node_size(child) > 1 for child in parent_children[node])
-                node_content_html += f'<span class="toggle">{ "[+]" if has_visible_children else " " }</span>'
-                node_content_html += '<span class="node-details">'
-                node_content_html += f'<span class="node-id">Node {int(node)}</span>'
-                node_content_html += f' | <span class="node-size">Size: {int(size)}</span>'
-                node_content_html += f' | <span class="node-lambda">λ: {lambda_val:.4f}</span>'
+            def append_node_html(parts, node, size):
+                """Appends the <li> opening and node label to parts; returns True if the node has visible children."""
+                lambda_val = lambda_by_node.get(node, 0)
+                final_cluster_label = node_to_cluster_label.get(node)
+
+                has_visible_children = has_visible_children_by_node.get(node, False)
+                parts.append(f'<li><div class="node-content" data-node-id="{int(node)}">')
+                parts.append(f'<span class="toggle">{ "[+]" if has_visible_children else " " }</span>')
+                parts.append('<span class="node-details">')
+                parts.append(f'<span class="node-id">Node {int(node)}</span>')
+                parts.append(f' | <span class="node-size">Size: {int(size)}</span>')
+                parts.append(f' | <span class="node-lambda">λ: {lambda_val:.4f}</span>')
                 if final_cluster_label is not None:
-                    color = self.color_map.get(final_cluster_label, '#6c757d')
-                    node_content_html += f' &rarr; <a href="#cluster-{final_cluster_label}" class="final-cluster-node" style="border-color:{color}; color:{color};">Cluster {final_cluster_label}</a>'
-                    keywords = self.cluster_descriptions.get(final_cluster_label, {}).get('keywords', [])
-                    if keywords:
-                        keywords_preview = ", ".join(keywords[:2])
-                        node_content_html += f'<span class="node-keywords"><i>- {escape(keywords_preview)}...</i></span>'
-                node_content_html += '</span></div>'
-                html += node_content_html
-                if has_visible_children:
-                    child_html = "".join(build_hierarchy_html(child, level + 1) for child in parent_children[node])
-                    if child_html: html += f'<ul class="collapsed">{child_html}</ul>'
-                html += "</li>"
-                return html
-
-            root_nodes = sorted(list(set(parent_children.keys()) - set(tree_df['child'])), reverse=True)
-            hierarchy_html = "<ul>" + "".join(build_hierarchy_html(root) for root in root_nodes) + "</ul>"
-
-        clusters_html = ""
-        sorted_clusters = sorted(self.df[self.df["cluster"] != -1]["cluster"].unique())
-        for cid in sorted_clusters:
-            desc = self.cluster_descriptions.get(cid, {})
-            data = self.df[self.df["cluster"] == cid]
-            color = self.color_map.get(cid, '#6c757d')
+                    color = color_map_get(final_cluster_label, default_color)
+                    parts.append(f' &rarr; <a href="#cluster-{final_cluster_label}" class="final-cluster-node" style="border-color:{color}; color:{color};">Cluster {final_cluster_label}</a>')
+                    keywords_preview = keywords_preview_by_cluster.get(final_cluster_label)
+                    if keywords_preview is not None:
+                        parts.append(f'<span class="node-keywords"><i>- {keywords_preview}...</i></span>')
+                parts.append('</span></div>')
+                return has_visible_children
+
+            # Roots are parents that never appear as a child; setdiff1d returns them sorted
+            root_nodes = np.setdiff1d(tree_df['parent'].to_numpy(), tree_df['child'].to_numpy())[::-1].tolist()
+            # Explicit DFS in document order so deep trees cannot hit the recursion limit;
+            # closing tags are pushed as plain strings and emitted when popped
+            hierarchy_parts.append("<ul>")
+            stack = list(reversed(root_nodes))
+            while stack:
+                node = stack.pop()
+                if isinstance(node, str):
+                    hierarchy_parts.append(node)
+                    continue
+                size = node_sizes.get(node, 1)
+                if size <= 1: continue
+                if append_node_html(hierarchy_parts, node, size):
+                    # At least one child has size > 1, so the nested list is never empty
+                    hierarchy_parts.append('<ul class="collapsed">')
+                    stack.append("</ul></li>")
+                    stack.extend(reversed(parent_children[node]))
+                else:
+                    hierarchy_parts.append("</li>")
+            hierarchy_parts.append("</ul>")
+
+        # One groupby pass for every cluster's mean confidence instead of a boolean mask per cluster
+        mean_probability = self.df.groupby("cluster", sort=True)["probability"].mean()
+        sorted_clusters = [cid for cid in mean_probability.index if cid != -1]
+
+        def render_cluster_card(cid):
+            """
+            Returns one cluster card as a list of fragments for writelines; the samples are
+            appended in place instead of being joined and interpolated into the card a second time.
+            """
+            desc = cluster_desc_get(cid, {})
+            color = color_map_get(cid, default_color)
 
             keywords_html = "".join(f'<span>{escape(kw)}</span>' for kw in desc.get('keywords', []))
             
@@ -491,65 +730,76 @@ document.addEventListener('click', function(e) {{
     <div class="hypernyms">{hypernyms_html}</div>
 </div>'''
 
-            samples_html = '<div class="samples-container">'
+            parts = [f"""
+<div class="cluster-card" id="cluster-{cid}">
+    <h3 style="border-color: {color};">Cluster {cid}</h3>
+    <p><b>Size:</b> {desc.get('size', 0):,} | <b>Avg. Confidence:</b> {mean_probability[cid]:.3f}</p>
+    <div class="cluster-section">
+        <div class="cluster-section-title">Top Phrases</div>
+        <div class="keywords">{keywords_html}</div>
+    </div>
+    {hypernyms_html}
+    <div class="cluster-section">
+        <div class="cluster-section-title">Unique Sample Triples (Top by Confidence)</div>
+        <div class="samples-container">"""]
             unique_samples = desc.get('sample_rows', [])
             
             for i, row in enumerate(unique_samples):
-                hidden_class = 'sample-item-hidden' if i >= 10 else ''
-                subject = escape(str(row.get('subject_text', 'N/A')))
-                predicate = escape(str(row.get('predicate_text', 'N/A')))
-                object_text = escape(str(row.get('object_text', 'N/A')))
+                if i == 10:
+                    parts.append('<div class="samples-extra" hidden>')
 
-                samples_html += f"""
-<div class="sample-item {hidden_class}">
+                parts.append(f"""
+<div class="sample-item">
     <div class="sample-triple">
-        <span class="part subject">{subject}</span><span class="arrow">&rarr;</span>
-        <span class="part predicate">"{predicate}"</span><span class="arrow">&rarr;</span>
-        <span class="part object">{object_text}</span>
+        <span class="part subject">{row.subject_text}</span><span class="arrow">&rarr;</span>
+        <span class="part predicate">"{row.predicate_text}"</span><span class="arrow">&rarr;</span>
+        <span class="part object">{row.object_text}</span>
     </div>
     <div class="sample-meta">
-        <span><span class="meta-label">Source:</span> {escape(str(row.get('source_file', 'N/A')))}</span>
-        <span><span class="meta-label">Index:</span> {row.get('Index', 'N/A')}</span>
-        <span><span class="meta-label">Confidence:</span> {row.get('probability', 0.0):.3f}</span>
-        <span><span class="meta-label">Outlier Score:</span> {row.get('outlier_score', 0.0):.3f}</span>
+        <span><span class="meta-label">Source:</span> {row.source_file}</span>
+        <span><span class="meta-label">Index:</span> {row.row_index}</span>
+        <span><span class="meta-label">Confidence:</span> {row.probability:.3f}</span>
+        <span><span class="meta-label">Outlier Score:</span> {row.outlier_score:.3f}</span>
     </div>
-</div>"""
-            samples_html += '</div>'
+</div>""")
+            if len(unique_samples) > 10:
+                parts.append('</div>')
+            parts.append('</div>')
             
             if len(unique_samples) > 10:
                 more_count = len(unique_samples) - 10
-                samples_html += f'<button class="toggle-samples-btn" data-state="collapsed">Show more ({more_count})</button>'
-
-            clusters_html += f"""
-<div class="cluster-card" id="cluster-{cid}">
-    <h3 style="border-color: {color};">Cluster {cid}</h3>
-    <p><b>Size:</b> {desc.get('size', 0):,} | <b>Avg. Confidence:</b> {data['probability'].mean():.3f}</p>
-    <div class="cluster-section">
-        <div class="cluster-section-title">Top Phrases</div>
-        <div class="keywords">{keywords_html}</div>
-    </div>
-    {hypernyms_html}
-    <div class="cluster-section">
-        <div class="cluster-section-title">Unique Sample Triples (Top by Confidence)</div>
-        {samples_html}
+                parts.append(f'<button class="toggle-samples-btn" data-state="collapsed">Show more ({more_count})</button>')
+            parts.append("""
     </div>
-</div>"""
-        final_html = html_template.format(
+</div>""")
+            return parts
+
+        # Only the small scaffold is formatted; the tree and cluster cards are streamed between its pieces
+        scaffold = html_template.format(
             datetime_now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             n_samples=self.n_samples,
             n_clusters=self.n_clusters,
             n_noise=self.n_noise,
             noise_ratio=self.n_noise / self.n_samples if self.n_samples > 0 else 0,
-            hierarchy_html=hierarchy_html,
-            clusters_html=clusters_html
+            hierarchy_html="\0",
+            clusters_html="\0"
         )
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(final_html)
+        prefix, middle, suffix = scaffold.split("\0")
+
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(prefix)
+            f.writelines(hierarchy_parts)
+            f.write(middle)
+            for cid in sorted_clusters:
+                f.writelines(render_cluster_card(cid))
+            f.write(suffix)
         print(f"✓ Interactive English HTML report saved to: {output_path}")
 
-    def create_interactive_cluster_report(self, output_path="cluster_analysis_report.html"):
-        """Creates an interactive HTML report with cluster analysis."""
+    def create_interactive_cluster_report(self, output_path="cluster_analysis_report.html", auto_open=False, include_plotlyjs="cdn"):
+        """
+        Creates an interactive HTML report with cluster analysis.
+        plotly.js is loaded from the CDN by default; pass include_plotlyjs=True for an offline file.
+        """
         print(f"Creating interactive cluster report...")
         if not hasattr(self, 'color_map'): self.generate_cluster_colors()
         if not hasattr(self, 'cluster_descriptions'): self.extract_cluster_keywords()
@@ -558,15 +808,16 @@ document.addEventListener('click', function(e) {{
                                             "Outlier Score by Cluster", "Source File Distribution"),
                             specs=[[{"type": "bar"}, {"type": "box"}],
                                    [{"type": "violin"}, {"type": "bar"}]])
-        cluster_sizes = self.df["cluster"].value_counts().sort_index()
+        # Per-cluster rows come from one groupby instead of a boolean mask per cluster; sizes are cached
+        grouped = self.df.groupby("cluster", sort=True)[["probability", "outlier_score"]]
+        cluster_sizes = self.get_cluster_sizes()
         fig.add_trace(go.Bar(
             x=[f"C{i}" if i != -1 else "Noise" for i in cluster_sizes.index],
             y=cluster_sizes.values, text=cluster_sizes.values, textposition='auto',
             marker_color=[self.color_map.get(i, '#cccccc') for i in cluster_sizes.index]
         ), row=1, col=1)
-        for cid in sorted(self.df["cluster"].unique()):
+        for cid, cluster_data in grouped:
             if cid == -1: continue
-            cluster_data = self.df[self.df["cluster"] == cid]
             fig.add_trace(go.Box(y=cluster_data["probability"], name=f"C{cid}",
                                  marker_color=self.color_map[cid], showlegend=False), row=1, col=2)
             fig.add_trace(go.Violin(y=cluster_data["outlier_score"], name=f"C{cid}",
@@ -576,37 +827,67 @@ document.addEventListener('click', function(e) {{
                              marker_color='lightblue'), row=2, col=2)
 
         fig.update_layout(title_text="Cluster Analysis Report", height=1000, showlegend=False)
-        fig.write_html(output_path, auto_open=True)
+        fig.write_html(output_path, auto_open=auto_open, include_plotlyjs=include_plotlyjs, validate=False)
         print(f"✓ Interactive report saved to: {output_path}")
         return fig
 
-    def create_beautiful_visualization(self, output_path="enhanced_clustering.html"):
-        """Creates a multi-layered, interactive visualization using WebGL."""
+    def create_beautiful_visualization(self, output_path="enhanced_clustering.html", auto_open=False, include_plotlyjs="cdn"):
+        """
+        Creates a multi-layered, interactive visualization using WebGL.
+        plotly.js is loaded from the CDN by default; pass include_plotlyjs=True for an offline file.
+        """
         print("Creating WebGL-accelerated visualization...")
         start_time = time.time()
         if not hasattr(self, 'color_map'): self.generate_cluster_colors()
         if not hasattr(self, 'cluster_descriptions'): self.extract_cluster_keywords()
         fig = make_subplots(rows=1, cols=2, column_widths=[0.7, 0.3],
                             specs=[[{"type": "scattergl"}, {"type": "bar"}]])
-        for cluster_id in sorted(self.df["cluster"].unique()):
-            cluster_df = self.df[self.df["cluster"] == cluster_id]
-            hover_texts = self.prepare_webgl_data(cluster_df)
-            if cluster_id == -1:
-                name = "Noise"
-                marker_dict = dict(size=3, color='#cccccc', symbol='x', opacity=0.3)
-            else:
-                desc = self.cluster_descriptions.get(cluster_id, {})
-                kw = desc.get('keywords', [])
-                name = f"C{cluster_id}: {', '.join(kw)[:40]}..."
-                marker_dict = dict(size=6, color=self.color_map[cluster_id], opacity=0.8, line=dict(width=0))
+        # Downsample oversized clusters, then draw every point in one Scattergl trace
+        plot_parts = []
+        n_sampled = 0
+        for cluster_id, cluster_df in self.df.groupby("cluster", sort=True):
+            max_points = self.MAX_NOISE_POINTS if cluster_id == -1 else self.MAX_POINTS_PER_CLUSTER
+            if len(cluster_df) > max_points:
+                cluster_df = cluster_df.sample(n=max_points, random_state=self.random_state)
+                n_sampled += 1
+            plot_parts.append(cluster_df)
+        plot_df = pd.concat(plot_parts)
+        is_noise = plot_df["cluster"].to_numpy() == -1
+        fig.add_trace(go.Scattergl(
+            x=plot_df["x_norm"], y=plot_df["y_norm"], mode="markers",
+            marker=dict(
+                size=np.where(is_noise, 3, 6),
+                color=plot_df["cluster"].map(self.color_map).fillna('#cccccc').to_numpy(),
+                symbol=np.where(is_noise, 'x', 'circle'),
+                opacity=np.where(is_noise, 0.3, 0.8),
+                line=dict(width=0)
+            ),
+            customdata=self.prepare_webgl_data(plot_df), hovertemplate=HOVER_TEMPLATE,
+            showlegend=False
+        ), row=1, col=1)
 
+        # Empty traces only provide the legend entries
+        for cluster_id in sorted(c for c in self.df["cluster"].unique() if c != -1):
+            kw = self.cluster_descriptions.get(cluster_id, {}).get('keywords', [])
             fig.add_trace(go.Scattergl(
-                x=cluster_df["x_norm"], y=cluster_df["y_norm"], mode="markers",
-                name=name, marker=marker_dict, text=hover_texts,
-                hovertemplate="%{text}<extra></extra>",
-                showlegend=bool(cluster_id != -1)
+                x=[None], y=[None], mode="markers",
+                name=f"C{cluster_id}: {', '.join(kw)[:40]}...",
+                marker=dict(size=6, color=self.color_map[cluster_id], opacity=0.8, line=dict(width=0)),
+                hoverinfo="skip", showlegend=True
             ), row=1, col=1)
-        cluster_counts = self.df["cluster"].value_counts().sort_index()
+
+        if n_sampled:
+            # Pre-binned density of the full data, so the overlay stays small in the HTML
+            counts, x_edges, y_edges = np.histogram2d(
+                self.df["x_norm"].to_numpy(), self.df["y_norm"].to_numpy(), bins=self.DENSITY_BINS
+            )
+            fig.add_trace(go.Contour(
+                z=counts.T, x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+                colorscale="Greys", showscale=False, opacity=0.35, contours=dict(coloring="lines"),
+                hoverinfo="skip", name="Density (all points)", showlegend=False
+            ), row=1, col=1)
+            print(f"   Downsampled {n_sampled} clusters; density overlay covers all {len(self.df)} points")
+        cluster_counts = self.get_cluster_sizes()
         fig.add_trace(go.Bar(
             x=[f"C{i}" if i != -1 else "Noise" for i in cluster_counts.index],
             y=cluster_counts.values, marker_color=[self.color_map[i] for i in cluster_counts.index],
@@ -619,33 +900,35 @@ document.addEventListener('click', function(e) {{
         fig.update_yaxes(scaleanchor="x", scaleratio=1, row=1, col=1)
 
         config = {'scrollZoom': True, 'displaylogo': False}
-        fig.write_html(output_path, auto_open=True, config=config)
+        fig.write_html(output_path, auto_open=auto_open, config=config, include_plotlyjs=include_plotlyjs, validate=False)
         elapsed = time.time() - start_time
         print(f"✓ Visualization created in {elapsed:.1f} seconds. Output: {output_path}")
         return fig
 
+@lru_cache(maxsize=None)
+def _has_nltk_resource(resource):
+    """True if NLTK can locate resource; the search-path walk runs once per resource per process."""
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
 def setup_nltk():
     """Downloads necessary NLTK data.
     This function handles the one-time setup for WordNet and the POS tagger.
     """
-    try:
-        nltk.data.find('corpora/wordnet.zip')
-    except nltk.downloader.DownloadError:
+    if not _has_nltk_resource('corpora/wordnet.zip'):
         print("Downloading WordNet corpus (one-time setup)...")
         nltk.download('wordnet')
+        _has_nltk_resource.cache_clear()
         print("✓ WordNet downloaded.")
-    try:
-        nltk.data.find('taggers/averaged_perceptron_tagger.zip')
-    except nltk.downloader.DownloadError:
+    if not _has_nltk_resource('taggers/averaged_perceptron_tagger.zip'):
         print("Downloading POS tagger (one-time setup)...")
         nltk.download('averaged_perceptron_tagger')
+        _has_nltk_resource.cache_clear()
         print("✓ POS tagger downloaded.")
-    try:
-        nltk.data.find('tokenizers/punkt.zip')
-    except nltk.downloader.DownloadError:
-        print("Downloading Punkt tokenizer (one-time setup)...")
-        nltk.download('punkt')
-        print("✓ Punkt tokenizer downloaded.")
 
 
 def visualize_embeddings(parquet_path, min_cluster_size, min_samples,
@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import hdbscan
 import umap.umap_ as umap
 import plotly.graph_objects as go
@@ -9,21 +12,69 @@ import plotly.io as pio
 from sklearn.preprocessing import StandardScaler
 from scipy.stats import gaussian_kde
 from sklearn.decomposition import TruncatedSVD
-import colorsys
+from matplotlib.colors import hsv_to_rgb
 from collections import Counter
+from itertools import chain
 import re
 import warnings
 import time
 from datetime import datetime
+from functools import lru_cache
 import json
+import hashlib
+import importlib.util
+import os
 import copy
-from html import escape
 import nltk
 from nltk.corpus import wordnet
 
 # Configure renderer for browser-based viewing
 pio.renderers.default = "browser"
 
+# Hover layout for the scatter; fields come from EmbeddingVisualizer.prepare_webgl_data
+HOVER_TEMPLATE = (
+    "<b>Cluster %{customdata[0]}</b><br>"
+    "<b>Confidence:</b> %{customdata[1]:.3f}<br>"
+    "<b>Outlier Score:</b> %{customdata[2]:.3f}<br>"
+    "<b>Source:</b> %{customdata[3]}<br>"
+    "<b>Index:</b> %{customdata[4]}<br>"
+    "<hr>"
+    "<b>Text:</b><br><i>%{customdata[5]}</i>"
+    "<extra></extra>"
+)
+
+# Whitespace runs collapsed in hover text, and the cheap check for whether a text needs it at all
+_WS = re.compile(r'\s+')
+_NEEDS_WS = re.compile(r'^\s|\s$|\s\s|[^\S ]')
+
+# Single-pass equivalent of html.escape(s, quote=True) for the report-building loops
+_HTML_TRANS = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+
+
+def _escape_html(s):
+    return s.translate(_HTML_TRANS)
+
+
+# Text columns of the report's sample rows; extract_cluster_keywords stores HTML-escaped copies as '<col>_html'
+_SAMPLE_HTML_COLUMNS = ('subject_text', 'predicate_text', 'object_text', 'source_file')
+
+
+def _add_escaped_columns(rows):
+    """Escape each sample text column once (Series.map) instead of per row inside the report template."""
+    for col in _SAMPLE_HTML_COLUMNS:
+        rows[col + '_html'] = rows[col].astype(str).map(_escape_html) if col in rows else 'N/A'
+    return rows
+
+
+@lru_cache(maxsize=4096)
+def _verb_hypernyms(word):
+    """Hypernym names of the most common WordNet verb sense of word (empty if it is not a verb)."""
+    synsets = wordnet.synsets(word, pos=wordnet.VERB)
+    if not synsets:
+        return ()
+    return tuple(hyper.lemmas()[0].name().replace('_', ' ') for hyper in synsets[0].hypernyms())
+
+
 # Note: If you see sklearn warnings about 'force_all_finite',
 # they're deprecation warnings that don't affect functionality.
 # You can update scikit-learn to remove them: pip install -U scikit-learn
@@ -39,14 +90,16 @@ class EmbeddingVisualizer:
     """
     def __init__(self, parquet_path=None, random_state=42):
         self.random_state = random_state
+        self.parquet_path = parquet_path
         if parquet_path:
-            self.df = pd.read_parquet(parquet_path)
             # --- Defensive Check: Ensure required columns exist ---
             required_cols = ['predicate_embedding', 'predicate_text', 'subject_text', 'object_text', 'source_file']
-            if not all(col in self.df.columns for col in required_cols):
+            schema_names = pq.read_schema(parquet_path).names
+            if not all(col in schema_names for col in required_cols):
                 raise ValueError(f"Parquet file must contain the following columns: {required_cols}. "
-                                 f"Found columns: {self.df.columns.tolist()}")
-            self.X = np.vstack(self.df["predicate_embedding"].values)
+                                 f"Found columns: {schema_names}")
+            # Checked against the schema first, so only the required columns are read from disk
+            self.df, self.X = self._load_parquet(parquet_path, required_cols)
             self.n_samples = len(self.df)
             print(f"Loaded {self.n_samples:,} embeddings from {parquet_path}")
         else:
@@ -68,6 +121,7 @@ class EmbeddingVisualizer:
         self.WEBGL_RECOMMENDED_THRESHOLD = 1000
         self.WEBGL_MAX_COMFORTABLE = 100000
         self.SAMPLING_THRESHOLD = 500000
+        self.GPU_UMAP_MIN_SAMPLES = 10000
         if self.n_samples > 0:
             if self.n_samples > self.WEBGL_RECOMMENDED_THRESHOLD:
                 print(f"✓ WebGL rendering enabled for optimal performance")
@@ -77,21 +131,86 @@ class EmbeddingVisualizer:
                     UserWarning
                 )
 
-    def reduce_dimensions(self, n_neighbors=15, min_dist=0.1, metric="cosine"):
-        """Apply UMAP dimensionality reduction with optimized parameters."""
+    def _load_parquet(self, parquet_path, columns, embedding_col="predicate_embedding"):
+        """
+        Read the given Parquet columns with pyarrow and turn the embedding column straight into
+        one contiguous float32 matrix from the Arrow buffer, instead of np.vstack over per-row
+        arrays; the remaining columns become the dataframe.
+        The matrix is also saved to a .npy side-file keyed on the Parquet file's mtime and size,
+        so later runs memory-map it and skip the embedding column entirely.
+        """
+        cache_path = parquet_path + ".X.npy"
+        meta_path = parquet_path + ".X.meta.json"
+        stat = os.stat(parquet_path)
+        meta = {"mtime": stat.st_mtime, "size": stat.st_size, "column": embedding_col}
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                cached_meta = json.load(f)
+        except (OSError, ValueError):
+            cached_meta = None
+        if cached_meta is not None and all(cached_meta.get(k) == v for k, v in meta.items()) \
+                and os.path.exists(cache_path):
+            data_columns = [c for c in columns if c != embedding_col]
+            df = pq.read_table(parquet_path, columns=data_columns, memory_map=True,
+                               use_pandas_metadata=True).to_pandas(self_destruct=True, split_blocks=True)
+            # Copy-on-write map: pages come from the OS cache, and numba still sees a writeable array
+            X = np.load(cache_path, mmap_mode="c")
+            print(f"✓ Loaded cached embedding matrix from {cache_path}")
+            return df, X
+
+        table = pq.read_table(parquet_path, columns=list(columns), memory_map=True, use_pandas_metadata=True)
+        embeddings = table.column(embedding_col).combine_chunks()
+        n_rows = len(embeddings)
+        if pa.types.is_fixed_size_list(embeddings.type) and embeddings.null_count == 0:
+            # Fixed-width vectors: the child buffer already is the (N, D) matrix
+            dim = embeddings.type.list_size
+            flat = embeddings.values.to_numpy(zero_copy_only=False)
+            X = flat[embeddings.offset * dim:][:n_rows * dim].reshape(n_rows, dim)
+        else:
+            lengths = pc.list_value_length(embeddings).to_numpy(zero_copy_only=False)
+            if n_rows == 0 or not (lengths == lengths[0]).all():
+                raise ValueError(f"'{embedding_col}' must hold one equal-length vector per row.")
+            X = embeddings.flatten().to_numpy(zero_copy_only=False).reshape(n_rows, -1)
+        # Arrow buffers are read-only and numba's pynndescent kernels reject read-only arrays
+        X = np.require(X, dtype=np.float32, requirements=["C", "W"])
+        df = table.drop_columns([embedding_col]).to_pandas(self_destruct=True, split_blocks=True)
+        del table
+        try:
+            np.save(cache_path, X)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({**meta, "shape": list(X.shape), "dtype": str(X.dtype)}, f)
+        except OSError as e:
+            # A read-only data directory only costs the cache, not the run
+            print(f"Could not write embedding cache next to {parquet_path}: {e}")
+        return df, X
+
+    def reduce_dimensions(self, n_neighbors=15, min_dist=0.1, metric="cosine", backend="auto", n_epochs=None,
+                          use_cache=True):
+        """
+        Apply UMAP dimensionality reduction with optimized parameters.
+        backend: "auto" uses RAPIDS cuML on GPU for GPU_UMAP_MIN_SAMPLES+ points when installed,
+        "gpu" requires it, "cpu" forces umap-learn.
+        n_epochs: None keeps UMAP's default (200/500); ~50 is enough for a quick preview layout.
+        use_cache: reuse the 2D layout saved next to the Parquet file for the same file, settings
+        and reducer (cuML or umap-learn), so GPU and CPU layouts are never served for each other.
+        """
         print(f"Reducing {self.X.shape[0]:,} embeddings from {self.X.shape[1]}D to 2D...")
         start_time = time.time()
-        self.reducer = umap.UMAP(
-            n_neighbors=n_neighbors,
-            min_dist=min_dist,
-            metric=metric,
-            n_components=2,
-            init="spectral",
-            random_state=self.random_state,
-            n_jobs=-1,
-            low_memory=self.n_samples > 100000
-        )
-        self.XY = self.reducer.fit_transform(self.X)
+        cache_params = dict(n_neighbors=n_neighbors, min_dist=min_dist, metric=metric, n_epochs=n_epochs)
+        cache_path = self._layout_cache_path(reducer=self._umap_reducer_name(backend),
+                                             **cache_params) if use_cache else None
+        if cache_path and os.path.exists(cache_path):
+            self.XY = np.load(cache_path, mmap_mode="r")
+            print(f"✓ Loaded cached UMAP layout from {cache_path}")
+        else:
+            self.XY = self._run_umap(n_neighbors, min_dist, metric, backend, n_epochs)
+            if cache_path:
+                # Key the saved layout by the reducer that actually ran (e.g. after a GPU fallback)
+                cache_path = self._layout_cache_path(reducer=self.umap_reducer_name, **cache_params)
+                try:
+                    np.save(cache_path, self.XY)
+                except OSError as e:
+                    print(f"Could not write UMAP layout cache next to {self.parquet_path}: {e}")
         self.df["x"], self.df["y"] = self.XY[:, 0], self.XY[:, 1]
         scaler = StandardScaler()
         self.XY_normalized = scaler.fit_transform(self.XY)
@@ -100,6 +219,73 @@ class EmbeddingVisualizer:
         print(f"✓ UMAP completed in {elapsed:.1f} seconds")
         return self
 
+    def _layout_cache_path(self, **params):
+        """
+        Side-file for the 2D UMAP layout, named by a hash of the Parquet file's mtime and size,
+        the UMAP settings and random_state; None when the data did not come from a file.
+        """
+        if not self.parquet_path:
+            return None
+        stat = os.stat(self.parquet_path)
+        key = json.dumps({"mtime": stat.st_mtime, "size": stat.st_size,
+                          "random_state": self.random_state, **params}, sort_keys=True)
+        return f"{self.parquet_path}.XY.{hashlib.sha1(key.encode()).hexdigest()[:12]}.npy"
+
+    def _umap_reducer_name(self, backend):
+        """Reducer _run_umap is expected to use for this backend: "cuml" or "umap-learn"."""
+        if backend == "gpu" or (backend == "auto" and self.n_samples >= self.GPU_UMAP_MIN_SAMPLES
+                                and importlib.util.find_spec("cuml") is not None):
+            return "cuml"
+        return "umap-learn"
+
+    def _run_umap(self, n_neighbors, min_dist, metric, backend, n_epochs):
+        """UMAP of self.X to 2D on GPU (cuML) or CPU (umap-learn), per reduce_dimensions' backend."""
+        # float32 is the narrowest dtype UMAP's numba kNN kernels run on (float16 input is upcast);
+        # only copies if self.X was assigned another dtype
+        X = np.ascontiguousarray(self.X, dtype=np.float32)
+        if metric == "cosine":
+            # On unit vectors euclidean distance ranks neighbours exactly like cosine,
+            # and pynndescent's euclidean kernel is the faster one
+            norms = np.linalg.norm(X, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            X = X / norms
+            metric = "euclidean"
+        XY = None
+        if backend == "gpu" or (backend == "auto" and len(X) >= self.GPU_UMAP_MIN_SAMPLES):
+            XY = self._reduce_on_gpu(X, n_neighbors, min_dist, metric, n_epochs, required=backend == "gpu")
+        self.umap_reducer_name = "umap-learn" if XY is None else "cuml"
+        if XY is None:
+            self.reducer = umap.UMAP(
+                n_neighbors=n_neighbors,
+                min_dist=min_dist,
+                metric=metric,
+                n_epochs=n_epochs,
+                n_components=2,
+                init="spectral",
+                random_state=self.random_state,
+                n_jobs=-1,
+                low_memory=self.n_samples > 100000
+            )
+            XY = self.reducer.fit_transform(X)
+        return XY
+
+    def _reduce_on_gpu(self, X, n_neighbors, min_dist, metric, n_epochs=None, required=False):
+        """cuML UMAP on the GPU; returns None (CPU fallback) when RAPIDS is unavailable."""
+        try:
+            from cuml.manifold import UMAP as cuUMAP
+            self.reducer = cuUMAP(
+                n_neighbors=n_neighbors, n_components=2, min_dist=min_dist, metric=metric,
+                n_epochs=n_epochs, init="spectral", random_state=self.random_state
+            )
+            XY = np.asarray(self.reducer.fit_transform(X))
+            print("✓ Using cuML GPU UMAP")
+            return XY
+        except Exception as e:
+            if required:
+                raise
+            print(f"GPU UMAP unavailable ({type(e).__name__}), falling back to CPU umap-learn")
+            return None
+
     def cluster_embeddings(self, min_cluster_size=10, min_samples=5):
         """Apply HDBSCAN clustering with soft clustering capabilities."""
         print("Clustering embeddings...")
@@ -117,7 +303,12 @@ class EmbeddingVisualizer:
         self.df["probability"] = self.clusterer.probabilities_
         self.df["outlier_score"] = self.clusterer.outlier_scores_
         self.n_clusters = len(set(self.clusterer.labels_)) - (1 if -1 in self.clusterer.labels_ else 0)
-        self.n_noise = sum(self.df["cluster"] == -1)
+        self.n_noise = int(self.df["cluster"].value_counts().get(-1, 0))
+        self._tree_cache = None
+        self._cluster_groups = None
+        self._cluster_sizes = None
+        self._cols = None
+        self._hover_texts = None
         elapsed = time.time() - start_time
         print(f"✓ Found {self.n_clusters} clusters with {self.n_noise:,} noise points in {elapsed:.1f} seconds")
         return self
@@ -127,27 +318,37 @@ class EmbeddingVisualizer:
         Helper to extract meaningful verbs from phrases and find their WordNet hypernyms
         based on their most common sense.
         """
-        verbs = set()
+        hypernyms = set()
         for phrase in phrases:
             words = nltk.word_tokenize(phrase)
             for word in words:
                 # 1. Filter out stopwords
                 if word.lower() in self.verb_stopwords:
                     continue
-                # 2. Check if the word exists in WordNet as a verb
-                if wordnet.synsets(word, pos=wordnet.VERB):
-                    verbs.add(word)
-
-        hypernyms = set()
-        for verb in verbs:
-            synsets = wordnet.synsets(verb, pos=wordnet.VERB)
-            # 3. Use only the first, most common synset if it exists
-            if synsets:
-                most_common_synset = synsets[0]
-                for hyper in most_common_synset.hypernyms():
-                    hypernyms.add(hyper.lemmas()[0].name().replace('_', ' '))
+                # 2./3. WordNet verbs only, hypernyms of the first (most common) sense; cached per word
+                hypernyms.update(_verb_hypernyms(word))
         return sorted(list(hypernyms))
 
+    def _get_cluster_groups(self):
+        """
+        Rows of every cluster (noise included) from one groupby pass, keyed by cluster id in
+        ascending order; replaces a full boolean-mask scan per cluster. Cached until the next
+        cluster_embeddings call.
+        """
+        if getattr(self, '_cluster_groups', None) is None:
+            self._cluster_groups = dict(iter(self.df.groupby("cluster", sort=True)))
+        return self._cluster_groups
+
+    def get_cluster_sizes(self):
+        """
+        Point count per cluster id (noise included) in ascending id order, taken from the cached
+        groups so the label column is not counted again. Cached until the next cluster_embeddings call.
+        """
+        if getattr(self, '_cluster_sizes', None) is None:
+            groups = self._get_cluster_groups()
+            self._cluster_sizes = pd.Series([len(g) for g in groups.values()], index=list(groups), name="cluster")
+        return self._cluster_sizes
+
     def extract_cluster_keywords(self, n_keywords=9, ngram_range=(2, 6), n_samples_to_show=35):
         """
         Extracts representative phrases, WordNet hypernyms, and unique sample triples for each cluster.
@@ -156,21 +357,20 @@ class EmbeddingVisualizer:
         print(f"Extracting phrases, hypernyms, and samples for each cluster...")
         start_time = time.time()
 
-        for cluster_id in sorted(self.df['cluster'].unique()):
+        for cluster_id, cluster_df in self._get_cluster_groups().items():
             if cluster_id == -1:
                 continue
 
-            cluster_df = self.df[self.df['cluster'] == cluster_id]
             
             # --- Phrase Extraction Logic ---
-            phrase_counts = Counter()
-            for text in cluster_df['predicate_text'].values:
-                clean_text = text.lower().strip()
-                words = clean_text.split()
-                for n in range(ngram_range[0], min(ngram_range[1] + 1, len(words) + 1)):
-                    for i in range(len(words) - n + 1):
-                        phrase = tuple(words[i:i+n])
-                        phrase_counts[phrase] += 1
+            # zip of shifted views yields each n-gram tuple; chain feeds every text's n-grams
+            # into a single Counter() call, so all counting happens in one C-level pass
+            token_lists = (text.lower().strip().split() for text in cluster_df['predicate_text'].values)
+            phrase_counts = Counter(chain.from_iterable(
+                zip(*(words[k:] for k in range(n)))
+                for words in token_lists
+                for n in range(ngram_range[0], min(ngram_range[1] + 1, len(words) + 1))
+            ))
             scored_phrases = [
                 (" ".join(phrase), count * (len(phrase)**2))
                 for phrase, count in phrase_counts.items() if count > 1
@@ -191,13 +391,11 @@ class EmbeddingVisualizer:
 
             # --- Unique Sample Triple Extraction ---
             top_samples_pool = cluster_df.sort_values(by='probability', ascending=False).head(200)
-            unique_triples = {}
-            for row in top_samples_pool.itertuples():
-                triple_key = (row.subject_text, row.predicate_text, row.object_text)
-                if triple_key not in unique_triples:
-                    unique_triples[triple_key] = row._asdict()
-
-            final_sample_list = list(unique_triples.values())[:n_samples_to_show]
+            unique_samples = (top_samples_pool
+                              .drop_duplicates(subset=['subject_text', 'predicate_text', 'object_text'])
+                              .head(n_samples_to_show)
+                              .rename_axis('Index').reset_index())
+            final_sample_list = _add_escaped_columns(unique_samples).to_dict('records')
 
             self.cluster_descriptions[cluster_id] = {
                 'keywords': top_keywords,
@@ -214,45 +412,81 @@ class EmbeddingVisualizer:
     def generate_cluster_colors(self):
         """Generate visually distinct colors for clusters using HSV color space."""
         n_colors_needed = self.n_clusters
-        colors = []
-        for i in range(n_colors_needed):
-            hue = i / n_colors_needed
-            saturation = 0.7 + (i % 3) * 0.1
-            value = 0.8 + (i % 2) * 0.1
-            rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-            hex_color = '#%02x%02x%02x' % tuple(int(c * 255) for c in rgb)
-            colors.append(hex_color)
-        unique_clusters = sorted([c for c in self.df["cluster"].unique() if c != -1])
+        i = np.arange(n_colors_needed)
+        hsv = np.stack([i / max(n_colors_needed, 1), 0.7 + (i % 3) * 0.1, 0.8 + (i % 2) * 0.1], axis=1)
+        rgb = (hsv_to_rgb(hsv) * 255).astype(np.uint32)
+        packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+        colors = np.char.mod('#%06x', packed).tolist()
+        unique_clusters = [c for c in self._get_cluster_groups() if c != -1]
         self.color_map = {cluster: colors[i] for i, cluster in enumerate(unique_clusters)}
         self.color_map[-1] = '#cccccc'
         return self
 
     def format_hover_text(self, text, max_length=150):
         """Format text for better readability in hover tooltips."""
-        text = ' '.join(text.split())
+        if len(text) <= max_length and not _NEEDS_WS.search(text):
+            return text
+        text = _WS.sub(' ', text).strip()
         if len(text) <= max_length:
             return text
         truncated = text[:max_length].rsplit(' ', 1)[0]
         return truncated + "..."
 
+    def _hot_columns(self):
+        """
+        Plain NumPy arrays (SoA) of the columns read once per point, so hover data is gathered
+        without pandas boxing. Cached until the next cluster_embeddings call.
+        """
+        if getattr(self, '_cols', None) is None:
+            self._cols = {c: self.df[c].to_numpy()
+                          for c in ('cluster', 'probability', 'outlier_score', 'source_file', 'predicate_text')}
+            self._cols['index'] = self.df.index.to_numpy()
+        return self._cols
+
     def prepare_webgl_data(self, df_subset=None):
-        """Prepare data optimized for WebGL rendering with improved hover text."""
-        if df_subset is None:
-            df_subset = self.df
-        hover_texts = []
-        for _, row in df_subset.iterrows():
-            formatted_text = self.format_hover_text(row["predicate_text"], max_length=200)
-            hover_text = (
-                f"<b>Cluster {row['cluster']}</b><br>"
-                f"<b>Confidence:</b> {row['probability']:.3f}<br>"
-                f"<b>Outlier Score:</b> {row['outlier_score']:.3f}<br>"
-                f"<b>Source:</b> {row['source_file']}<br>"
-                f"<b>Index:</b> {row.name}<br>"
-                f"<hr>"
-                f"<b>Text:</b><br><i>{formatted_text}</i>"
-            )
-            hover_texts.append(hover_text)
-        return hover_texts
+        """
+        Raw hover fields for HOVER_TEMPLATE, read from the cached column arrays; plotly formats
+        them in the browser. Only the shortened text is prepared in Python, once for all rows,
+        and subsets are a positional lookup.
+        """
+        cols = self._hot_columns()
+        if getattr(self, '_hover_texts', None) is None:
+            format_hover_text = self.format_hover_text
+            self._hover_texts = np.array([format_hover_text(text, 200) for text in cols['predicate_text']],
+                                         dtype=object)
+        rows = slice(None) if df_subset is None else self.df.index.get_indexer(df_subset.index)
+        return np.column_stack([
+            cols['cluster'][rows], cols['probability'][rows], cols['outlier_score'][rows],
+            cols['source_file'][rows], cols['index'][rows], self._hover_texts[rows]
+        ])
+
+    def _build_tree_cache(self):
+        """
+        Convert the condensed tree to adjacency/size/lambda lookups once per clustering run;
+        both hierarchy exporters share the result.
+        """
+        if getattr(self, '_tree_cache', None) is not None:
+            return self._tree_cache
+
+        tree_df = self.clusterer.condensed_tree_.to_pandas()
+        parent_children = tree_df.groupby('parent', sort=False)['child'].agg(list).to_dict()
+        node_sizes = dict(zip(tree_df['child'], tree_df['child_size']))
+        root_nodes = sorted(set(parent_children) - set(node_sizes), reverse=True)
+        # Roots are the only nodes without their own row; size them once from their children
+        for root in root_nodes:
+            node_sizes[root] = sum(node_sizes[c] for c in parent_children[root])
+        cluster_map = getattr(getattr(self.clusterer, 'prediction_data_', None), 'cluster_map', {})
+        cluster_id_to_node = {label: node for node, label in cluster_map.items()}
+
+        self._tree_cache = {
+            'tree_df': tree_df,
+            'parent_children': parent_children,
+            'node_sizes': node_sizes,
+            'node_lambdas': dict(zip(tree_df['child'], tree_df['lambda_val'])),
+            'node_to_cluster': {node: label for label, node in cluster_id_to_node.items()},
+            'root_nodes': root_nodes
+        }
+        return self._tree_cache
 
     def export_hierarchical_clustering_results(self, output_path="hierarchical_clustering_results.txt"):
         """Export detailed hierarchical clustering results to a text file."""
@@ -268,13 +502,13 @@ class EmbeddingVisualizer:
 
             if hasattr(self.clusterer, 'condensed_tree_'):
                 try:
-                    tree_df = self.clusterer.condensed_tree_.to_pandas()
-                    parent_children = tree_df.groupby('parent')['child'].apply(list).to_dict()
-                    node_sizes = dict(zip(tree_df['child'], tree_df['child_size']))
-                    root_nodes = sorted(list(set(parent_children.keys()) - set(tree_df['child'])), reverse=True)
+                    tree = self._build_tree_cache()
+                    parent_children = tree['parent_children']
+                    node_sizes = tree['node_sizes']
+                    root_nodes = tree['root_nodes']
 
                     def print_hierarchy_to_file(node, level=0):
-                        size = node_sizes.get(node, sum(node_sizes.get(c, 1) for c in parent_children.get(node, [])))
+                        size = node_sizes.get(node, 1)
                         if size > 1:
                             f.write(f"{' ' * level}└─ Node {int(node)} (size: {int(size)})\n")
                             if node in parent_children:
@@ -284,9 +518,10 @@ class EmbeddingVisualizer:
                 except Exception as e:
                     f.write(f"Could not process cluster hierarchy. Reason: {e}\n")
             f.write("\n\nDETAILED CLUSTER INFORMATION\n" + "="*80 + "\n\n")
-            for cid in sorted(self.df[self.df["cluster"] != -1]["cluster"].unique()):
+            for cid, data in self._get_cluster_groups().items():
+                if cid == -1:
+                    continue
                 f.write(f"CLUSTER {cid}\n" + "-"*40 + "\n")
-                data = self.df[self.df["cluster"] == cid]
                 desc = self.cluster_descriptions.get(cid, {})
                 f.write(f"Size: {len(data)} embeddings\n")
                 f.write(f"Avg. Confidence: {data['probability'].mean():.3f}\n")
@@ -419,88 +654,93 @@ document.addEventListener('click', function(e) {{
 </html>
 """
 
-        hierarchy_html = ""
+        # Every section is collected as a list of fragments and joined once, never grown with +=
+        hierarchy_parts = []
         if hasattr(self.clusterer, 'condensed_tree_'):
-            tree_df = self.clusterer.condensed_tree_.to_pandas()
-            parent_children = tree_df.groupby('parent')['child'].apply(list).to_dict()
-            node_data = tree_df.set_index('child').to_dict('index')
-            cluster_id_to_node = {label: node for node, label in self.clusterer.prediction_data_.cluster_map.items()}
-
-            node_sizes_direct = dict(zip(tree_df['child'], tree_df['child_size']))
-            memoized_sizes = {}
-            def get_node_size(node):
-                if node in memoized_sizes: return memoized_sizes[node]
-                if node in node_sizes_direct:
-                    size = node_sizes_direct[node]
-                    memoized_sizes[node] = size
-                    return size
-                if node in parent_children:
-                    size = sum(get_node_size(child) for child in parent_children[node])
-                    memoized_sizes[node] = size
-                    return size
-                return 1
-
-            def build_hierarchy_html(node, level=0):
+            tree = self._build_tree_cache()
+            parent_children = tree['parent_children']
+            node_lambdas = tree['node_lambdas']
+            node_to_cluster = tree['node_to_cluster']
+
+            # Every node, roots included, already has its size in the shared cache
+            node_sizes = tree['node_sizes']
+            def get_node_size(node): return node_sizes.get(node, 1)
+
+            def build_hierarchy_html(out, node, level=0):
+                """Appends the <li> fragments of node's subtree to out; nodes of size 1 are skipped."""
                 size = get_node_size(node)
-                if size <= 1: return ""
-                html = "<li>"
+                if size <= 1: return
                 is_parent = node in parent_children
-                lambda_val = node_data.get(node, {}).get('lambda_val', 0)
-                final_cluster_label = next((cid for cid, nid in cluster_id_to_node.items() if nid == node), None)
+                lambda_val = node_lambdas.get(node, 0)
+                final_cluster_label = node_to_cluster.get(node)
 
-                node_content_html = f'<div class="node-content" data-node-id="{int(node)}">'
                 has_visible_children = is_parent and any(get_node_size(child) > 1 for child in parent_children[node])
-                node_content_html += f'<span class="toggle">{ "[+]" if has_visible_children else " " }</span>'
-                node_content_html += '<span class="node-details">'
-                node_content_html += f'<span class="node-id">Node {int(node)}</span>'
-                node_content_html += f' | <span class="node-size">Size: {int(size)}</span>'
-                node_content_html += f' | <span class="node-lambda">λ: {lambda_val:.4f}</span>'
+                out.append(f'<li><div class="node-content" data-node-id="{int(node)}">')
+                out.append(f'<span class="toggle">{ "[+]" if has_visible_children else " " }</span>')
+                out.append('<span class="node-details">')
+                out.append(f'<span class="node-id">Node {int(node)}</span>')
+                out.append(f' | <span class="node-size">Size: {int(size)}</span>')
+                out.append(f' | <span class="node-lambda">λ: {lambda_val:.4f}</span>')
                 if final_cluster_label is not None:
                     color = self.color_map.get(final_cluster_label, '#6c757d')
-                    node_content_html += f' &rarr; <a href="#cluster-{final_cluster_label}" class="final-cluster-node" style="border-color:{color}; color:{color};">Cluster {final_cluster_label}</a>'
+                    out.append(f' &rarr; <a href="#cluster-{final_cluster_label}" class="final-cluster-node" style="border-color:{color}; color:{color};">Cluster {final_cluster_label}</a>')
                     keywords = self.cluster_descriptions.get(final_cluster_label, {}).get('keywords', [])
                     if keywords:
                         keywords_preview = ", ".join(keywords[:2])
-                        node_content_html += f'<span class="node-keywords"><i>- {escape(keywords_preview)}...</i></span>'
-                node_content_html += '</span></div>'
-                html += node_content_html
+                        out.append(f'<span class="node-keywords"><i>- {_escape_html(keywords_preview)}...</i></span>')
+                out.append('</span></div>')
                 if has_visible_children:
-                    child_html = "".join(build_hierarchy_html(child, level + 1) for child in parent_children[node])
-                    if child_html: html += f'<ul class="collapsed">{child_html}</ul>'
-                html += "</li>"
-                return html
-
-            root_nodes = sorted(list(set(parent_children.keys()) - set(tree_df['child'])), reverse=True)
-            hierarchy_html = "<ul>" + "".join(build_hierarchy_html(root) for root in root_nodes) + "</ul>"
-
-        clusters_html = ""
-        sorted_clusters = sorted(self.df[self.df["cluster"] != -1]["cluster"].unique())
+                    # At least one child has size > 1, so the nested list is never empty
+                    out.append('<ul class="collapsed">')
+                    for child in parent_children[node]:
+                        build_hierarchy_html(out, child, level + 1)
+                    out.append('</ul>')
+                out.append("</li>")
+
+            hierarchy_parts.append("<ul>")
+            for root in tree['root_nodes']:
+                build_hierarchy_html(hierarchy_parts, root)
+            hierarchy_parts.append("</ul>")
+
+        cluster_parts = []
+        sorted_clusters = [c for c in self._get_cluster_groups() if c != -1]
         for cid in sorted_clusters:
             desc = self.cluster_descriptions.get(cid, {})
-            data = self.df[self.df["cluster"] == cid]
+            data = self._get_cluster_groups()[cid]
             color = self.color_map.get(cid, '#6c757d')
 
-            keywords_html = "".join(f'<span>{escape(kw)}</span>' for kw in desc.get('keywords', []))
+            keywords_html = "".join(f'<span>{_escape_html(kw)}</span>' for kw in desc.get('keywords', []))
             
             hypernyms_html = ""
             if desc.get('hypernyms'):
-                hypernyms_html = "".join(f'<span>{escape(hn)}</span>' for hn in desc['hypernyms'])
+                hypernyms_html = "".join(f'<span>{_escape_html(hn)}</span>' for hn in desc['hypernyms'])
                 hypernyms_html = f'''
 <div class="cluster-section">
     <div class="cluster-section-title">WordNet Hypernyms</div>
     <div class="hypernyms">{hypernyms_html}</div>
 </div>'''
 
-            samples_html = '<div class="samples-container">'
+            cluster_parts.append(f"""
+<div class="cluster-card" id="cluster-{cid}">
+    <h3 style="border-color: {color};">Cluster {cid}</h3>
+    <p><b>Size:</b> {desc.get('size', 0):,} | <b>Avg. Confidence:</b> {data['probability'].mean():.3f}</p>
+    <div class="cluster-section">
+        <div class="cluster-section-title">Top Phrases</div>
+        <div class="keywords">{keywords_html}</div>
+    </div>
+    {hypernyms_html}
+    <div class="cluster-section">
+        <div class="cluster-section-title">Unique Sample Triples (Top by Confidence)</div>
+        <div class="samples-container">""")
             unique_samples = desc.get('sample_rows', [])
             
             for i, row in enumerate(unique_samples):
                 hidden_class = 'sample-item-hidden' if i >= 10 else ''
-                subject = escape(str(row.get('subject_text', 'N/A')))
-                predicate = escape(str(row.get('predicate_text', 'N/A')))
-                object_text = escape(str(row.get('object_text', 'N/A')))
+                subject = row['subject_text_html']
+                predicate = row['predicate_text_html']
+                object_text = row['object_text_html']
 
-                samples_html += f"""
+                cluster_parts.append(f"""
 <div class="sample-item {hidden_class}">
     <div class="sample-triple">
         <span class="part subject">{subject}</span><span class="arrow">&rarr;</span>
@@ -508,44 +748,38 @@ document.addEventListener('click', function(e) {{
         <span class="part object">{object_text}</span>
     </div>
     <div class="sample-meta">
-        <span><span class="meta-label">Source:</span> {escape(str(row.get('source_file', 'N/A')))}</span>
+        <span><span class="meta-label">Source:</span> {row['source_file_html']}</span>
         <span><span class="meta-label">Index:</span> {row.get('Index', 'N/A')}</span>
         <span><span class="meta-label">Confidence:</span> {row.get('probability', 0.0):.3f}</span>
         <span><span class="meta-label">Outlier Score:</span> {row.get('outlier_score', 0.0):.3f}</span>
     </div>
-</div>"""
-            samples_html += '</div>'
+</div>""")
+            cluster_parts.append('</div>')
             
             if len(unique_samples) > 10:
                 more_count = len(unique_samples) - 10
-                samples_html += f'<button class="toggle-samples-btn" data-state="collapsed">Show more ({more_count})</button>'
-
-            clusters_html += f"""
-<div class="cluster-card" id="cluster-{cid}">
-    <h3 style="border-color: {color};">Cluster {cid}</h3>
-    <p><b>Size:</b> {desc.get('size', 0):,} | <b>Avg. Confidence:</b> {data['probability'].mean():.3f}</p>
-    <div class="cluster-section">
-        <div class="cluster-section-title">Top Phrases</div>
-        <div class="keywords">{keywords_html}</div>
+                cluster_parts.append(f'<button class="toggle-samples-btn" data-state="collapsed">Show more ({more_count})</button>')
+            cluster_parts.append("""
     </div>
-    {hypernyms_html}
-    <div class="cluster-section">
-        <div class="cluster-section-title">Unique Sample Triples (Top by Confidence)</div>
-        {samples_html}
-    </div>
-</div>"""
-        final_html = html_template.format(
+</div>""")
+        # Only the small scaffold is formatted; the fragment lists are streamed between its pieces
+        scaffold = html_template.format(
             datetime_now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             n_samples=self.n_samples,
             n_clusters=self.n_clusters,
             n_noise=self.n_noise,
             noise_ratio=self.n_noise / self.n_samples if self.n_samples > 0 else 0,
-            hierarchy_html=hierarchy_html,
-            clusters_html=clusters_html
+            hierarchy_html="\0",
+            clusters_html="\0"
         )
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(final_html)
+        prefix, middle, suffix = scaffold.split("\0")
+
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(prefix)
+            f.writelines(hierarchy_parts)
+            f.write(middle)
+            f.writelines(cluster_parts)
+            f.write(suffix)
         print(f"✓ Interactive English HTML report saved to: {output_path}")
 
     def create_interactive_cluster_report(self, output_path="cluster_analysis_report.html"):
@@ -558,15 +792,15 @@ document.addEventListener('click', function(e) {{
                                             "Outlier Score by Cluster", "Source File Distribution"),
                             specs=[[{"type": "bar"}, {"type": "box"}],
                                    [{"type": "violin"}, {"type": "bar"}]])
-        cluster_sizes = self.df["cluster"].value_counts().sort_index()
+        groups = self._get_cluster_groups()
+        cluster_sizes = self.get_cluster_sizes()
         fig.add_trace(go.Bar(
             x=[f"C{i}" if i != -1 else "Noise" for i in cluster_sizes.index],
             y=cluster_sizes.values, text=cluster_sizes.values, textposition='auto',
             marker_color=[self.color_map.get(i, '#cccccc') for i in cluster_sizes.index]
         ), row=1, col=1)
-        for cid in sorted(self.df["cluster"].unique()):
+        for cid, cluster_data in groups.items():
             if cid == -1: continue
-            cluster_data = self.df[self.df["cluster"] == cid]
             fig.add_trace(go.Box(y=cluster_data["probability"], name=f"C{cid}",
                                  marker_color=self.color_map[cid], showlegend=False), row=1, col=2)
             fig.add_trace(go.Violin(y=cluster_data["outlier_score"], name=f"C{cid}",
@@ -588,25 +822,35 @@ document.addEventListener('click', function(e) {{
         if not hasattr(self, 'cluster_descriptions'): self.extract_cluster_keywords()
         fig = make_subplots(rows=1, cols=2, column_widths=[0.7, 0.3],
                             specs=[[{"type": "scattergl"}, {"type": "bar"}]])
-        for cluster_id in sorted(self.df["cluster"].unique()):
-            cluster_df = self.df[self.df["cluster"] == cluster_id]
-            hover_texts = self.prepare_webgl_data(cluster_df)
+        groups = self._get_cluster_groups()
+        # Every point in one Scattergl trace with per-point styling; concatenating the groups keeps
+        # the old draw order (noise first, then clusters in ascending id)
+        plot_df = pd.concat(groups.values())
+        is_noise = plot_df["cluster"].to_numpy() == -1
+        fig.add_trace(go.Scattergl(
+            x=plot_df["x_norm"], y=plot_df["y_norm"], mode="markers",
+            marker=dict(
+                size=np.where(is_noise, 3, 6),
+                color=plot_df["cluster"].map(self.color_map).fillna('#cccccc').to_numpy(),
+                symbol=np.where(is_noise, 'x', 'circle'),
+                opacity=np.where(is_noise, 0.3, 0.8),
+                line=dict(width=0)
+            ),
+            customdata=self.prepare_webgl_data(plot_df), hovertemplate=HOVER_TEMPLATE,
+            showlegend=False
+        ), row=1, col=1)
+        # Empty traces only provide the legend entries
+        for cluster_id in groups:
             if cluster_id == -1:
-                name = "Noise"
-                marker_dict = dict(size=3, color='#cccccc', symbol='x', opacity=0.3)
-            else:
-                desc = self.cluster_descriptions.get(cluster_id, {})
-                kw = desc.get('keywords', [])
-                name = f"C{cluster_id}: {', '.join(kw)[:40]}..."
-                marker_dict = dict(size=6, color=self.color_map[cluster_id], opacity=0.8, line=dict(width=0))
-
+                continue
+            kw = self.cluster_descriptions.get(cluster_id, {}).get('keywords', [])
             fig.add_trace(go.Scattergl(
-                x=cluster_df["x_norm"], y=cluster_df["y_norm"], mode="markers",
-                name=name, marker=marker_dict, text=hover_texts,
-                hovertemplate="%{text}<extra></extra>",
-                showlegend=bool(cluster_id != -1)
+                x=[None], y=[None], mode="markers",
+                name=f"C{cluster_id}: {', '.join(kw)[:40]}...",
+                marker=dict(size=6, color=self.color_map[cluster_id], opacity=0.8, line=dict(width=0)),
+                hoverinfo="skip", showlegend=True
             ), row=1, col=1)
-        cluster_counts = self.df["cluster"].value_counts().sort_index()
+        cluster_counts = self.get_cluster_sizes()
         fig.add_trace(go.Bar(
             x=[f"C{i}" if i != -1 else "Noise" for i in cluster_counts.index],
             y=cluster_counts.values, marker_color=[self.color_map[i] for i in cluster_counts.index],
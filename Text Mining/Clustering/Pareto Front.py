@@ -16,13 +16,92 @@
 # ==============================================================================
 
 import os
+import io
+import base64
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+
+# 安装了 orjson 时用它序列化图表数据 (直接输出 numpy 数组，比标准 json 快)
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
+# 能显示中文的字体，按优先级排列；matplotlib 默认的 DejaVu Sans 没有 CJK 字形
+CJK_FONTS = ['Noto Sans CJK SC', 'Source Han Sans SC', 'SimHei', 'PingFang SC',
+             'Microsoft YaHei', 'WenQuanYi Micro Hei']
+
+
+def _installed_cjk_fonts():
+    """返回本机已安装的 CJK 字体 (保持 CJK_FONTS 中的优先级)。"""
+    from matplotlib import font_manager
+
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    return [name for name in CJK_FONTS if name in installed]
+
+
+def _save_png_matplotlib(df_all, df_pareto, png_path):
+    """
+    用 matplotlib 直接从数组绘制静态 PNG，免去 kaleido 启动无头浏览器的开销。
+    没有可用的 CJK 字体时抛出 RuntimeError，由调用方回退到 kaleido。
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import PercentFormatter
+
+    cjk_fonts = _installed_cjk_fonts()
+    if not cjk_fonts:
+        raise RuntimeError("未找到可显示中文的字体")
+
+    rc = {'font.family': 'sans-serif',
+          'font.sans-serif': cjk_fonts + matplotlib.rcParams['font.sans-serif'],
+          'axes.unicode_minus': False}
+    with matplotlib.rc_context(rc):
+        fig = Figure(figsize=(12, 8), dpi=200)
+        ax = fig.subplots()
+        ax.scatter(df_all['noise_ratio'], df_all['dbcv_score'], s=5, c='lightgrey', alpha=0.6,
+                   label='被支配的解 (Dominated Solutions)')
+        points = ax.scatter(df_pareto['noise_ratio'], df_pareto['dbcv_score'],
+                            s=df_pareto['n_clusters'].clip(lower=6), c=df_pareto['n_clusters'], cmap='viridis',
+                            edgecolors='darkslategrey', linewidths=1, label='帕累托最优解 (Pareto Front)')
+        fig.colorbar(points, ax=ax, label='簇的数量 (Num Clusters)')
+        ax.invert_xaxis()  # 噪声率越低越好
+        ax.xaxis.set_major_formatter(PercentFormatter(xmax=1, decimals=0))
+        ax.set_xlabel('噪声率 (越低越好) ➞')
+        ax.set_ylabel('DBCV 聚类质量分 (越高越好) ➞')
+        ax.set_title('HDBSCAN 参数的帕累托前沿分析')
+        ax.grid(color='lightgrey')
+        ax.legend(loc='lower right')
+        fig.savefig(png_path)
+
+
+def _rasterize_background(x, y, x_range, y_range, width, height):
+    """
+    把大量背景点按像素计数栅格化为半透明 PNG (data URI)，HTML 体积不再随点数增长。
+    图像按 X 轴反转后的方向排列：左上角对应 (x_range[1], y_range[1])。
+    """
+    from matplotlib.image import imsave
+
+    counts, _, _ = np.histogram2d(y, x, bins=(height, width), range=[y_range, x_range])
+    counts = counts[::-1, ::-1]  # 行: y 从高到低；列: x 从高到低 (X轴反转)
+    rgba = np.zeros((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = 211 / 255  # lightgrey
+    if counts.max() > 0:
+        rgba[..., 3] = np.where(counts > 0, 0.35 + 0.65 * np.log1p(counts) / np.log1p(counts.max()), 0)
+    buf = io.BytesIO()
+    imsave(buf, rgba, format='png')
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
 
 def visualize_pareto_front(
     all_results_path: str,
     pareto_front_path: str,
-    output_dir: str
+    output_dir: str,
+    fast_png: bool = True,
+    raster_threshold: int = 100_000
 ):
     """
     创建并保存帕累托前沿的交互式可视化图表。
@@ -31,6 +110,8 @@ def visualize_pareto_front(
         all_results_path (str): 包含所有参数评估结果的 Parquet 文件路径。
         pareto_front_path (str): 仅包含帕累托前沿解的 Parquet 文件路径。
         output_dir (str): 保存输出图表（HTML 和 PNG）的目录。
+        fast_png (bool): 为 True 时用 matplotlib 绘制 PNG；没有 CJK 字体或绘图失败时回退到 kaleido。
+        raster_threshold (int): 背景点数超过该值时栅格化为一张图片，而不是逐点写入 HTML。
     """
     print("🎨 开始创建帕累托前沿可视化图表...")
 
@@ -39,40 +120,73 @@ def visualize_pareto_front(
         print(f"❌ 错误: 找不到输入文件。请确保 '{all_results_path}' 和 '{pareto_front_path}' 存在。")
         return
         
-    df_all = pd.read_parquet(all_results_path)
-    df_pareto = pd.read_parquet(pareto_front_path)
+    # 只读取绘图用到的列，跳过其余列的 I/O；通过内存映射读取文件
+    df_all = pd.read_parquet(all_results_path, engine='pyarrow', columns=['noise_ratio', 'dbcv_score'], memory_map=True)
+    df_pareto = pd.read_parquet(
+        pareto_front_path, engine='pyarrow', memory_map=True,
+        columns=['noise_ratio', 'dbcv_score', 'n_clusters', 'min_cluster_size', 'min_samples']
+    )
     print(f"✓ 已加载 {len(df_all)} 个全部评估点和 {len(df_pareto)} 个帕累托前沿点。")
 
     # 2. 创建图表对象
     fig = go.Figure()
 
     # 3. 添加背景散点 (所有被支配的点)
-    fig.add_trace(go.Scatter(
-        x=df_all['noise_ratio'],
-        y=df_all['dbcv_score'],
-        mode='markers',
-        marker=dict(
-            color='lightgrey',
-            size=5,
-            opacity=0.6
-        ),
-        name='被支配的解 (Dominated Solutions)',
-        hoverinfo='none' # 背景点不需要悬停信息
-    ))
+    # 使用 WebGL (Scattergl) 渲染，参数搜索点数较多时比 SVG 流畅得多
+    background_name = '被支配的解 (Dominated Solutions)'
+    rasterize = len(df_all) > raster_threshold
+    if rasterize:
+        # 点数过多时逐点数据会撑大 HTML 并拖慢浏览器：改为一张固定大小的密度图，
+        # 另加一个空轨迹保留图例
+        x_all = np.concatenate([df_all['noise_ratio'].to_numpy(), df_pareto['noise_ratio'].to_numpy()])
+        y_all = np.concatenate([df_all['dbcv_score'].to_numpy(), df_pareto['dbcv_score'].to_numpy()])
+        x_min, x_max = np.nanmin(x_all), np.nanmax(x_all)
+        y_min, y_max = np.nanmin(y_all), np.nanmax(y_all)
+        x_pad, y_pad = 0.02 * (x_max - x_min or 1), 0.02 * (y_max - y_min or 1)
+        x_range, y_range = (x_min - x_pad, x_max + x_pad), (y_min - y_pad, y_max + y_pad)
+        valid = df_all[['noise_ratio', 'dbcv_score']].dropna()
+        fig.add_layout_image(
+            source=_rasterize_background(
+                valid['noise_ratio'].to_numpy(), valid['dbcv_score'].to_numpy(),
+                x_range, y_range, width=1200, height=800
+            ),
+            xref='x', yref='y',
+            x=x_range[1], y=y_range[1],  # X轴反转，图像左上角位于 x 的最大值处
+            sizex=x_range[1] - x_range[0], sizey=y_range[1] - y_range[0],
+            sizing='stretch', layer='below'
+        )
+        fig.add_trace(go.Scattergl(
+            x=[], y=[], mode='markers',
+            marker=dict(color='lightgrey', size=5, opacity=0.6),
+            name=background_name, hoverinfo='none'
+        ))
+        print(f"✓ 背景点超过 {raster_threshold:,} 个，已栅格化为图片。")
+    else:
+        fig.add_trace(go.Scattergl(
+            x=df_all['noise_ratio'],
+            y=df_all['dbcv_score'],
+            mode='markers',
+            marker=dict(
+                color='lightgrey',
+                size=5,
+                opacity=0.6
+            ),
+            name=background_name,
+            hoverinfo='none' # 背景点不需要悬停信息
+        ))
 
     # 4. 添加前景散点 (帕累托前沿上的点)
-    # 自定义悬停文本格式
-    hover_text = [
-        f"<b>DBCV Score</b>: {row['dbcv_score']:.4f}<br>"
-        f"<b>Noise Ratio</b>: {row['noise_ratio']:.2%}<br>"
-        f"<b>Num Clusters</b>: {row['n_clusters']}<br>"
-        f"--------------------<br>"
-        f"min_cluster_size: {row['min_cluster_size']}<br>"
-        f"min_samples: {row['min_samples']}"
-        for index, row in df_pareto.iterrows()
-    ]
-
-    fig.add_trace(go.Scatter(
+    # 自定义悬停文本格式 (按列拼接字符串，避免 iterrows 逐行装箱)
+    hover_text = (
+        "<b>DBCV Score</b>: " + df_pareto['dbcv_score'].map('{:.4f}'.format) + "<br>"
+        + "<b>Noise Ratio</b>: " + df_pareto['noise_ratio'].map('{:.2%}'.format) + "<br>"
+        + "<b>Num Clusters</b>: " + df_pareto['n_clusters'].astype(str) + "<br>"
+        + "--------------------<br>"
+        + "min_cluster_size: " + df_pareto['min_cluster_size'].astype(str) + "<br>"
+        + "min_samples: " + df_pareto['min_samples'].astype(str)
+    ).tolist()
+
+    fig.add_trace(go.Scattergl(
         x=df_pareto['noise_ratio'],
         y=df_pareto['dbcv_score'],
         mode='markers',
@@ -125,19 +239,34 @@ def visualize_pareto_front(
         height=800
     )
     
+    if rasterize:
+        # 图片不参与自动缩放，固定坐标范围使其与散点对齐
+        fig.update_xaxes(autorange=False, range=[x_range[1], x_range[0]])
+        fig.update_yaxes(autorange=False, range=list(y_range))
+
     # 6. 保存图表
     html_path = os.path.join(output_dir, "pareto_front_visualization.html")
     png_path = os.path.join(output_dir, "pareto_front_visualization.png")
     
-    fig.write_html(html_path)
+    # plotly.js 通过 CDN 引用而不内联 (约 3MB)
+    fig.write_html(html_path, include_plotlyjs='cdn')
     print(f"✓ 已将交互式图表保存至: {html_path}")
     
-    try:
-        fig.write_image(png_path, scale=2) # scale=2 提高图片分辨率
-        print(f"✓ 已将静态图表保存至: {png_path}")
-    except Exception as e:
-        print(f"❌ 保存静态图片失败: {e}")
-        print("   请确保已安装 'kaleido' (`pip install kaleido`)")
+    saved_png = False
+    if fast_png:
+        try:
+            _save_png_matplotlib(df_all, df_pareto, png_path)
+            saved_png = True
+            print(f"✓ 已将静态图表保存至: {png_path}")
+        except Exception as e:
+            print(f"⚠️ matplotlib 绘图失败 ({e})，改用 kaleido。")
+    if not saved_png:
+        try:
+            fig.write_image(png_path, scale=2) # scale=2 提高图片分辨率
+            print(f"✓ 已将静态图表保存至: {png_path}")
+        except Exception as e:
+            print(f"❌ 保存静态图片失败: {e}")
+            print("   请确保已安装 'kaleido' (`pip install kaleido`)")
         
     fig.show()
 
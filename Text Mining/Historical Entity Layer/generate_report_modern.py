@@ -2,14 +2,63 @@
 import json
 import argparse
 from jinja2 import Environment, FileSystemLoader
+from jinja2.utils import htmlsafe_json_dumps
 import sys
 import os
-from collections import Counter, defaultdict
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Constants ---
 TEMPLATE_FILE = "template_modern.html.j2"
 PATTERN_RANKING_COUNT = 150
 DIVERSE_RELATION_COUNT = 20
+EXTRACTION_COLUMNS = ['turn', 'subj_name', 'subj_type', 'rel', 'obj_name', 'obj_type']
+
+
+def _flatten_extractions(speaker_turns_data: list) -> pd.DataFrame:
+    """
+    One row per extraction: an int code for the turn id (speaker, utterance order) plus
+    subject name/type, relation semantic form and object name/type. Empty values become
+    None. Also stores each turn's 'extraction_count' for the template.
+    """
+    turn_codes = {}
+    records = []
+    append_record = records.append  # bound once; called for every extraction
+    for i, turn in enumerate(speaker_turns_data):
+        extractions = turn.get("extractions", [])
+        turn['extraction_count'] = len(extractions)
+        turn_id = (turn.get('speaker_name', ''), turn.get('utterance_order', i))
+        turn_code = turn_codes.setdefault(turn_id, len(turn_codes))
+        for extraction in extractions:
+            subj = extraction.get("subject_entity", {})
+            rel = extraction.get("relation", {})
+            obj = extraction.get("object_entity", {})
+            append_record((turn_code,
+                           subj.get("name") or None, subj.get("entity_type") or None,
+                           rel.get("semantic_form") or None,
+                           obj.get("name") or None, obj.get("entity_type") or None))
+    return pd.DataFrame.from_records(records, columns=EXTRACTION_COLUMNS)
+
+
+@lru_cache(maxsize=1)
+def _get_template():
+    """
+    Build the Jinja2 environment and compile the report template once per process,
+    so repeated generate_html_report calls reuse them.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    env = Environment(loader=FileSystemLoader(script_dir), autoescape=True,
+                      cache_size=400, auto_reload=False)
+    return env.get_template(TEMPLATE_FILE)
 
 
 def generate_html_report(json_path: str, output_path: str) -> None:
@@ -22,95 +71,62 @@ def generate_html_report(json_path: str, output_path: str) -> None:
     print(f"    - Output HTML: {output_path}")
 
     try:
-        # 1. Setup Jinja2 Environment
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        env = Environment(loader=FileSystemLoader(script_dir), autoescape=True)
-        template = env.get_template(TEMPLATE_FILE)
+        # 1. Load the Jinja2 template (environment and compiled template are cached)
+        template = _get_template()
         print(f"[*] Successfully loaded template: '{TEMPLATE_FILE}'")
 
         # 2. Load JSON Data
-        with open(json_path, 'r', encoding='utf-8') as f:
-            speaker_turns_data = json.load(f)
+        if orjson is not None:
+            with open(json_path, 'rb') as f:
+                speaker_turns_data = orjson.loads(f.read())
+        else:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                speaker_turns_data = json.load(f)
         if not isinstance(speaker_turns_data, list):
             raise TypeError("The root of the JSON must be a list of speaker turns.")
         print(f"[*] Successfully parsed JSON data. Found {len(speaker_turns_data)} speaker turns.")
 
-        # 3. Perform All Analyses
-        entity_type_counts = Counter()
-        structural_pattern_counts = Counter()
-        entity_utterance_tracker = defaultdict(set)
-        multi_type_entities = defaultdict(set)
-        all_subject_types = set()
-        all_object_types = set()
-        relation_domain = defaultdict(set)
-        relation_range = defaultdict(set)
-        subj_rel_to_obj = defaultdict(set)
-        obj_rel_to_subj = defaultdict(set)
+        # 3. Perform All Analyses (one flat frame of extractions, counted with groupby)
+        df = _flatten_extractions(speaker_turns_data)
+        total_extractions = len(df)
+
+        # Entity mentions, interleaved subject then object per extraction so groups keep
+        # their order of first appearance
+        mentions = pd.DataFrame({
+            'name': np.column_stack([df['subj_name'].to_numpy(), df['obj_name'].to_numpy()]).ravel(),
+            'type': np.column_stack([df['subj_type'].to_numpy(), df['obj_type'].to_numpy()]).ravel(),
+            'turn': np.repeat(df['turn'].to_numpy(dtype=np.int32), 2)
+        }).dropna(subset=['type'])
+        entity_type_counts = mentions.groupby('type', sort=False).size()
+        entity_utterance_counts = mentions.groupby('type', sort=False)['turn'].nunique()
+        named_mentions = mentions.dropna(subset=['name'])
+        multi_type_entities = named_mentions.groupby('name', sort=False)['type'].unique()
+        all_subject_types = set(df['subj_type'].dropna())
+        all_object_types = set(df['obj_type'].dropna())
+
         # Frequency of each relation across all extractions
-        relation_frequency_map = Counter()
+        relation_counts = df.groupby('rel', sort=False).size()
+        relation_frequency_map = dict(zip(relation_counts.index.tolist(), relation_counts.tolist()))
+
+        patterns = df.dropna(subset=['subj_type', 'rel', 'obj_type'])
+        pattern_counts = patterns.groupby(['subj_type', 'rel', 'obj_type'], sort=False).size()
+        relation_domain_sizes = patterns.groupby('rel', sort=False)['subj_type'].nunique()
+        relation_range_sizes = patterns.groupby('rel', sort=False)['obj_type'].nunique()
+        objs_per_subj_rel = patterns.groupby(['subj_type', 'rel'])['obj_type'].nunique()
+        subjs_per_obj_rel = patterns.groupby(['obj_type', 'rel'])['subj_type'].nunique()
 
         # ▼▼▼ NEW GLOBAL STATS ▼▼▼
-        total_extractions = 0
-        unique_entity_names = set()
-        unique_relations = set()
+        unique_entity_names = named_mentions['name'].nunique()
+        unique_relations = len(relation_frequency_map)
         # ▲▲▲ END NEW STATS ▲▲▲
 
-        for i, turn in enumerate(speaker_turns_data):
-            turn_id = (turn.get('speaker_name', ''), turn.get('utterance_order', i))
-            
-            # Add a turn-level extraction count for convenience in the template
-            turn['extraction_count'] = len(turn.get("extractions", []))
-            total_extractions += turn['extraction_count']
-
-            for extraction in turn.get("extractions", []):
-                subj = extraction.get("subject_entity", {})
-                rel = extraction.get("relation", {})
-                obj = extraction.get("object_entity", {})
-
-                subj_name = subj.get("name")
-                subj_type = subj.get("entity_type")
-                rel_form = rel.get("semantic_form")
-                obj_name = obj.get("name")
-                obj_type = obj.get("entity_type")
-                
-                if rel_form:
-                    unique_relations.add(rel_form)
-                    relation_frequency_map.update([rel_form])
-
-                if subj_type:
-                    entity_type_counts.update([subj_type])
-                    entity_utterance_tracker[subj_type].add(turn_id)
-                    all_subject_types.add(subj_type)
-                    if subj_name:
-                        multi_type_entities[subj_name].add(subj_type)
-                        unique_entity_names.add(subj_name)
-
-                if obj_type:
-                    entity_type_counts.update([obj_type])
-                    entity_utterance_tracker[obj_type].add(turn_id)
-                    all_object_types.add(obj_type)
-                    if obj_name:
-                        multi_type_entities[obj_name].add(obj_type)
-                        unique_entity_names.add(obj_name)
-
-
-                if subj_type and rel_form and obj_type:
-                    pattern = (subj_type, rel_form, obj_type)
-                    structural_pattern_counts.update([pattern])
-                    relation_domain[rel_form].add(subj_type)
-                    relation_range[rel_form].add(obj_type)
-                    subj_rel_to_obj[(subj_type, rel_form)].add(obj_type)
-                    obj_rel_to_subj[(obj_type, rel_form)].add(subj_type)
-
         # 4. Prepare Data for Template
-        all_entity_types = []
-        for entity_name, total_count in entity_type_counts.items():
-            utterance_count = len(entity_utterance_tracker.get(entity_name, set()))
-            all_entity_types.append({
-                "name": entity_name,
-                "count": total_count,
-                "utterance_count": utterance_count
-            })
+        all_entity_types = [
+            {"name": entity_name, "count": total_count, "utterance_count": utterance_count}
+            for entity_name, total_count, utterance_count in zip(
+                entity_type_counts.index.tolist(), entity_type_counts.tolist(),
+                entity_utterance_counts.reindex(entity_type_counts.index).tolist())
+        ]
         all_entity_types.sort(key=lambda x: x["count"], reverse=True)
         print(f"[*] Counted {len(all_entity_types)} unique entity types.")
 
@@ -131,36 +147,29 @@ def generate_html_report(json_path: str, output_path: str) -> None:
         entity_utterance_counts_map = {item['name']: item['utterance_count'] for item in all_entity_types}
         entity_total_counts_map = {item['name']: item['count'] for item in all_entity_types}
 
-        all_sorted_patterns = structural_pattern_counts.most_common()
+        # Same order as Counter.most_common(): by count, ties in order of first appearance
+        all_sorted_patterns = sorted(zip(pattern_counts.index.tolist(), pattern_counts.tolist()),
+                                     key=itemgetter(1), reverse=True)
         most_frequent_patterns = all_sorted_patterns[:PATTERN_RANKING_COUNT]
         least_frequent_patterns = list(reversed(all_sorted_patterns[-PATTERN_RANKING_COUNT:]))
         print(f"[*] Analyzed {len(all_sorted_patterns)} unique structural patterns.")
         
         print("[*] Computing advanced statistics...")
-        final_multi_typed = {name: sorted(list(types)) for name, types in multi_type_entities.items() if len(types) > 1}
+        final_multi_typed = {name: sorted(types) for name, types in multi_type_entities.items() if len(types) > 1}
         subject_only_types = sorted(list(all_subject_types - all_object_types))
         object_only_types = sorted(list(all_object_types - all_subject_types))
         one_to_one_relations = defaultdict(list)
-        one_to_many_relations = set()
-        many_to_one_relations = set()
         
-        for subj, rel, obj in structural_pattern_counts.keys():
+        for subj, rel, obj in pattern_counts.index.tolist():
             if subj == obj:
                 one_to_one_relations[rel].append((subj, obj))
         
-        for (subj, rel), objs in subj_rel_to_obj.items():
-            if len(objs) > 1:
-                one_to_many_relations.add(rel)
-        
-        for (obj, rel), subjs in obj_rel_to_subj.items():
-            if len(subjs) > 1:
-                many_to_one_relations.add(rel)
+        one_to_many_relations = set(objs_per_subj_rel[objs_per_subj_rel > 1].index.get_level_values('rel'))
+        many_to_one_relations = set(subjs_per_obj_rel[subjs_per_obj_rel > 1].index.get_level_values('rel'))
 
         relation_diversity = []
-        all_rels = relation_domain.keys() | relation_range.keys()
-        for rel in all_rels:
-            domain_size = len(relation_domain.get(rel, []))
-            range_size = len(relation_range.get(rel, []))
+        for rel, domain_size, range_size in zip(relation_domain_sizes.index.tolist(), relation_domain_sizes.tolist(),
+                                                relation_range_sizes.reindex(relation_domain_sizes.index).tolist()):
             relation_diversity.append({
                 'rel': rel,
                 'domain_size': domain_size,
@@ -193,16 +202,33 @@ def generate_html_report(json_path: str, output_path: str) -> None:
             "total_extractions": total_extractions,
             "total_speaker_turns": len(speaker_turns_data),
             "unique_entity_types": len(all_entity_types),
-            "unique_entity_names": len(unique_entity_names),
-            "unique_relations": len(unique_relations)
+            "unique_entity_names": unique_entity_names,
+            "unique_relations": unique_relations
         }
         print(f"[*] Global stats computed: {global_stats}")
         # ▲▲▲ END NEW STATS DICTIONARY ▲▲▲
         
         print("[*] Advanced statistics computed successfully.")
 
-        # 5. Render Template
-        html_content = template.render(
+        # Data the template embeds as JS literals, several of them more than once: serialized
+        # once here (same output as the tojson filter, which sorts keys) and passed as Markup,
+        # so Jinja neither re-serializes nor escapes them
+        embedded_json = {
+            f"{name}_json": htmlsafe_json_dumps(value, sort_keys=True)
+            for name, value in (
+                ("all_structural_patterns", all_sorted_patterns),
+                ("all_entity_types", all_entity_types),
+                ("multi_typed_entities", final_multi_typed),
+                ("one_to_one_relations_sorted", one_to_one_relations_sorted),
+                ("one_to_many_relations_sorted", one_to_many_relations_sorted),
+                ("many_to_one_relations_sorted", many_to_one_relations_sorted),
+                ("relation_frequency_map", relation_frequency_map),
+                ("top_diverse_relations", top_diverse_relations),
+            )
+        }
+
+        # 5. Render Template (as a stream; chunks are written as they are produced)
+        html_stream = template.stream(
             report_title="Relation Extraction Dashboard", # Renamed for clarity
             global_stats=global_stats,
             speaker_turns=speaker_turns_data,
@@ -224,14 +250,15 @@ def generate_html_report(json_path: str, output_path: str) -> None:
             one_to_one_relations_sorted=one_to_one_relations_sorted,
             one_to_many_relations_sorted=one_to_many_relations_sorted,
             many_to_one_relations_sorted=many_to_one_relations_sorted,
-            relation_frequency_map=dict(relation_frequency_map),
-            top_diverse_relations=top_diverse_relations
+            relation_frequency_map=relation_frequency_map,
+            top_diverse_relations=top_diverse_relations,
+            **embedded_json
         )
-        print("[*] HTML content rendered successfully.")
+        html_stream.enable_buffering(100)
 
         # 6. Write Output
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        html_stream.dump(output_path, encoding='utf-8')
+        print("[*] HTML content rendered successfully.")
         print(f"\n[SUCCESS] Report generation complete. Output saved to: {output_path}")
 
     except Exception as e:
@@ -16,18 +16,28 @@ Author: Expert Python Developer
 Purpose: Ontology Induction from Interview Data
 """
 
+import heapq
 import json
 import pandas as pd
 import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import seaborn as sns
 from collections import Counter, defaultdict
 from typing import List, Dict, Tuple, Any
 from pyvis.network import Network
 import warnings
 
+try:
+    from fa2_modified import ForceAtlas2
+except ImportError:
+    ForceAtlas2 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore')
 
@@ -52,8 +62,13 @@ def load_data(filepath: str = 'extracted_data.json') -> pd.DataFrame:
     print(f"Loading data from {filepath}...")
     
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # orjson's C parser when installed; its JSONDecodeError subclasses json's
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
     except FileNotFoundError:
         print(f"Error: File {filepath} not found.")
         return pd.DataFrame()
@@ -61,49 +76,39 @@ def load_data(filepath: str = 'extracted_data.json') -> pd.DataFrame:
         print(f"Error: Invalid JSON in {filepath}.")
         return pd.DataFrame()
     
-    # Flatten the nested structure
-    flattened_data = []
+    # Flatten the nested structure in one pass: one row per extraction,
+    # with the utterance fields carried along as metadata
+    utterances = [utterance for utterance in data if utterance.get('extractions')]
+    df = pd.json_normalize(utterances, record_path='extractions',
+                           meta=['speaker_name', 'role', 'utterance_order'], errors='ignore')
+    df = df.rename(columns={
+        'subject_entity.name': 'subject_name',
+        'subject_entity.entity_type': 'subject_type',
+        'relation.surface_form': 'relation_surface',
+        'relation.semantic_form': 'relation_semantic',
+        'object_entity.name': 'object_name',
+        'object_entity.entity_type': 'object_type'
+    }).reindex(columns=[
+        'speaker_name', 'role', 'utterance_order', 'subject_name', 'subject_type',
+        'relation_surface', 'relation_semantic', 'object_name', 'object_type',
+        'evidence_sources', 'evidence_text'
+    ])
+    df['evidence_sources'] = df['evidence_sources'].map(
+        lambda sources: ', '.join(sources) if isinstance(sources, list) else '')
+    df = df.fillna({'utterance_order': 0, 'evidence_text': ''}).fillna('Unknown').infer_objects()
     
-    for utterance in data:
-        speaker_name = utterance.get('speaker_name', 'Unknown')
-        role = utterance.get('role', 'Unknown')
-        utterance_order = utterance.get('utterance_order', 0)
-        
-        for extraction in utterance.get('extractions', []):
-            # Extract subject information
-            subject = extraction.get('subject_entity', {})
-            subject_name = subject.get('name', 'Unknown')
-            subject_type = subject.get('entity_type', 'Unknown')
-            
-            # Extract relation information
-            relation = extraction.get('relation', {})
-            relation_surface = relation.get('surface_form', 'Unknown')
-            relation_semantic = relation.get('semantic_form', 'Unknown')
-            
-            # Extract object information
-            object_entity = extraction.get('object_entity', {})
-            object_name = object_entity.get('name', 'Unknown')
-            object_type = object_entity.get('entity_type', 'Unknown')
-            
-            # Extract evidence
-            evidence_sources = extraction.get('evidence_sources', [])
-            evidence_text = extraction.get('evidence_text', '')
-            
-            flattened_data.append({
-                'speaker_name': speaker_name,
-                'role': role,
-                'utterance_order': utterance_order,
-                'subject_name': subject_name,
-                'subject_type': subject_type,
-                'relation_surface': relation_surface,
-                'relation_semantic': relation_semantic,
-                'object_name': object_name,
-                'object_type': object_type,
-                'evidence_sources': ', '.join(evidence_sources),
-                'evidence_text': evidence_text
-            })
-    
-    df = pd.DataFrame(flattened_data)
+    # Arrow-backed strings: one contiguous buffer per column instead of a Python object per cell,
+    # which also speeds up the value_counts/groupby calls in the analyses below
+    text_columns = [col for col in df.columns if col != 'utterance_order']
+    try:
+        df[text_columns] = df[text_columns].astype('string[pyarrow]')
+    except ImportError:
+        pass  # pyarrow not installed: keep object strings
+    
+    # Speakers, roles, entity types and relations repeat across many triples: dictionary-encode them
+    categorical_columns = ['speaker_name', 'role', 'subject_type', 'object_type',
+                           'relation_semantic', 'relation_surface']
+    df[categorical_columns] = df[categorical_columns].astype('category')
     print(f"Successfully loaded {len(df)} triples from {len(data)} utterances.")
     return df
 
@@ -128,8 +133,9 @@ def analyze_frequencies(df: pd.DataFrame) -> None:
     print("\n1. ENTITY TYPE FREQUENCY DISTRIBUTION:")
     print("-" * 40)
     
-    # Combine subject and object types
-    all_entity_types = pd.concat([df['subject_type'], df['object_type']])
+    # Combine subject and object types (counted as plain objects: on the categorical
+    # columns value_counts would break ties by category order instead of first appearance)
+    all_entity_types = pd.concat([df['subject_type'], df['object_type']]).astype(object)
     entity_type_freq = all_entity_types.value_counts()
     
     print(f"Total unique entity types: {len(entity_type_freq)}")
@@ -142,7 +148,7 @@ def analyze_frequencies(df: pd.DataFrame) -> None:
     print("\n2. RELATION FREQUENCY DISTRIBUTION:")
     print("-" * 40)
     
-    relation_freq = df['relation_semantic'].value_counts()
+    relation_freq = df['relation_semantic'].astype(object).value_counts()
     print(f"Total unique relations: {len(relation_freq)}")
     print("\nTop 15 Relations:")
     for i, (relation, count) in enumerate(relation_freq.head(15).items(), 1):
@@ -166,8 +172,9 @@ def analyze_frequencies(df: pd.DataFrame) -> None:
     
     print(f"Total unique entities: {len(entity_counts)}")
     print("\nTop 20 Entities:")
-    for i, (entity_name, row) in enumerate(entity_counts.head(20).iterrows(), 1):
-        print(f"{i:2d}. {entity_name:<40} [{row['type']:<15}] Count: {row['count']:4d}")
+    for i, (entity_name, entity_type, count) in enumerate(
+            entity_counts.head(20)[['type', 'count']].itertuples(name=None), 1):
+        print(f"{i:2d}. {entity_name:<40} [{entity_type:<15}] Count: {count:4d}")
 
 
 def analyze_patterns(df: pd.DataFrame) -> None:
@@ -187,14 +194,10 @@ def analyze_patterns(df: pd.DataFrame) -> None:
     print("RELATIONAL PATTERN ANALYSIS")
     print("="*80)
     
-    # Create structural patterns
-    patterns = df.apply(lambda row: (
-        row['subject_type'],
-        row['relation_semantic'],
-        row['object_type']
-    ), axis=1)
-    
-    pattern_counts = Counter(patterns)
+    # Create structural patterns straight from the column arrays
+    pattern_counts = Counter(zip(df['subject_type'].to_numpy(),
+                                 df['relation_semantic'].to_numpy(),
+                                 df['object_type'].to_numpy()))
     
     print(f"\nTotal unique structural patterns: {len(pattern_counts)}")
     print("\nTop 25 Most Frequent Structural Patterns:")
@@ -219,9 +222,8 @@ def analyze_patterns(df: pd.DataFrame) -> None:
         relation_diversity[rel]['objects'].add(obj_type)
     
     print("\nRelations with Most Diverse Domain/Range:")
-    diverse_relations = sorted(relation_diversity.items(), 
-                              key=lambda x: len(x[1]['subjects']) + len(x[1]['objects']), 
-                              reverse=True)[:10]
+    diverse_relations = heapq.nlargest(10, relation_diversity.items(),
+                                       key=lambda x: len(x[1]['subjects']) + len(x[1]['objects']))
     
     for rel, types in diverse_relations:
         print(f"\n{rel}:")
@@ -229,7 +231,8 @@ def analyze_patterns(df: pd.DataFrame) -> None:
         print(f"  Range diversity:  {len(types['objects'])} unique object types")
 
 
-def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.png') -> nx.DiGraph:
+def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.png',
+                          betweenness_samples: int = 500, max_arrow_edges: int = 5000) -> nx.DiGraph:
     """
     Generate a high-quality static network visualization suitable for presentations.
     
@@ -242,6 +245,10 @@ def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.
     Args:
         df (pd.DataFrame): The flattened DataFrame of triples
         output_file (str): Output filename for the static graph
+        betweenness_samples (int): Number of pivot nodes sampled to estimate betweenness
+            centrality; graphs with at most this many nodes get the exact value
+        max_arrow_edges (int): Edge count above which edges are drawn as plain lines
+            without arrowheads
         
     Returns:
         nx.DiGraph: The constructed network graph
@@ -253,20 +260,18 @@ def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.
     # Create directed graph
     G = nx.DiGraph()
     
-    # Build entity type mapping
-    entity_types = {}
+    subjects = df['subject_name'].to_numpy()
+    objects = df['object_name'].to_numpy()
     
-    # Add nodes and edges
-    for _, row in df.iterrows():
-        # Add nodes with their types
-        G.add_node(row['subject_name'], entity_type=row['subject_type'])
-        G.add_node(row['object_name'], entity_type=row['object_type'])
-        entity_types[row['subject_name']] = row['subject_type']
-        entity_types[row['object_name']] = row['object_type']
-        
-        # Add edge with relation as attribute
-        G.add_edge(row['subject_name'], row['object_name'], 
-                  relation=row['relation_semantic'])
+    # Build entity type mapping; names are interleaved subject, object per row
+    # so a later mention's type wins, as with row-by-row assignment
+    entity_types = dict(zip(np.column_stack([subjects, objects]).ravel(),
+                            np.column_stack([df['subject_type'].to_numpy(), df['object_type'].to_numpy()]).ravel()))
+    
+    # Add all edges (and their endpoint nodes) in one call, relation as attribute
+    G.add_edges_from((s, o, {'relation': r})
+                     for s, o, r in zip(subjects, objects, df['relation_semantic'].to_numpy()))
+    nx.set_node_attributes(G, entity_types, 'entity_type')
     
     print(f"Graph statistics:")
     print(f"  Nodes: {G.number_of_nodes()}")
@@ -275,10 +280,13 @@ def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.
     
     # Calculate centrality measures
     degree_centrality = nx.degree_centrality(G)
-    betweenness_centrality = nx.betweenness_centrality(G)
+    # Only the top 10 are reported, so sampled pivots are enough on large graphs
+    k = betweenness_samples if G.number_of_nodes() > betweenness_samples else None
+    betweenness_centrality = nx.betweenness_centrality(G, k=k, seed=42)
     
     # Filter nodes by degree for labeling (only label important nodes)
-    degree_threshold = sorted(degree_centrality.values(), reverse=True)[min(50, len(G.nodes())//10)]
+    label_rank = min(50, len(G.nodes())//10)
+    degree_threshold = heapq.nlargest(label_rank + 1, degree_centrality.values())[label_rank]
     nodes_to_label = {node for node, deg in degree_centrality.items() if deg >= degree_threshold}
     
     # Create figure with high DPI
@@ -289,23 +297,33 @@ def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.
     pos = nx.spring_layout(G, k=3/np.sqrt(G.number_of_nodes()), 
                           iterations=100, seed=42)
     
-    # Prepare node properties
-    node_sizes = [3000 * degree_centrality.get(node, 0.1) for node in G.nodes()]
+    # Prepare node properties (every node has a degree and a type from the edge list)
+    nodes = list(G.nodes())
+    node_sizes = 3000 * np.fromiter((degree_centrality[node] for node in nodes), dtype=np.float64, count=len(nodes))
     
-    # Create color mapping for entity types
+    # Create color mapping for entity types: the colormap is evaluated once for all types
     unique_types = list(set(entity_types.values()))
-    color_palette = cm.get_cmap('tab20' if len(unique_types) <= 20 else 'hsv')
-    type_colors = {entity_type: color_palette(i/len(unique_types)) 
-                  for i, entity_type in enumerate(unique_types)}
-    node_colors = [type_colors.get(entity_types.get(node, 'Unknown'), 'gray') 
-                  for node in G.nodes()]
+    type_to_idx = {entity_type: i for i, entity_type in enumerate(unique_types)}
+    color_palette = plt.get_cmap('tab20' if len(unique_types) <= 20 else 'hsv')
+    colors_arr = color_palette(np.arange(len(unique_types)) / len(unique_types))
+    type_colors = {entity_type: tuple(colors_arr[i]) for entity_type, i in type_to_idx.items()}
+    node_colors = colors_arr[np.fromiter((type_to_idx[entity_types[node]] for node in nodes),
+                                         dtype=np.intp, count=len(nodes))]
     
     # Draw the graph
     nx.draw_networkx_nodes(G, pos, node_size=node_sizes, node_color=node_colors, 
                           alpha=0.8, linewidths=0.5, edgecolors='black')
     
-    nx.draw_networkx_edges(G, pos, edge_color='gray', alpha=0.3, 
-                          arrows=True, arrowsize=10, width=0.5)
+    # Arrowheads cost one patch per edge; past max_arrow_edges all edges are drawn as a
+    # single LineCollection. Edges sit below the rasterization z-order so vector outputs
+    # (PDF/SVG) get them as one bitmap layer while nodes and labels stay vector.
+    edges = nx.draw_networkx_edges(G, pos, edge_color='gray', alpha=0.3, 
+                                   arrows=G.number_of_edges() <= max_arrow_edges,
+                                   arrowsize=10, width=0.5)
+    for artist in (edges if isinstance(edges, list) else [edges]):
+        artist.set_zorder(-1)
+        artist.set_rasterized(True)
+    plt.gca().set_rasterization_zorder(0)
     
     # Draw labels only for important nodes
     labels = {node: node for node in nodes_to_label}
@@ -337,18 +355,175 @@ def generate_static_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.
     print("-" * 40)
     
     print("\nTop 10 Nodes by Degree Centrality:")
-    for i, (node, centrality) in enumerate(sorted(degree_centrality.items(), 
-                                                 key=lambda x: x[1], reverse=True)[:10], 1):
+    for i, (node, centrality) in enumerate(heapq.nlargest(10, degree_centrality.items(),
+                                                          key=lambda x: x[1]), 1):
         print(f"{i:2d}. {node:<40} {centrality:.4f}")
     
     print("\nTop 10 Nodes by Betweenness Centrality:")
-    for i, (node, centrality) in enumerate(sorted(betweenness_centrality.items(), 
-                                                 key=lambda x: x[1], reverse=True)[:10], 1):
+    for i, (node, centrality) in enumerate(heapq.nlargest(10, betweenness_centrality.items(),
+                                                          key=lambda x: x[1]), 1):
         print(f"{i:2d}. {node:<40} {centrality:.4f}")
     
     return G
 
-def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.html') -> None:
+
+def _layout_positions(names: List[str], df: pd.DataFrame, scale: int = 1000,
+                      fa2_min_nodes: int = 2000) -> Dict[str, Tuple[int, int]]:
+    """
+    Compute a force-directed layout for the interactive graph once, in Python.
+
+    Uses ForceAtlas2 (fa2_modified, a compiled implementation) for large graphs when it is
+    installed, otherwise NetworkX's spring layout. Positions are rescaled to [-scale, scale]
+    and rounded to integers, which keeps the serialized coordinates short.
+
+    Args:
+        names (List[str]): Entity names, one node each
+        df (pd.DataFrame): The flattened DataFrame of triples (edges)
+        scale (int): Half-width of the coordinate range
+        fa2_min_nodes (int): Node count from which ForceAtlas2 is preferred
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Node name to (x, y)
+    """
+    G = nx.DiGraph()
+    G.add_nodes_from(names)
+    G.add_edges_from(zip(df['subject_name'].tolist(), df['object_name'].tolist()))
+    if ForceAtlas2 is not None and G.number_of_nodes() >= fa2_min_nodes:
+        pos = ForceAtlas2(verbose=False).forceatlas2_networkx_layout(G.to_undirected(), iterations=500)
+        pos = nx.rescale_layout_dict(pos, scale=1)
+    else:
+        pos = nx.spring_layout(G, k=1/np.sqrt(G.number_of_nodes()), iterations=200, seed=42)
+    return {node: (int(round(float(x) * scale)), int(round(float(y) * scale))) for node, (x, y) in pos.items()}
+
+
+def _write_webgl_graph(entity_info: pd.DataFrame, color_map: Dict[str, str], df: pd.DataFrame,
+                       output_file: str, background_color: str, default_font_color: str,
+                       edge_color: str) -> None:
+    """
+    Write the knowledge graph as a Sigma.js (WebGL) page, for graphs too large for vis.js.
+
+    Node positions are computed once here with _layout_positions, so the browser runs no
+    force layout; the entity-type filter is a thin <select> overlay driving Sigma's reducers.
+
+    Args:
+        entity_info (pd.DataFrame): Per-entity 'last' type and 'size' (degree), indexed by name
+        color_map (Dict[str, str]): Entity type to node color
+        df (pd.DataFrame): The flattened DataFrame of triples
+        output_file (str): Output filename for the interactive graph
+    """
+    names = entity_info.index.tolist()
+    types = entity_info['last'].tolist()
+    degrees = entity_info['size'].tolist()
+    pos = _layout_positions(names, df)
+
+    # graphology's serialized graph format, loaded in the page with Graph.from()
+    graph_data = {
+        'options': {'type': 'directed', 'multi': True, 'allowSelfLoops': True},
+        'attributes': {},
+        'nodes': [{'key': name,
+                   'attributes': {'x': pos[name][0], 'y': pos[name][1],
+                                  'size': 3 + 2 * float(np.sqrt(degree)), 'label': name,
+                                  'color': color_map.get(entity_type, '#999999'),
+                                  'entityType': entity_type, 'degree': degree}}
+                  for name, entity_type, degree in zip(names, types, degrees)],
+        'edges': [{'source': source, 'target': target,
+                   'attributes': {'label': relation, 'color': edge_color, 'size': 1}}
+                  for source, target, relation in zip(df['subject_name'].tolist(),
+                                                      df['object_name'].tolist(),
+                                                      df['relation_semantic'].tolist())]
+    }
+    # Keep '</script>' inside string values from closing the inline script early
+    graph_json = json.dumps(graph_data).replace('</', '<\\/')
+    types_json = json.dumps(sorted(color_map))
+
+    html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Knowledge Graph</title>
+    <script src="https://cdn.jsdelivr.net/npm/graphology@0.25.4/dist/graphology.umd.min.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/sigma@2.4.0/build/sigma.min.js"></script>
+    <style>
+        body {{ margin: 0; padding: 0; overflow: hidden; background: {background_color};
+               font-family: sans-serif; color: {default_font_color}; }}
+        #graph-container {{ width: 100vw; height: 100vh; }}
+        #type-filter {{
+            position: absolute; top: 10px; right: 10px; z-index: 99;
+            background-color: rgba(247, 245, 242, 0.9);
+            border: 1px solid #E0E0E0; border-radius: 8px; padding: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        #type-filter select {{
+            padding: 5px; border-radius: 5px; border: 1px solid #D0D0D0;
+            background-color: white; color: {default_font_color};
+        }}
+        #node-tooltip {{
+            position: absolute; bottom: 10px; left: 10px; z-index: 99; display: none;
+            background-color: rgba(247, 245, 242, 0.9);
+            border: 1px solid #E0E0E0; border-radius: 8px; padding: 8px 12px;
+        }}
+    </style>
+</head>
+<body>
+    <div id="graph-container"></div>
+    <div id="type-filter">
+        <select id="type-select"><option value="">All entity types</option></select>
+    </div>
+    <div id="node-tooltip"></div>
+
+    <script type="text/javascript">
+        var graph = graphology.Graph.from({graph_json});
+        var selectedType = '';
+
+        var renderer = new Sigma(graph, document.getElementById('graph-container'), {{
+            defaultEdgeType: 'arrow',
+            renderEdgeLabels: false,
+            labelColor: {{ color: '{default_font_color}' }},
+            nodeReducer: function (node, data) {{
+                if (selectedType && data.entityType !== selectedType) {{
+                    return Object.assign({{}}, data, {{ hidden: true }});
+                }}
+                return data;
+            }},
+            edgeReducer: function (edge, data) {{
+                if (selectedType && (graph.getNodeAttribute(graph.source(edge), 'entityType') !== selectedType
+                        || graph.getNodeAttribute(graph.target(edge), 'entityType') !== selectedType)) {{
+                    return Object.assign({{}}, data, {{ hidden: true }});
+                }}
+                return data;
+            }}
+        }});
+
+        var select = document.getElementById('type-select');
+        {types_json}.forEach(function (entityType) {{
+            var option = document.createElement('option');
+            option.value = entityType;
+            option.textContent = entityType;
+            select.appendChild(option);
+        }});
+        select.addEventListener('change', function () {{
+            selectedType = select.value;
+            renderer.refresh();
+        }});
+
+        var tooltip = document.getElementById('node-tooltip');
+        renderer.on('enterNode', function (event) {{
+            var attrs = graph.getNodeAttributes(event.node);
+            tooltip.textContent = 'Entity: ' + attrs.label + ' | Type: ' + attrs.entityType
+                + ' | Connections: ' + attrs.degree;
+            tooltip.style.display = 'block';
+        }});
+        renderer.on('leaveNode', function () {{ tooltip.style.display = 'none'; }});
+    </script>
+</body>
+</html>
+"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+
+def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_graph.html',
+                               webgl_node_threshold: int = 1000, min_degree: int = 1) -> None:
     """
     Generate a high-performance, interactive network visualization using Pyvis.
     
@@ -356,11 +531,15 @@ def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_g
     - Zooming and panning
     - Node inspection on hover
     - A collapsable, elegant filter menu for dynamic exploration
-    - Lag-free interaction due to post-layout physics optimization.
+    - Lag-free interaction: the layout is computed in Python, so the browser runs no physics.
     
     Args:
         df (pd.DataFrame): The flattened DataFrame of triples
         output_file (str): Output filename for the interactive graph
+        webgl_node_threshold (int): Above this many entities the graph is written as a
+            Sigma.js (WebGL) page instead, since vis.js canvas rendering stalls on large graphs
+        min_degree (int): Entities mentioned fewer times than this are left out, together
+            with their triples, before the graph is laid out and serialized
     """
     print("\n" + "="*80)
     print("GENERATING HIGH-PERFORMANCE INTERACTIVE NETWORK VISUALIZATION")
@@ -378,44 +557,62 @@ def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_g
                   filter_menu=True) # <-- Use 100vh to fill the screen
     
     # --- 3. Prepare Node and Edge Data ---
-    entity_info = defaultdict(lambda: {
-        'type': 'Unknown',
-        'degree': 0
+    # Collect entity statistics (degree and type) column-wise: one row per mention,
+    # interleaved subject, object per triple so the last mention's type wins and
+    # entities keep their order of first appearance
+    mentions = pd.DataFrame({
+        'name': np.column_stack([df['subject_name'].to_numpy(), df['object_name'].to_numpy()]).ravel(),
+        'type': np.column_stack([df['subject_type'].to_numpy(), df['object_type'].to_numpy()]).ravel()
     })
-    
-    # Collect entity statistics (degree and type)
-    for _, row in df.iterrows():
-        entity_info[row['subject_name']]['type'] = row['subject_type']
-        entity_info[row['subject_name']]['degree'] += 1
-        entity_info[row['object_name']]['type'] = row['object_type']
-        entity_info[row['object_name']]['degree'] += 1
+    entity_info = mentions.groupby('name', sort=False)['type'].agg(['last', 'size'])
+
+    # Prune weakly connected entities (and the triples touching them) up front, so the
+    # browser never receives them
+    if min_degree > 1:
+        entity_info = entity_info[entity_info['size'] >= min_degree]
+        df = df[df['subject_name'].isin(entity_info.index) & df['object_name'].isin(entity_info.index)]
+        print(f"Kept {len(entity_info)} entities with degree >= {min_degree} ({len(df)} triples)")
         
     # Create color mapping for entity types
-    unique_types = sorted(list(set(info['type'] for info in entity_info.values())))
+    unique_types = sorted(entity_info['last'].unique())
     color_map = {entity_type: custom_palette[i % len(custom_palette)]
                  for i, entity_type in enumerate(unique_types)}
+
+    if len(entity_info) > webgl_node_threshold:
+        _write_webgl_graph(entity_info, color_map, df, output_file,
+                           background_color, default_font_color, edge_color)
+        print(f"Successfully saved WebGL interactive graph ({len(entity_info)} entities) to {output_file}")
+        print(f"Interactive visualization saved! Open {output_file} in a web browser.")
+        return
     
     # --- 4. Add Nodes with 'group' attribute for filtering ---
-    for entity, info in entity_info.items():
-        degree = info['degree']
-        entity_type = info['type']
-        
+    # Positions are fixed up front, so vis.js only draws (no stabilization in the browser)
+    names = entity_info.index.tolist()
+    pos = _layout_positions(names, df)
+    # .tolist() gives plain Python values, which pyvis can serialize to JSON
+    for entity, entity_type, degree in zip(names, entity_info['last'].tolist(),
+                                           entity_info['size'].tolist()):
+        x, y = pos[entity]
         # The 'group' attribute is essential for the built-in filter
         net.add_node(entity, 
                      label=entity,
                      title=f"Entity: {entity}<br>Type: {entity_type}<br>Connections: {degree}",
                      value=degree, # 'value' controls the node size
                      color=color_map.get(entity_type, '#999999'),
-                     group=entity_type) # <-- Assign group for filtering
-
-    # Add edges
-    for _, row in df.iterrows():
-        evidence = row['evidence_text']
-        evidence_snippet = (evidence[:75] + '...') if len(evidence) > 75 else evidence
-        hover_title = f"Relation: {row['relation_semantic']}<br>Surface Form: '{row['relation_surface']}'<br>Evidence: '{evidence_snippet}'"
-        net.add_edge(row['subject_name'], row['object_name'], 
+                     group=entity_type, # <-- Assign group for filtering
+                     x=x, y=y, physics=False)
+
+    # Add edges (hover titles are built column-wise in one pass instead of one f-string per row)
+    evidence = df['evidence_text'].astype(str)
+    evidence_snippets = evidence.where(evidence.str.len() <= 75, evidence.str.slice(0, 75) + '...')
+    edge_titles = ("Relation: " + df['relation_semantic'].astype(str)
+                   + "<br>Surface Form: '" + df['relation_surface'].astype(str)
+                   + "'<br>Evidence: '" + evidence_snippets + "'").tolist()
+    for source, target, relation, hover_title in zip(df['subject_name'], df['object_name'],
+                                                     df['relation_semantic'], edge_titles):
+        net.add_edge(source, target,
                      title=hover_title,
-                     label=row['relation_semantic'],
+                     label=relation,
                      color={'color': edge_color, 'opacity': 0.7})
     
     # --- 5. Set Advanced Options for Physics and Interaction ---
@@ -430,65 +627,34 @@ def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_g
         "font": {{ "size": 10, "color": "{default_font_color}", "align": "middle" }},
         "smooth": {{ "type": "continuous" }}
       }},
-      "physics": {{
-        "enabled": true,
-        "barnesHut": {{
-          "gravitationalConstant": -8000,
-          "springConstant": 0.04,
-          "springLength": 250,
-          "avoidOverlap": 0.1
-        }},
-        "stabilization": {{
-          "enabled": true,
-          "iterations": 1000,
-          "fit": true
-        }}
-      }},
+      "physics": {{ "enabled": false }},
       "interaction": {{ "hover": true, "tooltipDelay": 200, "navigationButtons": true, "keyboard": true }},
       "manipulation": {{ "enabled": false }}
     }}
     '''
     net.set_options(options)
 
-    # Save the initial graph
-    net.save_graph(output_file)
+    # Render the pyvis page in memory; it is written once, with the UI injection, below
+    html_content = net.generate_html()
 
     # --- 6. Inject Custom CSS and JavaScript for UI/UX Enhancement ---
-    with open(output_file, 'r+', encoding='utf-8') as f:
-        html_content = f.read()
-
-        injection = f'''
+    injection = f'''
         <style>
             body {{ margin: 0; padding: 0; overflow: hidden; }}
             .vis-loading-screen {{ display: none !important; }}
-            #custom-loading-bar-container {{
-                position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%);
-                width: 250px; height: 8px; background: transparent;
-                border-radius: 4px; border: 1px solid #343434;
-                overflow: hidden; display: none; z-index: 100;
-            }}
-            #custom-loading-bar {{
-                width: 100%; height: 100%; background: #343434;
-                transform: scaleX(0); transform-origin: left;
-                animation: custom-loading-animation 1.8s ease-in-out infinite;
-            }}
-            @keyframes custom-loading-animation {{
-                0%   {{ transform: scaleX(0); transform-origin: left; }}
-                45%  {{ transform: scaleX(1); transform-origin: left; }}
-                55%  {{ transform: scaleX(1); transform-origin: right; }}
-                100% {{ transform: scaleX(0); transform-origin: right; }}
-            }}
             .vis-configuration-wrapper {{
                 position: absolute; top: 10px; right: 10px;
                 background-color: rgba(247, 245, 242, 0.9);
                 border: 1px solid #E0E0E0; border-radius: 8px; padding: 10px;
                 box-shadow: 0 2px 10px rgba(0,0,0,0.1); z-index: 99;
-                max-width: 300px; transition: all 0.3s ease-in-out;
-                overflow: hidden;
+                max-width: 300px; overflow: hidden;
+                /* Own compositor layer; only composite-only properties animate */
+                will-change: transform, opacity; transform: translateZ(0);
+                transition: transform 0.3s ease-in-out, opacity 0.3s ease-in-out, visibility 0.3s;
             }}
             .vis-configuration-wrapper.collapsed {{
-                width: 0; height: 0; padding: 0; border: none;
-                overflow: hidden;
+                opacity: 0; visibility: hidden; pointer-events: none;
+                transform: translate3d(0, -10px, 0) scale(0.95);
             }}
             .vis-configuration-wrapper select {{
                 width: 120px !important; margin-right: 5px; padding: 5px;
@@ -517,13 +683,10 @@ def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_g
             #filter-toggle-arrow.collapsed {{ transform: rotate(180deg); }}
         </style>
 
-        <div id="custom-loading-bar-container"><div id="custom-loading-bar"></div></div>
-        
         <div id="filter-toggle-container"><div id="filter-toggle-arrow">▼</div></div>
 
         <script type="text/javascript">
             document.addEventListener('DOMContentLoaded', function() {{
-                var bar = document.getElementById('custom-loading-bar-container');
                 var filterPanel = document.querySelector('.vis-configuration-wrapper');
                 var toggleContainer = document.getElementById('filter-toggle-container');
                 var toggleArrow = document.getElementById('filter-toggle-arrow');
@@ -534,32 +697,31 @@ def generate_interactive_graph(df: pd.DataFrame, output_file: str = 'knowledge_g
                     toggleArrow.classList.add('collapsed');
                     toggleArrow.innerHTML = '☰'; // Filter icon (or hamburger)
 
-                    toggleContainer.addEventListener('click', function() {{
-                        filterPanel.classList.toggle('collapsed');
-                        toggleArrow.classList.toggle('collapsed');
-                        if (filterPanel.classList.contains('collapsed')) {{
-                            toggleArrow.innerHTML = '☰'; // Filter icon
-                        }} else {{
-                            toggleArrow.innerHTML = '✕'; // Close 'X' icon
-                        }}
-                    }});
-                }}
+                    // Rapid clicks collapse into one toggle (80 ms debounce), and the DOM
+                    // writes happen together in the next animation frame
+                    function debounce(fn, delay) {{
+                        var timer;
+                        return function() {{
+                            clearTimeout(timer);
+                            timer = setTimeout(fn, delay);
+                        }};
+                    }}
 
-                if (typeof network !== 'undefined') {{
-                    network.on("startStabilizing", function () {{ bar.style.display = 'block'; }});
-                    network.on("stabilizationIterationsDone", function () {{
-                        bar.style.display = 'none';
-                        network.setOptions({{ physics: false }});
-                    }});
+                    toggleContainer.addEventListener('click', debounce(function() {{
+                        requestAnimationFrame(function() {{
+                            var collapsed = filterPanel.classList.toggle('collapsed');
+                            toggleArrow.classList.toggle('collapsed', collapsed);
+                            toggleArrow.innerHTML = collapsed ? '☰' : '✕'; // Filter icon / close 'X' icon
+                        }});
+                    }}, 80));
                 }}
             }});
         </script>
         '''
-        # Slightly improved injection logic for better UI
-        html_content = html_content.replace('</body>', f'{injection}\n</body>')
-        f.seek(0)
-        f.write(html_content)
-        f.truncate()
+    # Slightly improved injection logic for better UI: splice before the closing body tag
+    head, body_close, tail = html_content.rpartition('</body>')
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.writelines((head, injection, '\n', body_close, tail))
 
     print(f"Successfully saved high-performance interactive graph to {output_file}")
     print(f"Interactive visualization saved! Open {output_file} in a web browser.")
@@ -13,8 +13,40 @@ Each pair consists of 1 Interviewer utterance followed by 1 Interviewee utteranc
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Below this many pairs, starting worker processes costs more than it saves
+PARALLEL_MIN_PAIRS = 1000
+
+
+def _load_json(path: Path):
+    """Parse a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(obj) -> bytes:
+    """
+    Serialize to UTF-8 JSON indented by 2 spaces, with orjson when it is installed
+    (same layout as json.dump(indent=2, ensure_ascii=False)).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _encode_pair(pair) -> bytes:
+    """Serialize one utterance pair, indented one level for the wrapper object."""
+    return _dump_json(pair).replace(b'\n', b'\n  ')
+
 
 def generate_previous_current_pairs(input_file: str, output_dir: str = None) -> int:
     """
@@ -38,8 +70,7 @@ def generate_previous_current_pairs(input_file: str, output_dir: str = None) ->
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Read input JSON
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = _load_json(input_path)
     
     # Group utterances into pairs (Interviewer + Interviewee)
     pairs = []
@@ -58,27 +89,34 @@ def generate_previous_current_pairs(input_file: str, output_dir: str = None) ->
             print(f"Warning: Unexpected pattern at index {i}. Expected Interviewer+Interviewee pair.")
             i += 1
     
+    # Serialize each pair once, already indented one level for the wrapper object;
+    # pair N's bytes are reused as pair N+1's previous_utterances. Large transcripts
+    # are encoded across all cores
+    if len(pairs) >= PARALLEL_MIN_PAIRS:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            encoded_pairs = list(executor.map(_encode_pair, pairs, chunksize=16))
+    else:
+        encoded_pairs = [_encode_pair(pair) for pair in pairs]
+    
     # Generate previous-current pair files
     pair_count = 0
-    for idx, current_pair in enumerate(pairs):
+    for idx, current_pair in enumerate(encoded_pairs):
         pair_number = idx + 1
         
         # Determine previous_utterances
         if idx == 0:
-            previous_utterances = None
+            previous_utterances = b'null'
         else:
-            previous_utterances = pairs[idx - 1]
-        
-        # Create the output structure
-        output_data = {
-            "previous_utterances": previous_utterances,
-            "current_utterance": current_pair
-        }
+            previous_utterances = encoded_pairs[idx - 1]
         
-        # Write to file
+        # Splice the output structure from the encoded pairs
+        # (same bytes as dumping {"previous_utterances": ..., "current_utterance": ...})
         output_file = output_dir / f"Previous-current pair - {pair_number}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        output_file.write_bytes(b''.join((
+            b'{\n  "previous_utterances": ', previous_utterances,
+            b',\n  "current_utterance": ', current_pair,
+            b'\n}'
+        )))
         
         pair_count += 1
     
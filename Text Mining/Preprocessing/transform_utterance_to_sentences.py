@@ -26,10 +26,94 @@ Output format:
 """
 
 import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import spacy
+except ImportError:
+    spacy = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SPACY_MODEL = "en_core_web_sm"
+# Below this many utterances, starting worker processes costs more than it saves
+PARALLEL_MIN_UTTERANCES = 2000
+
+# --- Sentence splitter patterns (compiled once) ---
+# Missing space after .!? before a capital ("word.Capital")
+_NO_SPACE_AFTER_STOP = re.compile(r'([.!?])([A-Z])')
+# "et al.", "e.g.", "i.e." and "cf." in one pass, mapped to their markers
+_ABBREVIATION = re.compile(r'\b(et al|e\.g|i\.e|cf)\.')
+_ABBREVIATION_MARKERS = {'et al': 'ET_AL_MARKER', 'e.g': 'EG_MARKER', 'i.e': 'IE_MARKER', 'cf': 'CF_MARKER'}
+_PROTECT = [
+    (re.compile(r'\b(Mr|Mrs|Ms|Dr|Prof|Sr|Jr)\.\s'), r'\1_DOT_MARKER '),  # Mr., Mrs., Dr., etc.
+    (re.compile(r'(\d+)\.(\d+)'), r'\1_DECIMAL_\2'),                    # numbers with decimals
+    (re.compile(r'\b([A-Z])\.(\s*[A-Z])'), r'\1_INITIAL_\2'),            # initials
+]
+_PARENTHETICAL = re.compile(r'\([^)]+\)')
+# Sentence-ending punctuation followed by space and a capital, quote or parenthesis
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z"\'\(])')
+_RESTORE = [
+    (re.compile(r'(\w+)_DOT_MARKER'), r'\1.'),
+    (re.compile(r'(\d+)_DECIMAL_(\d+)'), r'\1.\2'),
+    (re.compile(r'([A-Z])_INITIAL_'), r'\1.'),
+]
+
+
+def _load_json(path: Path):
+    """Parse a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(obj) -> bytes:
+    """
+    Serialize to UTF-8 JSON indented by 2 spaces, with orjson when it is installed
+    (same layout as json.dump(indent=2, ensure_ascii=False)).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def load_sentence_segmenter(model: str = SPACY_MODEL):
+    """
+    Load a spaCy pipeline reduced to its statistical sentence recognizer ('senter').
+    
+    Returns None when spaCy or the model is not installed; callers then fall back
+    to the regex-based split_into_sentences.
+    """
+    if spacy is None:
+        return None
+    try:
+        nlp = spacy.load(model, exclude=["parser", "tagger", "attribute_ruler", "lemmatizer", "ner"])
+    except OSError:
+        return None
+    nlp.enable_pipe("senter")
+    return nlp
+
+
+def split_texts_with_spacy(nlp, texts: list[str], batch_size: int = 64, n_process: int = 1):
+    """
+    Yield the sentence list of each text, segmented by spaCy in batches via nlp.pipe
+    (across n_process worker processes).
+    
+    Applies the same "word.Capital" spacing fix as split_into_sentences first, since
+    transcripts often drop the space after a full stop.
+    """
+    prepared = (_NO_SPACE_AFTER_STOP.sub(r'\1 \2', text) for text in texts)
+    for doc in nlp.pipe(prepared, batch_size=batch_size, n_process=n_process):
+        yield [sentence for sentence in (sent.text.strip() for sent in doc.sents) if sentence]
+
 
 def split_into_sentences(text: str) -> list[str]:
     """
@@ -41,37 +125,27 @@ def split_into_sentences(text: str) -> list[str]:
     # Pre-process: ensure there is a space after .!? if followed by a capital letter
     # but not if it's an abbreviation (handled later) or part of a decimal.
     # We do a more surgical fix for the specific pattern "word.Capital"
-    text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
+    text = _NO_SPACE_AFTER_STOP.sub(r'\1 \2', text)
 
     # First, protect abbreviations by adding a marker
-    protected_text = text
-    
     # Protect common patterns like "et al.", "e.g.", "i.e.", etc.
-    protected_text = re.sub(r'\bet al\.', 'ET_AL_MARKER', protected_text)
-    protected_text = re.sub(r'\be\.g\.', 'EG_MARKER', protected_text)
-    protected_text = re.sub(r'\bi\.e\.', 'IE_MARKER', protected_text)
-    protected_text = re.sub(r'\bcf\.', 'CF_MARKER', protected_text)
-    
-    # Protect Mr., Mrs., Dr., etc.
-    protected_text = re.sub(r'\b(Mr|Mrs|Ms|Dr|Prof|Sr|Jr)\.\s', r'\1_DOT_MARKER ', protected_text)
-    
-    # Protect numbers with decimals
-    protected_text = re.sub(r'(\d+)\.(\d+)', r'\1_DECIMAL_\2', protected_text)
+    protected_text = _ABBREVIATION.sub(lambda m: _ABBREVIATION_MARKERS[m.group(1)], text)
     
-    # Protect initials (single capital letter with period)
-    protected_text = re.sub(r'\b([A-Z])\.(\s*[A-Z])', r'\1_INITIAL_\2', protected_text)
+    # Protect Mr., Mrs., Dr., etc., numbers with decimals and initials
+    for pattern, replacement in _PROTECT:
+        protected_text = pattern.sub(replacement, protected_text)
     
     # Protect parenthetical citations like (see, for example, Avram et al. 1967)
     # Using a simpler regex that doesn't nested parens since transcripts rarely have them
+    # Most parentheticals contain no '.', so return them as-is without building a copy
     def protect_parens(match):
-        return match.group().replace('.', '_PAREN_DOT_')
+        span = match.group()
+        return span.replace('.', '_PAREN_DOT_') if '.' in span else span
         
-    protected_text = re.sub(r'\([^)]+\)', protect_parens, protected_text)
+    protected_text = _PARENTHETICAL.sub(protect_parens, protected_text)
     
     # Split on sentence-ending punctuation followed by space and capital or end of string
-    sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z"\'\(])'
-    
-    raw_sentences = re.split(sentence_pattern, protected_text)
+    raw_sentences = _SENTENCE_BOUNDARY.split(protected_text)
     
     # Restore protected patterns
     sentences = []
@@ -81,10 +155,10 @@ def split_into_sentences(text: str) -> list[str]:
         restored = restored.replace('EG_MARKER', 'e.g.')
         restored = restored.replace('IE_MARKER', 'i.e.')
         restored = restored.replace('CF_MARKER', 'cf.')
-        restored = re.sub(r'(\w+)_DOT_MARKER', r'\1.', restored)
-        restored = re.sub(r'(\d+)_DECIMAL_(\d+)', r'\1.\2', restored)
-        restored = re.sub(r'([A-Z])_INITIAL_', r'\1.', restored)
-        restored = restored.replace('_PAREN_DOT_', '.')
+        for pattern, replacement in _RESTORE:
+            restored = pattern.sub(replacement, restored)
+        if '_PAREN_DOT_' in restored:
+            restored = restored.replace('_PAREN_DOT_', '.')
         
         # Clean up whitespace
         restored = restored.strip()
@@ -108,18 +182,30 @@ def transform_utterance_to_sentences(input_file: str, output_file: str = None) -
         output_file = input_path.parent / f"{input_path.stem}_sentences{input_path.suffix}"
     
     # Read input JSON
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = _load_json(input_path)
+    
+    # Split all utterances into sentences: spaCy's senter in batches when available,
+    # otherwise the regex splitter; large transcripts are spread over all cores
+    texts = [item['utterance'] for item in data]
+    n_process = (os.cpu_count() or 1) if len(texts) >= PARALLEL_MIN_UTTERANCES else 1
+    nlp = load_sentence_segmenter()
+    if nlp is not None:
+        print(f"Segmenting with spaCy ({SPACY_MODEL}, senter)")
+        split_sentences = split_texts_with_spacy(nlp, texts, n_process=n_process)
+    else:
+        print("spaCy model not available; segmenting with the regex splitter")
+        if n_process > 1:
+            with ProcessPoolExecutor(max_workers=n_process) as executor:
+                split_sentences = list(executor.map(split_into_sentences, texts, chunksize=32))
+        else:
+            split_sentences = map(split_into_sentences, texts)
     
     # Transform each utterance
     transformed_data = []
     
-    for item in data:
+    for item, sentences in zip(data, split_sentences):
         utterance_order = item['order']
         
-        # Split utterance into sentences
-        sentences = split_into_sentences(item['utterance'])
-        
         # Create sentence objects with IDs
         sentence_objects = []
         for idx, sentence in enumerate(sentences, start=1):
@@ -139,8 +225,7 @@ def transform_utterance_to_sentences(input_file: str, output_file: str = None) -
         transformed_data.append(transformed_item)
     
     # Write output JSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(transformed_data, f, indent=2, ensure_ascii=False)
+    Path(output_file).write_bytes(_dump_json(transformed_data))
     
     print(f"✓ Transformed {len(data)} utterances")
     print(f"✓ Total sentences: {sum(len(item['sentences']) for item in transformed_data)}")